@@ -0,0 +1,236 @@
+"""Admission control: per-client rate limits and bounded concurrency per route class."""
+from __future__ import annotations
+import asyncio
+import math
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Deque, Dict, Optional, Tuple
+
+from starlette.requests import HTTPConnection
+
+from pte.utils.metrics import registry
+
+registry.describe("pte_admission_rejected_total", "counter", "Requests shed by admission control.")
+registry.describe("pte_admission_wait_seconds", "histogram", "Time admitted requests spent queued.")
+
+# Plan generation is CPU-heavy; everything else is a cheap session read/update.
+# Chat messages (HTTP and WebSocket) are light, and take a heavy slot only
+# when they ask for a plan (see api/routes.py).
+HEAVY_ROUTE = re.compile(r"^/api/session/[^/]+/generate$")
+# Probes and scrapes are never shed.
+EXEMPT_PATHS = frozenset({"/api/health", "/api/metrics"})
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.environ.get(name, default))
+
+
+class Rejected(Exception):
+    """Request refused; ``status`` is 429 (rate limited) or 503 (overloaded)."""
+
+    def __init__(self, status: int, retry_after: float, reason: str):
+        super().__init__(reason)
+        self.status = status
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """Take one token; returns 0 on success, else seconds until one is available."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """One token bucket per client key; idle full buckets are pruned."""
+
+    def __init__(self, rate: float, burst: float, max_clients: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def check(self, client: str, now: Optional[float] = None) -> float:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                if len(self._buckets) >= self.max_clients:
+                    self._prune(now)
+                bucket = self._buckets[client] = TokenBucket(self.rate, self.burst, now)
+            return bucket.take(now)
+
+    def _prune(self, now: float) -> None:
+        refill = self.burst / self.rate
+        self._buckets = {k: b for k, b in self._buckets.items() if now - b.updated < refill}
+
+
+class ConcurrencyLimiter:
+    """At most ``limit`` requests running and ``queue`` waiting (FIFO); the rest are rejected."""
+
+    def __init__(self, limit: int, queue: int, queue_timeout: float):
+        self.limit = limit
+        self.queue = queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        # Plain futures rather than an asyncio.Semaphore, so the limiter is not
+        # tied to the event loop it was first used on.
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._service_time = 0.05      # EWMA of seconds per request, for Retry-After
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> float:
+        return max(1.0, self._service_time * (self.waiting + 1) / self.limit)
+
+    async def acquire(self) -> float:
+        """Wait for a slot; returns the time spent queued."""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return 0.0
+        if len(self._waiters) >= self.queue:
+            raise Rejected(503, self.retry_after(), "queue_full")
+        start = time.perf_counter()
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            await asyncio.wait_for(asyncio.shield(fut), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if fut.done():          # handed a slot just as the wait expired
+                return time.perf_counter() - start
+            self._waiters.remove(fut)
+            fut.cancel()
+            raise Rejected(503, self.retry_after(), "queue_timeout") from None
+        except BaseException:
+            # Cancelled while queued (client gone, shutdown): pass on a slot we
+            # were already handed, or leave the queue, so no slot is orphaned.
+            if fut.done():
+                self.release()
+            else:
+                self._waiters.remove(fut)
+                fut.cancel()
+            raise
+        return time.perf_counter() - start
+
+    def release(self, service_time: Optional[float] = None) -> None:
+        """Free a slot; ``service_time`` (seconds the request ran) feeds Retry-After."""
+        if service_time is not None:
+            self._service_time += 0.2 * (service_time - self._service_time)
+        while self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)      # slot passes straight to the next waiter
+                return
+        self.active -= 1
+
+
+@dataclass
+class RouteClass:
+    name: str
+    limiter: ConcurrencyLimiter
+    rates: RateLimiter
+
+
+class AdmissionController:
+    """
+    Classifies requests as ``heavy`` (plan generation) or ``light`` (session
+    endpoints). Each class has its own per-client token bucket and its own
+    concurrency pool, so cheap requests never queue behind generation.
+    """
+
+    def __init__(self, heavy_concurrency: Optional[int] = None, heavy_queue: Optional[int] = None,
+                 heavy_rate: float = 2.0, heavy_burst: float = 10.0,
+                 light_concurrency: int = 64, light_queue: int = 256,
+                 light_rate: float = 20.0, light_burst: float = 50.0, queue_timeout: float = 5.0):
+        heavy_concurrency = heavy_concurrency or os.cpu_count() or 2
+        heavy_queue = heavy_queue if heavy_queue is not None else 2 * heavy_concurrency
+        self.classes = {
+            "heavy": RouteClass("heavy", ConcurrencyLimiter(heavy_concurrency, heavy_queue, queue_timeout),
+                                RateLimiter(heavy_rate, heavy_burst)),
+            "light": RouteClass("light", ConcurrencyLimiter(light_concurrency, light_queue, queue_timeout),
+                                RateLimiter(light_rate, light_burst)),
+        }
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        return cls(
+            heavy_concurrency=int(os.environ.get("PTE_HEAVY_CONCURRENCY", 0)) or None,
+            heavy_queue=int(os.environ["PTE_HEAVY_QUEUE"]) if "PTE_HEAVY_QUEUE" in os.environ else None,
+            heavy_rate=_env_float("PTE_HEAVY_RATE", 2.0),
+            heavy_burst=_env_float("PTE_HEAVY_BURST", 10.0),
+            light_rate=_env_float("PTE_LIGHT_RATE", 20.0),
+            light_burst=_env_float("PTE_LIGHT_BURST", 50.0),
+            queue_timeout=_env_float("PTE_QUEUE_TIMEOUT", 5.0),
+        )
+
+    def classify(self, method: str, path: str) -> Optional[RouteClass]:
+        """Route class for a request, or None if it is exempt."""
+        if path in EXEMPT_PATHS:
+            return None
+        heavy = method == "POST" and HEAVY_ROUTE.match(path)
+        return self.classes["heavy" if heavy else "light"]
+
+    async def admit(self, route_class: RouteClass, client: str) -> None:
+        """Take a token and a slot (release it with ``route_class.limiter.release``); raises Rejected."""
+        try:
+            wait = route_class.rates.check(client)
+            if wait:
+                raise Rejected(429, wait, "rate_limited")
+            queued = await route_class.limiter.acquire()
+        except Rejected as rejected:
+            registry.inc("pte_admission_rejected_total", {"class": route_class.name, "reason": rejected.reason})
+            raise
+        registry.observe("pte_admission_wait_seconds", queued, {"class": route_class.name})
+
+    @asynccontextmanager
+    async def admitted(self, route_class: RouteClass, client: str) -> AsyncIterator[None]:
+        """Hold a slot in ``route_class`` for the block."""
+        await self.admit(route_class, client)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            route_class.limiter.release(time.perf_counter() - start)
+
+
+# Set PTE_ADMISSION=0 to turn off rate limiting and load shedding.
+ENABLED = os.environ.get("PTE_ADMISSION", "1").lower() not in ("0", "false", "no")
+controller = AdmissionController.from_env()
+
+
+def active() -> Optional[AdmissionController]:
+    """The process-wide controller, or None when admission control is off."""
+    return controller if ENABLED else None
+
+
+def client_key(conn: HTTPConnection) -> str:
+    """Rate-limit key for a request or WebSocket."""
+    return conn.client.host if conn.client else "unknown"
+
+
+def rejection_headers(rejected: Rejected) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """(headers, body) for a rejected request; Retry-After is whole seconds."""
+    retry = str(max(1, math.ceil(rejected.retry_after)))
+    detail = "Too many requests" if rejected.status == 429 else "Server busy, try again shortly"
+    return {"Retry-After": retry}, {"detail": detail, "reason": rejected.reason}
@@ -1,16 +1,98 @@
 """FastAPI application entry point for Points Strategy Engine."""
-from fastapi import FastAPI
+import os
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+
+from pte.utils.metrics import begin_stage_timings, registry, server_timing_header
+from pte.utils.profiling import ProfileConfig, RequestProfiler
+from . import admission
+from .admission import Rejected, client_key, rejection_headers
+from .routes import pipeline, router
+
+# Set PTE_SERVER_TIMING=1 to attach per-stage timings to every response.
+SERVER_TIMING = os.environ.get("PTE_SERVER_TIMING", "").lower() in ("1", "true", "yes")
+# Set PTE_PROFILE=cprofile|sample to profile every PTE_PROFILE_EVERY-th request (see pte/utils/profiling.py).
+_profile_config = ProfileConfig.from_env()
+profiler = RequestProfiler(_profile_config) if _profile_config.mode else None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load provider data before the first request instead of during it."""
+    await run_in_threadpool(pipeline.warm)
+    yield
 
-from .routes import router
 
 app = FastAPI(
+    lifespan=lifespan,
     title="Points Strategy Engine API",
     description="API for planning travel using points and miles",
     version="1.0.0",
 )
 
-# Configure CORS for frontend development
+# Include API routes
+app.include_router(router)
+
+
+@app.exception_handler(Rejected)
+async def rejected_response(request: Request, rejected: Rejected):
+    """429/503 with Retry-After, for requests refused by admission control."""
+    headers, body = rejection_headers(rejected)
+    return JSONResponse(status_code=rejected.status, content=body, headers=headers)
+
+
+# Registered before the metrics middleware so it runs inside it and
+# rejected requests still show up in the request metrics.
+@app.middleware("http")
+async def admission_control(request: Request, call_next):
+    """Rate-limit per client and bound concurrent work per route class (limits: see api/admission.py)."""
+    controller = admission.active()
+    route_class = controller.classify(request.method, request.url.path) if controller else None
+    if route_class is None or request.method == "OPTIONS":
+        return await call_next(request)
+    try:
+        async with controller.admitted(route_class, client_key(request)):
+            return await call_next(request)
+    except Rejected as rejected:
+        return await rejected_response(request, rejected)
+
+
+@app.middleware("http")
+async def profile_requests(request: Request, call_next):
+    """Write a profile for every N-th request when PTE_PROFILE is set."""
+    if profiler is None or request.url.path == "/api/metrics" or not profiler.should_profile():
+        return await call_next(request)
+    with profiler.request(request.method, request.url.path):
+        return await call_next(request)
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Record per-route latency and status counts for /api/metrics."""
+    timings = begin_stage_timings()
+    start = time.perf_counter()
+    response = await call_next(request)
+    elapsed = time.perf_counter() - start
+
+    # Label by route template so session ids don't explode cardinality.
+    route = request.scope.get("route")
+    path = getattr(route, "path", "unmatched")
+    registry.observe("pte_http_request_duration_seconds", elapsed, {"route": path})
+    registry.inc(
+        "pte_http_requests_total",
+        {"route": path, "method": request.method, "status": str(response.status_code)},
+    )
+    if SERVER_TIMING:
+        response.headers["Server-Timing"] = server_timing_header(timings, total=elapsed)
+    return response
+
+
+# Configure CORS for frontend development. Added last so it is the outermost
+# layer and 429/503 responses from admission control carry CORS headers too.
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -22,11 +104,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Server-Timing", "Retry-After"],
 )
 
-# Include API routes
-app.include_router(router)
-
 
 @app.get("/")
 async def root():
@@ -36,4 +116,5 @@ async def root():
         "version": "1.0.0",
         "docs": "/docs",
         "health": "/api/health",
+        "metrics": "/api/metrics",
     }
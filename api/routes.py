@@ -1,16 +1,27 @@
 """API route handlers for the Points Strategy Engine."""
 from __future__ import annotations
+import asyncio
+import copy
+import os
+import time
 import uuid
-from typing import Dict
-from fastapi import APIRouter, HTTPException
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from fastapi import APIRouter, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 
 from pte.assistant.session import Session
-from pte.engine.scorer import score_flight, score_stay
-from pte.engine.render_markdown import render_markdown
-from pte.engine.models import Recommendation
-from pte.providers.flights.delta_msp_hnd import propose_flights
-from pte.providers.hotels.hyatt import load_calendars_for_trip, allocate_hyatt_stay
+from pte.nlp.intent import Intent, parse_intents
+from pte.nlp.llm_intent_async import AsyncIntentExtractor
+from pte.nlp.router import route_intent_async
+from pte.engine.pipeline import default_pipeline, stage_timing_hook
+from pte.engine.render_markdown import plan_etag
+from pte.engine.models import FlightOption, Recommendation, StayPlan
+from pte.utils.metrics import registry, stage
+from pte.utils.profiling import traced
 
+from . import admission
+from .admission import Rejected, client_key, rejection_headers
 from .schemas import (
     SessionState,
     CreateSessionResponse,
@@ -21,15 +32,41 @@ from .schemas import (
     SetNonstopRequest,
     SetNonstopResponse,
     GeneratePlanResponse,
-    FlightOptionSchema,
-    HotelNightSchema,
-    StayPlanSchema,
+    ResponseMode,
+    ChatMessageRequest,
+    ChatMessageResponse,
 )
 
 router = APIRouter(prefix="/api")
 
 # In-memory session store
 sessions: Dict[str, Session] = {}
+registry.gauge("pte_active_sessions", lambda: len(sessions), "Sessions held in memory.")
+
+# Shared with Session and the CLIs; every stage shows up in Server-Timing.
+pipeline = default_pipeline()
+pipeline.add_hook(stage_timing_hook)
+
+# Plan ETags are derived from the session's plan inputs; provider data is loaded
+# once per process, so a restart must invalidate them.
+_PLAN_ETAG_SALT = f"{os.getpid()}:{time.time_ns()}"
+
+# Created on first use so the API starts without an Ollama server.
+_llm_extractor: AsyncIntentExtractor | None = None
+
+# WebSocket channel: close after this many idle seconds; at most this many
+# undelivered server messages before the reader stops taking new input.
+WS_IDLE_TIMEOUT = float(os.environ.get("PTE_WS_IDLE_TIMEOUT", "300"))
+WS_OUTBOX_SIZE = 32
+
+MISSING_DATES = "❌ Please set both start and end dates first."
+CHAT_HELP = (
+    "I didn't understand that. Try:\n"
+    '- Setting dates: "Nov 20 2027 to Dec 4 2027"\n'
+    '- Setting hotel: "start at Andaz" or "start at Park Hyatt"\n'
+    '- Flight preference: "prefer nonstop" or "no nonstop"\n'
+    '- Generate plan: "generate plan" or "show plan"'
+)
 
 
 def get_session(session_id: str) -> Session:
@@ -53,12 +90,172 @@ def session_to_state(session_id: str, session: Session) -> SessionState:
     )
 
 
+def session_to_dict(session_id: str, session: Session) -> Dict[str, Any]:
+    """Serialize session state to JSON-ready data, skipping model validation."""
+    return {
+        "session_id": session_id,
+        "origin": session.origin,
+        "destination": session.destination,
+        "start_date": session.start_date.isoformat() if session.start_date else None,
+        "end_date": session.end_date.isoformat() if session.end_date else None,
+        "prefer_nonstop": session.prefer_nonstop,
+        "hotel_primary": session.hotel_primary,
+        "hotel_alternates": list(session.hotel_alternates),
+    }
+
+
+def flights_to_dicts(flights: List[FlightOption]) -> List[Dict[str, Any]]:
+    """Serialize engine flight options to JSON-ready data."""
+    return [
+        {
+            "carrier": f.carrier,
+            "flight_numbers": f.flight_numbers,
+            "cabin": f.cabin,
+            "nonstop": f.nonstop,
+            "origin": f.origin,
+            "destination": f.destination,
+            "depart_time_local": f.depart_time_local,
+            "arrive_time_local": f.arrive_time_local,
+            "duration_minutes": f.duration_minutes,
+            "score": f.score,
+            "rationale": f.rationale,
+            "points_price": f.points_price,
+            "award_seats": f.award_seats,
+        }
+        for f in flights
+    ]
+
+
+def stay_to_dict(stay: StayPlan) -> Dict[str, Any]:
+    """Serialize an engine stay plan to JSON-ready data."""
+    return {
+        "nights": [
+            {
+                "date": n.date.isoformat(),
+                "hotel_name": n.hotel_name,
+                "program": n.program,
+                "points_price": n.points_price,
+                "cash_price": n.cash_price,
+                "is_peak": n.is_peak,
+                "notes": n.notes,
+            }
+            for n in stay.nights
+        ],
+        "total_points": stay.total_points(),
+        "total_cash": stay.total_cash(),
+    }
+
+
+def plan_sections(session: Session, mode: ResponseMode = ResponseMode.full,
+                  timestamp: bool = False) -> Iterator[Tuple[str, Any]]:
+    """Run the planning pipeline for a session with dates set, yielding
+    ("flights", ...), ("stay", ...) and ("markdown", ...) as each is ready."""
+    trip = session.to_trip()
+    stages = pipeline.stages(trip, calendar_mode=session.calendar_mode, import_paths=session.import_paths,
+                             prefer_single_hotel=session.prefer_single_hotel)
+    flights = stay = None
+    for name, value in stages:
+        if name == "flights":
+            flights = value
+        else:
+            stay = value
+        if mode in (ResponseMode.full, ResponseMode.structured):
+            with stage("serialize"):
+                data = flights_to_dicts(value) if name == "flights" else stay_to_dict(value)
+            yield name, data
+
+    if mode in (ResponseMode.full, ResponseMode.markdown):
+        markdown = pipeline.render(Recommendation(trip=trip, flights=flights, stay=stay), include_timestamp=timestamp)
+        yield "markdown", markdown
+
+
+def build_plan_payload(session_id: str, session: Session, mode: ResponseMode = ResponseMode.full,
+                       timestamp: bool = False) -> Dict[str, Any]:
+    """Run the planning pipeline and build the response data."""
+    sections = dict(plan_sections(session, mode, timestamp))
+    payload: Dict[str, Any] = {"message": "Plan generated successfully"}
+    for key in ("markdown", "flights", "stay"):    # body (and ETag) key order is part of the API
+        if key in sections:
+            payload[key] = sections[key]
+    if mode is ResponseMode.full:
+        payload["state"] = session_to_dict(session_id, session)
+    return payload
+
+
+def intent_to_dict(intent: Intent) -> Dict[str, Any]:
+    """Serialize a parsed intent, with dates as ISO strings."""
+    slots = {k: v.isoformat() if hasattr(v, "isoformat") else v for k, v in intent.slots.items()}
+    return {"intent": intent.name, "slots": slots}
+
+
+def apply_intents(session: Session, intents: List[Intent]) -> Tuple[List[str], bool]:
+    """Apply every intent from one chat message. Returns (replies, plan requested)."""
+    messages: List[str] = []
+    wants_plan = False
+    for intent in intents:
+        if intent.name == "show_plan":
+            wants_plan = True
+        elif intent.name in ("plan_trip", "help", "quit", "reset"):
+            messages.append(CHAT_HELP)
+        else:
+            messages.append(session.apply_intent(intent.name, intent.slots))
+    return messages, wants_plan
+
+
+def asks_for_plan(intents: List[Intent]) -> bool:
+    return any(intent.name == "show_plan" for intent in intents)
+
+
+def apply_chat_intents(session_id: str, session: Session, intents: List[Intent]) -> Dict[str, Any]:
+    """Apply every intent from one chat message; plan last if any intent asked for it."""
+    messages, wants_plan = apply_intents(session, intents)
+    payload: Dict[str, Any] = {"messages": messages, "intents": [intent_to_dict(i) for i in intents]}
+    if wants_plan:
+        if session.start_date and session.end_date:
+            plan = build_plan_payload(session_id, session, ResponseMode.full)
+            messages.append(plan.pop("message"))
+            payload.update(plan)
+        else:
+            messages.append(MISSING_DATES)
+    payload["state"] = session_to_dict(session_id, session)
+    return payload
+
+
+def plan_inputs_etag(session_id: str, session: Session, mode: ResponseMode) -> str:
+    """ETag for an untimestamped plan, known before the pipeline runs.
+
+    The body is a function of the session id, ``Session.plan_inputs`` and
+    the mode, so hashing those validates a cached copy without planning.
+    """
+    return plan_etag(repr((_PLAN_ETAG_SALT, session_id, session.plan_inputs(""), mode.value)))
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Evaluate an If-None-Match header (weak comparison, ``*`` allowed)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
 @router.get("/health")
 async def health_check():
     """Health check endpoint."""
     return {"status": "ok", "service": "points-strategy-engine"}
 
 
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Request, stage and cache metrics in Prometheus text format."""
+    return PlainTextResponse(
+        registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
 @router.post("/session", response_model=CreateSessionResponse)
 async def create_session():
     """Create a new planning session."""
@@ -111,8 +308,25 @@ async def set_nonstop(session_id: str, request: SetNonstopRequest):
 
 
 @router.post("/session/{session_id}/generate", response_model=GeneratePlanResponse)
-async def generate_plan(session_id: str):
-    """Generate the travel plan."""
+async def generate_plan(
+    session_id: str,
+    request: Request,
+    mode: ResponseMode = ResponseMode.full,
+    timestamp: bool = False,
+):
+    """Generate the travel plan.
+
+    ``mode`` selects the payload: ``full`` (markdown, structured plan and
+    state), ``structured`` (flights and stay only) or ``markdown`` (rendered
+    plan only). The engine output is trusted, so the response is serialized
+    directly instead of being validated through the Pydantic schemas.
+
+    The markdown omits the "Generated" footer unless ``timestamp=true``, so
+    identical plans produce identical bodies. Every response carries an ETag
+    and a matching ``If-None-Match`` gets a 304 with no body. Without a
+    timestamp the ETag comes from the plan inputs, so a 304 skips the
+    pipeline; with one it is a hash of the body.
+    """
     session = get_session(session_id)
     trip = session.to_trip()
 
@@ -122,71 +336,172 @@ async def generate_plan(session_id: str):
             detail="Please set both start and end dates first.",
         )
 
-    # Generate flights
-    flights = propose_flights(trip)
-    for f in flights:
-        score_flight(f)
+    etag = None if timestamp else plan_inputs_etag(session_id, session, mode)
+    if etag is not None and etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
 
-    # Generate hotel stay
-    calendars = load_calendars_for_trip(
-        trip,
-        mode=session.calendar_mode,
-        import_paths=session.import_paths,
-    )
-    stay = allocate_hyatt_stay(
-        trip,
-        session.hotel_primary,
-        session.hotel_alternates,
-        calendars,
-        session.prefer_single_hotel,
-    )
-    score_stay(stay)
-
-    # Create recommendation and render markdown
-    rec = Recommendation(trip=trip, flights=flights, stay=stay)
-    markdown = render_markdown(rec)
-
-    # Convert to API schemas
-    flight_schemas = [
-        FlightOptionSchema(
-            carrier=f.carrier,
-            flight_numbers=f.flight_numbers,
-            cabin=f.cabin,
-            nonstop=f.nonstop,
-            origin=f.origin,
-            destination=f.destination,
-            depart_time_local=f.depart_time_local,
-            arrive_time_local=f.arrive_time_local,
-            duration_minutes=f.duration_minutes,
-            score=f.score,
-            rationale=f.rationale,
-        )
-        for f in flights
-    ]
+    # CPU-bound; run off the event loop so session endpoints stay responsive.
+    payload = await run_in_threadpool(traced(build_plan_payload), session_id, session, mode, timestamp)
+    with stage("encode"):
+        response = JSONResponse(content=payload)
 
-    hotel_schemas = [
-        HotelNightSchema(
-            date=n.date,
-            hotel_name=n.hotel_name,
-            program=n.program,
-            points_price=n.points_price,
-            cash_price=n.cash_price,
-            is_peak=n.is_peak,
-            notes=n.notes,
-        )
-        for n in stay.nights
-    ]
+    if etag is None:
+        etag = plan_etag(response.body)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return response
 
-    stay_schema = StayPlanSchema(
-        nights=hotel_schemas,
-        total_points=stay.total_points(),
-        total_cash=stay.total_cash(),
-    )
 
-    return GeneratePlanResponse(
-        message="Plan generated successfully",
-        markdown=markdown,
-        flights=flight_schemas,
-        stay=stay_schema,
-        state=session_to_state(session_id, session),
-    )
+@router.post("/session/{session_id}/message", response_model=ChatMessageResponse)
+async def chat_message(session_id: str, request: ChatMessageRequest, http_request: Request):
+    """Handle one chat message: parse it, apply every intent and plan if asked.
+
+    Intents come from the deterministic parser. With ``use_llm`` the LLM is
+    consulted only when the parser is unsure, and a slow or unavailable
+    model falls back to the parser. The response carries the new state and,
+    when the message asked for it, the generated plan. A message that plans
+    is admitted like ``/generate``; if that is refused, no intent is applied.
+    """
+    global _llm_extractor
+    session = get_session(session_id)
+    if request.use_llm:
+        if _llm_extractor is None:
+            _llm_extractor = AsyncIntentExtractor()
+        intents = (await route_intent_async(request.message, _llm_extractor)).intents
+    else:
+        intents = parse_intents(request.message)
+    controller = admission.active()
+    if controller is not None and asks_for_plan(intents):
+        async with controller.admitted(controller.classes["heavy"], client_key(http_request)):
+            payload = await run_in_threadpool(traced(apply_chat_intents), session_id, session, intents)
+    else:
+        payload = await run_in_threadpool(traced(apply_chat_intents), session_id, session, intents)
+    with stage("encode"):
+        return JSONResponse(content=payload)
+
+
+def state_diff(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Fields of ``new`` that differ from ``old``."""
+    return {k: v for k, v in new.items() if old.get(k) != v}
+
+
+async def _send_outbox(websocket: WebSocket, outbox: "asyncio.Queue[Dict[str, Any]]") -> None:
+    while True:
+        await websocket.send_json(await outbox.get())
+
+
+async def _push_plan(session: Session, outbox: "asyncio.Queue[Dict[str, Any]]", plan_id: int,
+                     release: Optional[Callable[[float], None]] = None) -> None:
+    """Run the pipeline off the event loop and push each section as it is ready.
+    ``release`` frees the admission slot taken for this plan, however it ends,
+    but not before the worker thread computing a section has returned."""
+    start = time.perf_counter()
+    step: Optional[asyncio.Future] = None
+    try:
+        sections = plan_sections(session)
+        while True:
+            # Shielded: cancelling the task can't stop the thread, so it must not orphan it either.
+            step = asyncio.ensure_future(run_in_threadpool(next, sections, None))
+            section = await asyncio.shield(step)
+            if section is None:
+                break
+            await outbox.put({"type": "plan", "plan_id": plan_id, "section": section[0], "data": section[1]})
+        await outbox.put({"type": "plan_done", "plan_id": plan_id})
+    finally:
+        if release is not None:
+            if step is not None and not step.done():
+                step.add_done_callback(lambda f: _release_after(f, release, start))
+            else:
+                release(time.perf_counter() - start)
+
+
+def _release_after(step: asyncio.Future, release: Callable[[float], None], start: float) -> None:
+    if not step.cancelled():
+        step.exception()            # retrieved: the plan was abandoned, nobody else will read it
+    release(time.perf_counter() - start)
+
+
+async def _admit_plan(websocket: WebSocket) -> Optional[Callable[[float], None]]:
+    """Take a heavy slot for a plan pushed over the channel; returns its release, or None when admission is off."""
+    controller = admission.active()
+    if controller is None:
+        return None
+    heavy = controller.classes["heavy"]
+    await controller.admit(heavy, client_key(websocket))
+    return heavy.limiter.release
+
+
+@router.websocket("/session/{session_id}/ws")
+async def session_channel(websocket: WebSocket, session_id: str):
+    """Chat over one connection, with state diffs and plan sections pushed by the server.
+
+    Clients send ``{"message": "..."}``. The server replies with ``state``
+    (full on connect, then ``diff`` only), ``messages`` and, when a plan is
+    requested, one ``plan`` message per section followed by ``plan_done``. A
+    newer plan request supersedes one still being computed. Plans go through
+    the same admission control as ``/generate``; a refused one is answered
+    with an ``error`` carrying ``retry_after``. Outbound
+    messages go through a bounded queue: a slow reader stops the server
+    from taking more input rather than buffering without limit. The
+    connection closes after ``WS_IDLE_TIMEOUT`` seconds without input.
+    """
+    session = sessions.get(session_id)
+    if session is None:
+        await websocket.close(code=4404, reason=f"Session {session_id} not found")
+        return
+    await websocket.accept()
+
+    outbox: asyncio.Queue[Dict[str, Any]] = asyncio.Queue(maxsize=WS_OUTBOX_SIZE)
+    sender = asyncio.create_task(_send_outbox(websocket, outbox))
+    plan_task: asyncio.Task | None = None
+    plan_id = 0
+    state = session_to_dict(session_id, session)
+    await outbox.put({"type": "state", "state": state})
+    try:
+        while True:
+            try:
+                data = await asyncio.wait_for(websocket.receive_json(), WS_IDLE_TIMEOUT)
+            except asyncio.TimeoutError:
+                await websocket.close(code=1001, reason="idle timeout")
+                break
+            except (ValueError, KeyError):
+                # Not JSON, or a binary frame: answer it rather than dropping the connection.
+                data = None
+            text = data.get("message") if isinstance(data, dict) else None
+            if not isinstance(text, str) or not text.strip():
+                await outbox.put({"type": "error", "detail": 'Expected {"message": "..."}'})
+                continue
+
+            intents = parse_intents(text)
+            messages, wants_plan = apply_intents(session, intents)
+            new_state = session_to_dict(session_id, session)
+            if wants_plan and not (session.start_date and session.end_date):
+                messages.append(MISSING_DATES)
+                wants_plan = False
+            await outbox.put({"type": "messages", "messages": messages,
+                              "intents": [intent_to_dict(i) for i in intents]})
+            diff = state_diff(state, new_state)
+            if diff:
+                await outbox.put({"type": "state", "diff": diff})
+            state = new_state
+
+            if wants_plan:
+                if plan_task is not None and not plan_task.done():
+                    plan_task.cancel()
+                try:
+                    release = await _admit_plan(websocket)
+                except Rejected as rejected:
+                    headers, body = rejection_headers(rejected)
+                    await outbox.put({"type": "error", "detail": body["detail"], "reason": rejected.reason,
+                                      "retry_after": int(headers["Retry-After"])})
+                    continue
+                plan_id += 1
+                # Plan from a snapshot so messages arriving meanwhile don't change it mid-run.
+                plan_task = asyncio.create_task(_push_plan(copy.deepcopy(session), outbox, plan_id, release))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if plan_task is not None:
+            plan_task.cancel()
+        sender.cancel()
@@ -1,10 +1,18 @@
 """Pydantic models for API request/response schemas."""
 from __future__ import annotations
 from datetime import date
-from typing import List, Optional
+from enum import Enum
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel
 
 
+class ResponseMode(str, Enum):
+    """Which parts of a generated plan to include in the response."""
+    full = "full"
+    structured = "structured"
+    markdown = "markdown"
+
+
 class FlightOptionSchema(BaseModel):
     carrier: str
     flight_numbers: List[str]
@@ -17,6 +25,8 @@ class FlightOptionSchema(BaseModel):
     duration_minutes: Optional[int] = None
     score: float = 0.0
     rationale: str = ""
+    points_price: Optional[int] = None
+    award_seats: Optional[int] = None
 
 
 class HotelNightSchema(BaseModel):
@@ -81,10 +91,29 @@ class SetNonstopResponse(BaseModel):
 
 class GeneratePlanResponse(BaseModel):
     message: str
-    markdown: str
-    flights: List[FlightOptionSchema]
-    stay: StayPlanSchema
+    markdown: Optional[str] = None
+    flights: Optional[List[FlightOptionSchema]] = None
+    stay: Optional[StayPlanSchema] = None
+    state: Optional[SessionState] = None
+
+
+class ChatMessageRequest(BaseModel):
+    message: str
+    use_llm: bool = False      # ask the LLM when the deterministic parser is unsure
+
+
+class IntentSchema(BaseModel):
+    intent: str
+    slots: Dict[str, Any] = {}
+
+
+class ChatMessageResponse(BaseModel):
+    messages: List[str]
+    intents: List[IntentSchema]
     state: SessionState
+    markdown: Optional[str] = None
+    flights: Optional[List[FlightOptionSchema]] = None
+    stay: Optional[StayPlanSchema] = None
 
 
 class ErrorResponse(BaseModel):
@@ -5,12 +5,9 @@ import os
 from datetime import date
 from getpass import getuser
 
-from ..utils.date_utils import parse_date_or_none, validate_date_range
-from ..engine.models import Trip, Recommendation
-from ..engine.scorer import score_flight, score_stay
-from ..engine.render_markdown import render_markdown
-from ..providers.flights.delta_msp_hnd import propose_flights
-from ..providers.hotels.hyatt import load_calendars_for_trip, allocate_hyatt_stay
+from pte.utils.date_utils import parse_date_or_none, validate_date_range
+from pte.engine.models import Trip
+from pte.engine.pipeline import default_pipeline
 
 def prompt_if_missing(args) -> tuple[date|None, date|None, bool, str, list[str]]:
     # Dates
@@ -69,11 +66,6 @@ def main():
         notes="Planned via points-strategy-engine"
     )
 
-    # Flights
-    flights = propose_flights(trip)
-    for f in flights:
-        score_flight(f)
-
     # Hotels (Hyatt)
     import_paths = None
     if args.calendar_mode == "import":
@@ -85,19 +77,11 @@ def main():
             k, v = kv.split("=", 1)
             import_paths[k.strip()] = v.strip()
 
-    calendars = load_calendars_for_trip(trip, mode=args.calendar_mode, import_paths=import_paths)
-    stay = allocate_hyatt_stay(
-        trip, start_hotel=start_hotel, alternates=alternates, calendars=calendars,
-        prefer_single_hotel=args.prefer_single_hotel
-    )
-
-    # Summarize
-    rec = Recommendation(trip=trip, flights=flights, stay=stay)
-    # Score the hotel plan as value (higher is better savings vs cash)
-    _ = score_stay(stay)
-
-    # Render
-    md = render_markdown(rec)
+    # Flights, hotels, scoring and rendering
+    pipeline = default_pipeline().warm(import_paths)
+    rec = pipeline.plan(trip, calendar_mode=args.calendar_mode, import_paths=import_paths,
+                        prefer_single_hotel=args.prefer_single_hotel)
+    md = pipeline.render(rec)
     os.makedirs(os.path.dirname(args.out), exist_ok=True)
     with open(args.out, "w", encoding="utf-8") as f:
         f.write(md)
@@ -4,10 +4,7 @@ import { PlanView } from "@/components/PlanView";
 import type { MessageProps } from "@/components/Message";
 import {
   createSession,
-  setDates,
-  setHotel,
-  setNonstop,
-  generatePlan,
+  sendMessage,
   type SessionState,
   type FlightOption,
   type StayPlan,
@@ -55,84 +52,6 @@ function App() {
     ]);
   };
 
-  // Parse user input and determine intent
-  const parseIntent = (
-    input: string
-  ): { action: string; params: Record<string, string> } => {
-    const lower = input.toLowerCase().trim();
-
-    // Date pattern: "Nov 20 2027 to Dec 4 2027" or "2027-11-20 to 2027-12-04"
-    const datePattern =
-      /(\w+\s+\d+\s+\d{4}|\d{4}-\d{2}-\d{2})\s+(?:to|-)\s+(\w+\s+\d+\s+\d{4}|\d{4}-\d{2}-\d{2})/i;
-    const dateMatch = input.match(datePattern);
-    if (dateMatch) {
-      return {
-        action: "set_dates",
-        params: { start: dateMatch[1], end: dateMatch[2] },
-      };
-    }
-
-    // Hotel pattern
-    if (lower.includes("start at") || lower.includes("hotel")) {
-      if (lower.includes("andaz")) {
-        return { action: "set_hotel", params: { hotel: "Andaz Tokyo Toranomon Hills" } };
-      }
-      if (lower.includes("park hyatt") || lower.includes("hyatt")) {
-        return { action: "set_hotel", params: { hotel: "Park Hyatt Tokyo" } };
-      }
-    }
-
-    // Nonstop preference
-    if (lower.includes("nonstop") || lower.includes("direct")) {
-      const prefer = !lower.includes("no ") && !lower.includes("don't");
-      return { action: "set_nonstop", params: { prefer: String(prefer) } };
-    }
-
-    // Generate plan
-    if (
-      lower.includes("generate") ||
-      lower.includes("show plan") ||
-      lower.includes("create plan") ||
-      lower.includes("make plan")
-    ) {
-      return { action: "generate", params: {} };
-    }
-
-    // Status
-    if (lower.includes("status") || lower.includes("current")) {
-      return { action: "status", params: {} };
-    }
-
-    return { action: "unknown", params: {} };
-  };
-
-  // Parse natural language date to ISO format
-  const parseDate = (dateStr: string): string => {
-    // If already ISO format
-    if (/^\d{4}-\d{2}-\d{2}$/.test(dateStr)) {
-      return dateStr;
-    }
-
-    // Parse "Nov 20 2027" format
-    const months: Record<string, string> = {
-      jan: "01", feb: "02", mar: "03", apr: "04",
-      may: "05", jun: "06", jul: "07", aug: "08",
-      sep: "09", oct: "10", nov: "11", dec: "12",
-    };
-
-    const match = dateStr.match(/(\w+)\s+(\d+)\s+(\d{4})/i);
-    if (match) {
-      const month = months[match[1].toLowerCase().slice(0, 3)];
-      const day = match[2].padStart(2, "0");
-      const year = match[3];
-      if (month) {
-        return `${year}-${month}-${day}`;
-      }
-    }
-
-    return dateStr; // Return as-is if parsing fails
-  };
-
   const handleSendMessage = useCallback(
     async (input: string) => {
       if (!sessionId) {
@@ -144,70 +63,20 @@ function App() {
       setIsLoading(true);
 
       try {
-        const { action, params } = parseIntent(input);
-
-        switch (action) {
-          case "set_dates": {
-            const startDate = parseDate(params.start);
-            const endDate = parseDate(params.end);
-            const response = await setDates(sessionId, startDate, endDate);
-            setSessionState(response.state);
-            addAssistantMessage(response.message);
-            break;
-          }
-
-          case "set_hotel": {
-            const response = await setHotel(sessionId, params.hotel);
-            setSessionState(response.state);
-            addAssistantMessage(response.message);
-            break;
-          }
-
-          case "set_nonstop": {
-            const prefer = params.prefer === "true";
-            const response = await setNonstop(sessionId, prefer);
-            setSessionState(response.state);
-            addAssistantMessage(response.message);
-            break;
-          }
-
-          case "generate": {
-            const response = await generatePlan(sessionId);
-            setSessionState(response.state);
-            setFlights(response.flights);
-            setStay(response.stay);
-            setMarkdown(response.markdown);
-            addAssistantMessage(
-              `${response.message}\n\n` +
-                `Found ${response.flights.length} flight options and ` +
-                `${response.stay.nights.length} hotel nights ` +
-                `(${response.stay.total_points.toLocaleString()} points total).`
-            );
-            break;
-          }
-
-          case "status": {
-            if (sessionState) {
-              addAssistantMessage(
-                `Current session:\n` +
-                  `- Route: ${sessionState.origin} to ${sessionState.destination}\n` +
-                  `- Dates: ${sessionState.start_date || "not set"} to ${sessionState.end_date || "not set"}\n` +
-                  `- Hotel: ${sessionState.hotel_primary}\n` +
-                  `- Nonstop: ${sessionState.prefer_nonstop ? "Yes" : "No"}`
-              );
-            }
-            break;
-          }
-
-          default:
-            addAssistantMessage(
-              `I didn't understand that. Try:\n` +
-                `- Setting dates: "Nov 20 2027 to Dec 4 2027"\n` +
-                `- Setting hotel: "start at Andaz" or "start at Park Hyatt"\n` +
-                `- Flight preference: "prefer nonstop" or "no nonstop"\n` +
-                `- Generate plan: "generate plan" or "show plan"`
-            );
+        const response = await sendMessage(sessionId, input);
+        setSessionState(response.state);
+        const replies = [...response.messages];
+        if (response.flights && response.stay) {
+          setFlights(response.flights);
+          setStay(response.stay);
+          setMarkdown(response.markdown ?? "");
+          replies.push(
+            `Found ${response.flights.length} flight options and ` +
+              `${response.stay.nights.length} hotel nights ` +
+              `(${response.stay.total_points.toLocaleString()} points total).`
+          );
         }
+        addAssistantMessage(replies.join("\n\n"));
       } catch (error) {
         const message = error instanceof Error ? error.message : "An error occurred";
         addAssistantMessage(`Error: ${message}`);
@@ -215,7 +84,7 @@ function App() {
         setIsLoading(false);
       }
     },
-    [sessionId, sessionState]
+    [sessionId]
   );
 
   return (
@@ -53,6 +53,20 @@ export interface GeneratePlanResponse {
   state: SessionState;
 }
 
+export interface ParsedIntent {
+  intent: string;
+  slots: Record<string, unknown>;
+}
+
+export interface ChatMessageResponse {
+  messages: string[];
+  intents: ParsedIntent[];
+  state: SessionState;
+  markdown?: string;
+  flights?: FlightOption[];
+  stay?: StayPlan;
+}
+
 export interface CreateSessionResponse {
   session_id: string;
   state: SessionState;
@@ -139,6 +153,44 @@ export async function generatePlan(sessionId: string): Promise<GeneratePlanRespo
   return handleResponse<GeneratePlanResponse>(response);
 }
 
+/**
+ * Send one chat message. The server parses it, applies every intent and
+ * returns the new state, plus the plan when the message asked for one.
+ */
+export async function sendMessage(
+  sessionId: string,
+  message: string,
+  useLlm = false
+): Promise<ChatMessageResponse> {
+  const response = await fetch(`${API_BASE}/session/${sessionId}/message`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ message, use_llm: useLlm }),
+  });
+  return handleResponse<ChatMessageResponse>(response);
+}
+
+export type ChannelEvent =
+  | { type: 'state'; state?: SessionState; diff?: Partial<SessionState> }
+  | { type: 'messages'; messages: string[]; intents: ParsedIntent[] }
+  | { type: 'plan'; plan_id: number; section: 'flights' | 'stay' | 'markdown'; data: unknown }
+  | { type: 'plan_done'; plan_id: number }
+  | { type: 'error'; detail: string; reason?: string; retry_after?: number };
+
+/**
+ * Open the session's WebSocket channel. Chat messages go out with
+ * `channel.send(JSON.stringify({ message }))`; state diffs and plan
+ * sections arrive through `onEvent` as the server computes them.
+ */
+export function openSessionChannel(
+  sessionId: string,
+  onEvent: (event: ChannelEvent) => void
+): WebSocket {
+  const socket = new WebSocket(`${API_BASE.replace(/^http/, 'ws')}/session/${sessionId}/ws`);
+  socket.onmessage = (e) => onEvent(JSON.parse(e.data) as ChannelEvent);
+  return socket;
+}
+
 export async function healthCheck(): Promise<{ status: string; service: string }> {
   const response = await fetch(`${API_BASE}/health`);
   return handleResponse<{ status: string; service: string }>(response);
@@ -238,6 +238,13 @@ def evaluate(agent):
 # =========================
 
 if __name__ == "__main__":
-    agent = train()
-    evaluate(agent)
+    import argparse
+    from pte.utils.profiling import add_profile_args, config_from_args, profiled
+
+    ap = argparse.ArgumentParser(description="Train and evaluate the card-strategy DQN.")
+    add_profile_args(ap)
+    args = ap.parse_args()
+    with profiled("train", config_from_args(args)):
+        agent = train()
+        evaluate(agent)
 
@@ -1,15 +1,21 @@
 # pte/assistant/session.py
 from __future__ import annotations
+import os
 from dataclasses import dataclass, field
 from typing import List, Dict, Optional
 from datetime import date
-from pte.engine.models import Trip, Recommendation
-from pte.engine.scorer import score_flight, score_stay
-from pte.engine.render_markdown import render_markdown
-from pte.providers.flights.delta_msp_hnd import propose_flights
-from pte.providers.hotels.hyatt import load_calendars_for_trip, allocate_hyatt_stay
+from pte.engine.models import Trip
+from pte.engine.pipeline import default_pipeline
+from pte.providers.hotels.hyatt import HyattCalendar
 from pte.utils.date_utils import validate_date_range
 
+HELP = "Tell me your dates, nonstop preference and start hotel, then say \"show plan\"."
+
+def _write_plan(out_path: str, markdown: str) -> None:
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        f.write(markdown)
+
 @dataclass
 class Session:
     # Core trip state
@@ -25,9 +31,13 @@ class Session:
     # Provider config
     calendar_mode: str = "fixture"   # 'fixture' or 'import'
     import_paths: Optional[Dict[str, str]] = None
+    # Already-parsed import calendars (e.g. from uploads); used instead of import_paths
+    calendars: Optional[Dict[str, HyattCalendar]] = None
 
     # Last recommendation text
     last_markdown_path: Optional[str] = None
+    last_markdown: Optional[str] = None
+    _plan_inputs: Optional[tuple] = field(default=None, repr=False, compare=False)
 
     def to_trip(self) -> Trip:
         return Trip(
@@ -63,26 +73,65 @@ class Session:
             self.hotel_alternates.append(hotel)
         return f"✅ Alternate added: {hotel} (now: {', '.join(self.hotel_alternates)})"
 
+    def plan_inputs(self, out_path: str) -> tuple:
+        """Everything generate_plan depends on; the plan is reused while this is unchanged."""
+        if self.calendar_mode == "import" and self.calendars is not None:
+            sources: tuple = ("calendars", self.calendars)     # compared by calendar identity
+        elif self.calendar_mode == "import":
+            sources = tuple(sorted((h, p, os.stat(p).st_mtime_ns if os.path.exists(p) else None)
+                                   for h, p in (self.import_paths or {}).items()))
+        else:
+            sources = ()
+        return (self.origin, self.destination, self.start_date, self.end_date, self.prefer_nonstop,
+                self.hotel_primary, tuple(self.hotel_alternates), self.prefer_single_hotel,
+                self.calendar_mode, sources, out_path)
+
     def generate_plan(self, out_path: str) -> str:
         trip = self.to_trip()
         if not trip.start_date or not trip.end_date:
+            self.forget_plan()
             return "❌ Please set both start and end dates first."
+        inputs = self.plan_inputs(out_path)
+        if inputs == self._plan_inputs and self.last_markdown is not None:
+            # Nothing changed, but the file may have been deleted since; rewriting it is cheap.
+            if not os.path.exists(out_path):
+                _write_plan(out_path, self.last_markdown)
+            return f"📝 Plan saved to: {out_path}"
 
-        # Flights
-        flights = propose_flights(trip)
-        for f in flights:
-            score_flight(f)
-
-        # Hotels
-        calendars = load_calendars_for_trip(trip, mode=self.calendar_mode, import_paths=self.import_paths)
-        stay = allocate_hyatt_stay(trip, self.hotel_primary, self.hotel_alternates, calendars, self.prefer_single_hotel)
-        _ = score_stay(stay)
-
-        rec = Recommendation(trip=trip, flights=flights, stay=stay)
-        md = render_markdown(rec)
-        import os
-        os.makedirs(os.path.dirname(out_path), exist_ok=True)
-        with open(out_path, "w", encoding="utf-8") as f:
-            f.write(md)
+        pipeline = default_pipeline()
+        preloaded = self.calendars if self.calendar_mode == "import" else None
+        try:
+            rec = pipeline.plan(trip, calendar_mode=self.calendar_mode, import_paths=self.import_paths,
+                                calendars=preloaded, prefer_single_hotel=self.prefer_single_hotel)
+            md = pipeline.render(rec)
+            _write_plan(out_path, md)
+        except Exception:
+            # Don't leave the previous plan around looking like the answer to this request.
+            self.forget_plan()
+            raise
         self.last_markdown_path = out_path
+        self.last_markdown = md
+        self._plan_inputs = inputs
         return f"📝 Plan saved to: {out_path}"
+
+    def forget_plan(self) -> None:
+        """Drop the last plan, e.g. when generating a new one failed."""
+        self.last_markdown_path = None
+        self.last_markdown = None
+        self._plan_inputs = None
+
+    def apply_intent(self, name: str, slots: Dict, out_path: str = "out/tokyo-plan.md") -> str:
+        """Apply one recognized intent (from parse_intents or the LLM router).
+        Only show_plan generates a plan; anything else gets the help text."""
+        if name == "set_dates":
+            return self.set_dates(slots.get("start"), slots.get("end"))
+        if name == "set_nonstop":
+            return self.set_nonstop(bool(slots.get("prefer_nonstop")))
+        if name == "set_start_hotel":
+            return self.set_start_hotel(slots["hotel"])
+        if name == "add_alternate_hotel":
+            return self.add_alternate(slots["hotel"])
+        if name == "show_plan":
+            return self.generate_plan(out_path)
+        # help, plan_trip (nothing specific recognized), quit, reset, small talk
+        return HELP
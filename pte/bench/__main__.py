@@ -0,0 +1,48 @@
+# pte/bench/__main__.py
+from __future__ import annotations
+import argparse
+import json
+from dataclasses import asdict
+from .runner import append_history, compare, find_baseline, format_table, load_history, make_run
+from .suite import BENCHMARKS
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark the planning pipeline.")
+    ap.add_argument("benchmarks", nargs="*", help=f"Subset to run (default: all of {', '.join(BENCHMARKS)})")
+    ap.add_argument("--quick", action="store_true", help="Small sizes and few samples (CI smoke run)")
+    ap.add_argument("--history", default="out/bench-history.json", help="JSON history file")
+    ap.add_argument("--label", default="", help="Label stored with this run (e.g. a git sha)")
+    ap.add_argument("--baseline", help="Compare against the latest run with this label (default: latest run)")
+    ap.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown before failing (0.2 = 20%%)")
+    ap.add_argument("--metric", default="p50_s", choices=["mean_s", "p50_s", "p90_s", "p99_s"])
+    ap.add_argument("--no-save", action="store_true", help="Do not append this run to the history")
+    ap.add_argument("--json", action="store_true", help="Print results as JSON instead of a table")
+    args = ap.parse_args(argv)
+    unknown = [b for b in args.benchmarks if b not in BENCHMARKS]
+    if unknown:
+        ap.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    results = []
+    for name in args.benchmarks or BENCHMARKS:
+        found = BENCHMARKS[name](args.quick)
+        if not found:
+            print(f"(skipped {name}: optional dependency not installed)")
+        results.extend(found)
+
+    print(json.dumps([asdict(r) for r in results], indent=1) if args.json else format_table(results))
+
+    baseline = find_baseline(load_history(args.history), args.baseline)
+    regressions = compare(results, baseline, args.threshold, args.metric) if baseline else []
+    if not args.no_save:
+        append_history(args.history, make_run(results, args.label))
+    if baseline is None:
+        print("\nNo baseline in history; nothing to compare.")
+        return 0
+    print(f"\nBaseline: {baseline.get('label') or '(unlabeled)'} @ {baseline['timestamp']}")
+    for r in regressions:
+        print(f"REGRESSION {r.key}: {r.metric} {r.baseline * 1e3:.3f} ms -> {r.current * 1e3:.3f} ms "
+              f"(+{r.change:.0%})")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,82 @@
+# pte/bench/generators.py
+"""Synthetic inputs for the benchmark suite: calendars, chat logs and long trips."""
+from __future__ import annotations
+import json
+import random
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Dict, Iterator, List
+from pte.engine.models import Trip
+from pte.providers.hotels.hyatt import HYATT_META, HyattCalendar
+
+BENCH_START = date(2027, 1, 1)
+AWARD_LEVELS = (25000, 30000, 35000, 40000, 45000)
+
+def hotel_names(n: int) -> List[str]:
+    return [f"Bench Hotel {i:03d}" for i in range(n)]
+
+@contextmanager
+def synthetic_hotels(n: int) -> Iterator[List[str]]:
+    """Register ``n`` synthetic hotels in HYATT_META for the duration of a benchmark."""
+    names = hotel_names(n)
+    for name in names:
+        HYATT_META[name] = {"program": "World of Hyatt", "award_points": [35000, 40000, 45000],
+                            "neighborhood": "Bench"}
+    try:
+        yield names
+    finally:
+        for name in names:
+            HYATT_META.pop(name, None)
+
+def synthetic_calendar(days: int, seed: int = 0, start: date = BENCH_START,
+                       unavailable: float = 0.05) -> HyattCalendar:
+    rng = random.Random(seed)
+    points = [None if rng.random() < unavailable else rng.choice(AWARD_LEVELS) for _ in range(days)]
+    return HyattCalendar.from_days(start.toordinal(), points)
+
+def synthetic_calendars(hotels: List[str], days: int, seed: int = 0) -> Dict[str, HyattCalendar]:
+    return {h: synthetic_calendar(days, seed + i) for i, h in enumerate(hotels)}
+
+def write_calendar(path: str, calendar: HyattCalendar) -> None:
+    """Write in the import format: JSON {date: points} or CSV date,points."""
+    if path.endswith(".json"):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({d.isoformat(): p for d, p in calendar.nightly_points.items()}, f)
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("date,points\n")
+        for d, p in calendar.nightly_points.items():
+            f.write(f"{d.isoformat()},{'' if p is None else p}\n")
+
+def long_trip(nights: int, hotels: List[str], start: date = BENCH_START) -> Trip:
+    return Trip(origin="MSP", destination="HND", start_date=start, end_date=start + timedelta(days=nights),
+                hotel_primary=hotels[0], hotel_alternates=list(hotels[1:]))
+
+_CHAT_TEMPLATES = (
+    "{m1} {d1} {y} to {m2} {d2} {y}",
+    "{y}-{mm1:02d}-{d1:02d} to {y}-{mm2:02d}-{d2:02d}",
+    "start {m1} {d1} {y}",
+    "prefer nonstop",
+    "no direct flights please",
+    "start at Park Hyatt",
+    "start at andaz tokyo",
+    "also consider Andaz",
+    "show plan",
+    "Show plan!",
+    "make plan",
+    "plan Tokyo late {y}, nonstop, start at Park Hyatt, also consider Andaz",
+    "what's the weather like in tokyo?",
+    "help",
+)
+_MONTH_NAMES = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+def chat_log(messages: int, seed: int = 0) -> List[str]:
+    """A mix of the commands users actually send, with repeats, dates and chatter."""
+    rng = random.Random(seed)
+    out = []
+    for _ in range(messages):
+        mm1 = rng.randint(1, 11)
+        out.append(rng.choice(_CHAT_TEMPLATES).format(
+            y=rng.choice((2026, 2027)), mm1=mm1, mm2=mm1 + 1, m1=_MONTH_NAMES[mm1 - 1], m2=_MONTH_NAMES[mm1],
+            d1=rng.randint(1, 28), d2=rng.randint(1, 28)))
+    return out
@@ -0,0 +1,128 @@
+# pte/bench/runner.py
+"""Timing, percentiles, JSON history and baseline comparison for benchmarks."""
+from __future__ import annotations
+import json
+import os
+import platform
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+@dataclass
+class BenchResult:
+    name: str
+    params: Dict[str, Any]
+    samples: int
+    ops_per_sample: int
+    mean_s: float
+    p50_s: float
+    p90_s: float
+    p99_s: float
+    max_s: float
+    ops_per_s: float
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def key(self) -> str:
+        params = ",".join(f"{k}={v}" for k, v in sorted(self.params.items()))
+        return f"{self.name}[{params}]" if params else self.name
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Linear-interpolated percentile of pre-sorted values, q in [0, 100]."""
+    if not sorted_values:
+        return 0.0
+    pos = (len(sorted_values) - 1) * q / 100.0
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+def summarize(name: str, params: Dict[str, Any], timings: Sequence[float], ops_per_sample: int = 1,
+              extra: Optional[Dict[str, Any]] = None) -> BenchResult:
+    values = sorted(timings)
+    total = sum(values)
+    return BenchResult(
+        name=name, params=params, samples=len(values), ops_per_sample=ops_per_sample,
+        mean_s=total / len(values), p50_s=percentile(values, 50), p90_s=percentile(values, 90),
+        p99_s=percentile(values, 99), max_s=values[-1],
+        ops_per_s=(len(values) * ops_per_sample / total) if total else 0.0, extra=extra or {},
+    )
+
+def measure(name: str, params: Dict[str, Any], fn: Callable[[], Any], repeat: int = 20, warmup: int = 2,
+            ops_per_sample: int = 1, min_time: float = 0.0) -> BenchResult:
+    """Time ``fn`` ``repeat`` times (more if ``min_time`` seconds have not elapsed)."""
+    for _ in range(warmup):
+        fn()
+    timings: List[float] = []
+    started = time.perf_counter()
+    while len(timings) < repeat or time.perf_counter() - started < min_time:
+        t0 = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - t0)
+    return summarize(name, params, timings, ops_per_sample)
+
+# --- History ---------------------------------------------------------------
+
+def load_history(path: str) -> List[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def make_run(results: Sequence[BenchResult], label: str = "") -> Dict[str, Any]:
+    return {
+        "label": label,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": {r.key: asdict(r) for r in results},
+    }
+
+def append_history(path: str, run: Dict[str, Any]) -> None:
+    history = load_history(path)
+    history.append(run)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=1)
+    os.replace(tmp, path)
+
+def find_baseline(history: Sequence[Dict[str, Any]], label: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Most recent run with ``label``, or the most recent run when no label is given."""
+    for run in reversed(history):
+        if label is None or run.get("label") == label:
+            return run
+    return None
+
+@dataclass
+class Comparison:
+    key: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        return (self.current - self.baseline) / self.baseline if self.baseline else 0.0
+
+def compare(results: Sequence[BenchResult], baseline: Dict[str, Any], threshold: float = 0.2,
+            metric: str = "p50_s") -> List[Comparison]:
+    """Benchmarks whose ``metric`` got worse than the baseline by more than ``threshold`` (0.2 = 20%)."""
+    regressions = []
+    for r in results:
+        base = baseline.get("results", {}).get(r.key)
+        if not base or not base.get(metric):
+            continue
+        cmp = Comparison(r.key, metric, base[metric], getattr(r, metric))
+        if cmp.change > threshold:
+            regressions.append(cmp)
+    return regressions
+
+def format_table(results: Sequence[BenchResult], title: str = "benchmark") -> str:
+    rows = [(title, "ops/s", "p50 ms", "p90 ms", "p99 ms", "max ms")]
+    for r in results:
+        rows.append((r.key, f"{r.ops_per_s:,.1f}", f"{r.p50_s * 1e3:.3f}", f"{r.p90_s * 1e3:.3f}",
+                     f"{r.p99_s * 1e3:.3f}", f"{r.max_s * 1e3:.3f}"))
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    return "\n".join("  ".join(c.ljust(w) if i == 0 else c.rjust(w) for i, (c, w) in enumerate(zip(row, widths)))
+                     for row in rows)
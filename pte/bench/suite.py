@@ -0,0 +1,132 @@
+# pte/bench/suite.py
+"""The benchmarks. Each takes ``quick`` (smaller sizes, for CI) and returns BenchResults."""
+from __future__ import annotations
+import contextlib
+import io
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Callable, Dict, List
+from pte.engine.models import Recommendation
+from pte.engine.render_markdown import render_markdown
+from pte.engine.scorer import score_flights, score_stay
+from pte.nlp.intent import parse_query
+from pte.providers.flights.delta_msp_hnd import propose_flights
+from pte.providers.hotels.hyatt import allocate_hyatt_stay, load_calendar_from_import
+from .generators import BENCH_START, chat_log, long_trip, synthetic_calendar, synthetic_calendars, synthetic_hotels, write_calendar
+from .runner import BenchResult, measure, summarize
+
+def bench_allocate(quick: bool) -> List[BenchResult]:
+    sizes = [(2, 30), (10, 90)] if quick else [(2, 30), (10, 365), (50, 365)]
+    out = []
+    for hotels, days in sizes:
+        with synthetic_hotels(hotels) as names:
+            calendars = synthetic_calendars(names, days)
+            trip = long_trip(days - 1, names)
+            out.append(measure("allocate_hyatt_stay", {"hotels": hotels, "days": days},
+                               lambda: allocate_hyatt_stay(trip, names[0], names[1:], calendars),
+                               repeat=5 if quick else 30))
+    return out
+
+def bench_load_calendar(quick: bool) -> List[BenchResult]:
+    out = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for days in ([365] if quick else [365, 3650]):
+            cal = synthetic_calendar(days)
+            for ext in ("json", "csv"):
+                path = os.path.join(tmp, f"cal-{days}.{ext}")
+                write_calendar(path, cal)
+                out.append(measure("load_calendar_from_import", {"days": days, "format": ext},
+                                   lambda: load_calendar_from_import(path), repeat=5 if quick else 30))
+    return out
+
+def bench_render(quick: bool) -> List[BenchResult]:
+    out = []
+    for nights in ([14] if quick else [14, 365]):
+        with synthetic_hotels(2) as names:
+            trip = long_trip(nights, names)
+            calendars = synthetic_calendars(names, nights + 1)
+            flights = propose_flights(trip)
+            score_flights(flights)
+            stay = allocate_hyatt_stay(trip, names[0], names[1:], calendars)
+            score_stay(stay)
+            rec = Recommendation(trip=trip, flights=flights, stay=stay)
+            out.append(measure("render_markdown", {"nights": nights},
+                               lambda: render_markdown(rec, include_timestamp=False), repeat=10 if quick else 100))
+    return out
+
+def bench_parse_query(quick: bool) -> List[BenchResult]:
+    messages = chat_log(200 if quick else 5000)
+
+    def run():
+        for m in messages:
+            parse_query(m)
+    return [measure("parse_query", {"messages": len(messages)}, run, repeat=3 if quick else 20,
+                    ops_per_sample=len(messages))]
+
+def bench_api_sessions(quick: bool) -> List[BenchResult]:
+    """Many sessions driven concurrently through the ASGI app: create, set dates, generate."""
+    try:
+        from fastapi.testclient import TestClient
+        import api.admission
+        import api.main
+        import api.routes
+    except ImportError:
+        return []
+    sessions, workers = (20, 4) if quick else (200, 16)
+    start = BENCH_START.isoformat()
+    end = (BENCH_START + timedelta(days=14)).isoformat()
+    # Every simulated session comes from one client address; measure the
+    # pipeline, not the per-client rate limits.
+    # Sessions live in the app's global store; remove the ones created here afterwards.
+    created: List[str] = []
+    saved, api.admission.ENABLED = api.admission.ENABLED, False
+    try:
+        with TestClient(api.main.app) as client:
+            def workflow(_):
+                t0 = time.perf_counter()
+                sid = client.post("/api/session").json()["session_id"]
+                created.append(sid)
+                client.post(f"/api/session/{sid}/dates", json={"start_date": start, "end_date": end})
+                client.post(f"/api/session/{sid}/generate")
+                return time.perf_counter() - t0
+            t0 = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                timings = list(pool.map(workflow, range(sessions)))
+            wall = time.perf_counter() - t0
+    finally:
+        api.admission.ENABLED = saved
+        for sid in created:
+            api.routes.sessions.pop(sid, None)
+    result = summarize("api_session_workflow", {"sessions": sessions, "concurrency": workers}, timings)
+    result.ops_per_s = sessions / wall
+    return [result]
+
+def bench_train(quick: bool) -> List[BenchResult]:
+    """A few episodes of the card-strategy DQN in main.py (skipped without torch)."""
+    try:
+        import main
+    except ImportError:
+        return []
+    episodes = 2 if quick else 20
+    saved = main.EPISODES
+    main.EPISODES = episodes
+    try:
+        def run():
+            with contextlib.redirect_stdout(io.StringIO()):
+                main.train()
+        return [measure("train", {"episodes": episodes}, run, repeat=1 if quick else 3, warmup=0,
+                        ops_per_sample=episodes)]
+    finally:
+        main.EPISODES = saved
+
+BENCHMARKS: Dict[str, Callable[[bool], List[BenchResult]]] = {
+    "allocate": bench_allocate,
+    "load_calendar": bench_load_calendar,
+    "render": bench_render,
+    "parse_query": bench_parse_query,
+    "api_sessions": bench_api_sessions,
+    "train": bench_train,
+}
@@ -0,0 +1,145 @@
+# pte/cli/batch.py
+"""
+``python -m pte.cli.plan --batch trips.csv``: plan many trips in one process pool.
+
+Trips are read from CSV (header row) or JSONL. Each row or object may have
+``id, start, end, origin, destination, nonstop, start_hotel, alternates,
+prefer_single_hotel``. Only ``start`` and ``end`` are required. In CSV,
+alternates are separated by ``;``. Import-mode calendars are parsed once
+and shared with the workers.
+"""
+from __future__ import annotations
+import csv
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from pte.engine.models import Trip
+from pte.engine.pipeline import default_pipeline
+from pte.engine.render_markdown import content_hash
+from pte.providers.hotels.hyatt import HyattCalendar
+from pte.utils.date_utils import parse_date_or_none, validate_date_range
+from .plan import parse_calendar_files
+
+DEFAULT_HOTEL = "Park Hyatt Tokyo"
+_UNSAFE = re.compile(r"[^\w.-]+")
+
+def _flag(value: Any, default: bool = False) -> bool:
+    if value is None or value == "":
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "y", "yes")
+
+def read_trips(path: str) -> List[Dict[str, Any]]:
+    """Rows as dicts, each with an ``id`` (``trip-<n>`` when the file has none)."""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+    for n, row in enumerate(rows, 1):
+        row["id"] = str(row.get("id") or f"trip-{n}")
+    return rows
+
+def trip_from_row(row: Dict[str, Any], origin: str = "MSP", destination: str = "HND") -> Tuple[Trip, bool]:
+    """(Trip, prefer_single_hotel); ValueError on bad dates."""
+    start, end = parse_date_or_none(row.get("start") or ""), parse_date_or_none(row.get("end") or "")
+    ok, msg = validate_date_range(start, end)
+    if not ok:
+        raise ValueError(msg)
+    hotel = row.get("start_hotel") or DEFAULT_HOTEL
+    alternates = row.get("alternates")
+    if isinstance(alternates, str):
+        alternates = [a.strip() for a in alternates.split(";") if a.strip()]
+    if not alternates:
+        alternates = ["Andaz Tokyo Toranomon Hills"] if hotel == DEFAULT_HOTEL else [DEFAULT_HOTEL]
+    trip = Trip(origin=row.get("origin") or origin, destination=row.get("destination") or destination,
+                start_date=start, end_date=end, prefer_nonstop=_flag(row.get("nonstop"), True),
+                hotel_primary=hotel, hotel_alternates=list(alternates))
+    return trip, _flag(row.get("prefer_single_hotel"))
+
+# --- Workers ----------------------------------------------------------------
+
+_worker: Dict[str, Any] = {}
+
+def _init_worker(options: Dict[str, Any]) -> None:
+    _worker.update(options)
+    default_pipeline().warm()
+
+def plan_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Plan one trip with the worker's shared options; errors are returned, not raised."""
+    o = _worker
+    try:
+        trip, single = trip_from_row(row, o["origin"], o["destination"])
+        calendars: Optional[Dict[str, HyattCalendar]] = o["calendars"]
+        if calendars is not None:
+            missing = [h for h in [trip.hotel_primary] + trip.hotel_alternates if h not in calendars]
+            if missing:
+                raise ValueError(f"no calendar for {', '.join(missing)}")
+        pipeline = default_pipeline()
+        rec = pipeline.plan(trip, calendars=calendars, prefer_single_hotel=single or o["prefer_single_hotel"])
+        md = pipeline.render(rec, generated_at=o["generated_at"], include_timestamp=o["timestamp"])
+    except (ValueError, KeyError) as e:
+        return {"id": row["id"], "error": str(e)}
+    return {"id": row["id"], "start": trip.start_date.isoformat(), "end": trip.end_date.isoformat(),
+            "total_points": rec.stay.total_points(), "sha256": content_hash(md), "markdown": md}
+
+def plan_all(rows: List[Dict[str, Any]], options: Dict[str, Any], jobs: int) -> Iterator[Dict[str, Any]]:
+    """Results in input order; ``jobs <= 1`` plans in this process."""
+    if jobs <= 1 or len(rows) <= 1:
+        _init_worker(options)
+        yield from map(plan_row, rows)
+        return
+    chunksize = max(1, len(rows) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(options,)) as pool:
+        yield from pool.map(plan_row, rows, chunksize=chunksize)
+
+def run_batch(args) -> int:
+    rows = read_trips(args.batch)
+    calendars = None
+    if args.calendar_mode == "import":
+        registry = default_pipeline().warm().registry
+        calendars = {h: registry.calendar_file(p) for h, p in parse_calendar_files(args.calendar_file).items()}
+    options = {
+        "origin": args.origin, "destination": args.destination, "calendars": calendars,
+        "prefer_single_hotel": args.prefer_single_hotel, "timestamp": not args.no_timestamp,
+        # One 'Generated' stamp for the whole batch.
+        "generated_at": args.generated_at or datetime.now(),
+    }
+    jobs = max(1, min(args.jobs, len(rows)))
+
+    t0 = time.perf_counter()
+    failed = 0
+    if args.jsonl:
+        os.makedirs(os.path.dirname(args.jsonl) or ".", exist_ok=True)
+        sink = open(args.jsonl, "w", encoding="utf-8")
+    else:
+        os.makedirs(args.out_dir, exist_ok=True)
+        sink = None
+    try:
+        for result in plan_all(rows, options, jobs):
+            if "error" in result:
+                failed += 1
+                print(f"{result['id']}: {result['error']}", file=sys.stderr)
+            if sink is not None:
+                sink.write(json.dumps(result) + "\n")
+            elif "error" not in result:
+                path = os.path.join(args.out_dir, f"{_UNSAFE.sub('_', result['id'])}.md")
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(result["markdown"])
+    finally:
+        if sink is not None:
+            sink.close()
+    elapsed = time.perf_counter() - t0
+
+    where = args.jsonl or args.out_dir
+    rate = len(rows) / elapsed if elapsed else 0.0
+    print(f"Planned {len(rows) - failed}/{len(rows)} trips in {elapsed:.2f}s "
+          f"({rate:,.1f} trips/s, {jobs} job{'s' if jobs != 1 else ''}) -> {where}")
+    return 1 if failed else 0
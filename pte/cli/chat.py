@@ -2,8 +2,11 @@
 from __future__ import annotations
 import argparse
 from getpass import getuser
-from pte.nlp.intent import parse_query
+from typing import List, Optional
+from pte.nlp.intent import Intent, parse_intents
 from pte.assistant.session import Session
+from pte.engine.pipeline import default_pipeline
+from pte.utils.profiling import add_profile_args, config_from_args, profiled
 
 WELCOME = """\
 Personal Travel Assistant — Chat Mode
@@ -18,23 +21,71 @@ Type natural language like:
 Tip: You can pass --calendar-mode import and --calendar-file "Hotel=path"
 """
 
-def main():
+PLAN_INTENTS = {"show_plan", "plan_trip"}
+
+def respond(sess: Session, intent: Intent, out_path: str) -> Optional[str]:
+    """Apply one intent to the session and return the reply; None means quit."""
+    if intent.name == "quit":
+        return None
+    if intent.name == "help":
+        return WELCOME
+    if intent.name == "set_dates":
+        return sess.set_dates(intent.slots.get("start"), intent.slots.get("end"))
+    if intent.name == "set_nonstop":
+        return sess.set_nonstop(intent.slots["prefer_nonstop"])
+    if intent.name == "set_start_hotel":
+        return sess.set_start_hotel(intent.slots["hotel"])
+    if intent.name == "add_alternate_hotel":
+        return sess.add_alternate(intent.slots["hotel"])
+    # show_plan, plan_trip, and anything unrecognized: try to generate a plan
+    reply = sess.generate_plan(out_path)
+    if intent.name in PLAN_INTENTS and sess.last_markdown_path:
+        reply += f"\n(open {sess.last_markdown_path})"
+    return reply
+
+def respond_all(sess: Session, intents: List[Intent], out_path: str) -> List[Optional[str]]:
+    """Apply every intent from one message in order; stops after a quit (its reply is None)."""
+    replies: List[Optional[str]] = []
+    for intent in intents:
+        replies.append(respond(sess, intent, out_path))
+        if replies[-1] is None:
+            break
+    return replies
+
+def make_session(calendar_mode: str, calendar_files: Optional[List[str]], prefer_single_hotel: bool) -> Session:
+    sess = Session(calendar_mode=calendar_mode, prefer_single_hotel=prefer_single_hotel, import_paths=None)
+    if calendar_mode == "import":
+        sess.import_paths = {}
+        for kv in calendar_files or []:
+            if "=" not in kv:
+                raise SystemExit('Use --calendar-file "Hotel Name=path"')
+            k, v = kv.split("=", 1)
+            sess.import_paths[k.strip()] = v.strip()
+    return sess
+
+def main(argv=None):
     ap = argparse.ArgumentParser(description="Chat with your travel assistant.")
     ap.add_argument("--calendar-mode", choices=["fixture","import"], default="fixture")
     ap.add_argument("--calendar-file", action="append",
                     help='Repeatable: "Hotel Name=path" when using --calendar-mode import')
     ap.add_argument("--prefer-single-hotel", action="store_true")
     ap.add_argument("--out", default=f"out/tokyo-plan-{getuser()}.md")
-    args = ap.parse_args()
+    ap.add_argument("--replay", nargs="+", metavar="TRANSCRIPT",
+                    help="Replay transcripts (one message per line, '-' for stdin) and report latency")
+    ap.add_argument("--jobs", type=int, default=1, help="--replay: transcripts replayed in parallel")
+    ap.add_argument("--verbose", action="store_true", help="--replay: print every message and reply")
+    add_profile_args(ap)
+    args = ap.parse_args(argv)
+    with profiled("chat-replay" if args.replay else "chat", config_from_args(args)):
+        run(args)
 
-    sess = Session(calendar_mode=args.calendar_mode, prefer_single_hotel=args.prefer_single_hotel, import_paths=None)
-    if args.calendar_mode == "import":
-        sess.import_paths = {}
-        for kv in args.calendar_file or []:
-            if "=" not in kv:
-                raise SystemExit('Use --calendar-file "Hotel Name=path"')
-            k, v = kv.split("=", 1)
-            sess.import_paths[k.strip()] = v.strip()
+def run(args):
+    if args.replay:
+        from .replay import run_replay
+        raise SystemExit(run_replay(args))
+
+    sess = make_session(args.calendar_mode, args.calendar_file, args.prefer_single_hotel)
+    default_pipeline().warm(sess.import_paths)
 
     print(WELCOME)
     print(f"Calendar mode: {sess.calendar_mode}")
@@ -49,28 +100,11 @@ def main():
             break
         if not text:
             continue
-        intent = parse_query(text)
-
-        if intent.name == "quit":
-            print("bye!")
+        replies = respond_all(sess, parse_intents(text), args.out)
+        for reply in replies:
+            print("bye!" if reply is None else reply)
+        if replies and replies[-1] is None:
             break
-        elif intent.name == "help":
-            print(WELCOME)
-        elif intent.name == "set_dates":
-            print(sess.set_dates(intent.slots.get("start"), intent.slots.get("end")))
-        elif intent.name == "set_nonstop":
-            print(sess.set_nonstop(intent.slots["prefer_nonstop"]))
-        elif intent.name == "set_start_hotel":
-            print(sess.set_start_hotel(intent.slots["hotel"]))
-        elif intent.name == "add_alternate_hotel":
-            print(sess.add_alternate(intent.slots["hotel"]))
-        elif intent.name in {"show_plan", "plan_trip"}:
-            print(sess.generate_plan(args.out))
-            if sess.last_markdown_path:
-                print(f"(open {sess.last_markdown_path})")
-        else:
-            # Fallback: try to generate a plan
-            print(sess.generate_plan(args.out))
 
 if __name__ == "__main__":
     main()
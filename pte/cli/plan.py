@@ -1,13 +1,14 @@
 from __future__ import annotations
 import argparse, os
+from datetime import datetime
 from getpass import getuser
+from typing import Dict, List, Optional
 
 from pte.utils.date_utils import parse_date_or_none, validate_date_range
-from pte.engine.models import Trip, Recommendation
-from pte.engine.scorer import score_flight, score_stay
-from pte.engine.render_markdown import render_markdown
-from pte.providers.flights.delta_msp_hnd import propose_flights
-from pte.providers.hotels.hyatt import load_calendars_for_trip, allocate_hyatt_stay
+from pte.utils.profiling import add_profile_args, config_from_args, profiled
+from pte.engine.models import Trip
+from pte.engine.pipeline import default_pipeline
+from pte.engine.render_markdown import content_hash
 
 def prompt_if_missing(args):
     start = parse_date_or_none(args.start)
@@ -29,7 +30,14 @@ def prompt_if_missing(args):
     alternates = args.alternates or (["Andaz Tokyo Toranomon Hills"] if start_hotel == "Park Hyatt Tokyo" else ["Park Hyatt Tokyo"])
     return start, end, bool(prefer_nonstop), start_hotel, alternates
 
-def main():
+def parse_calendar_files(pairs: Optional[List[str]]) -> Dict[str, str]:
+    import_paths = {}
+    for kv in pairs or []:
+        if "=" not in kv: raise SystemExit("Use --calendar-file 'Hotel Name=path'")
+        k, v = kv.split("=", 1); import_paths[k.strip()] = v.strip()
+    return import_paths
+
+def main(argv=None):
     ap = argparse.ArgumentParser(description="Plan Tokyo (MSP→HND) with Hyatt strategy.")
     ap.add_argument("--origin", default="MSP")
     ap.add_argument("--destination", default="HND")
@@ -43,7 +51,22 @@ def main():
     ap.add_argument("--prefer-single-hotel", action="store_true")
     ap.add_argument("--noninteractive", action="store_true")
     ap.add_argument("--out", default=f"out/tokyo-plan-{getuser()}.md")
-    args = ap.parse_args()
+    ap.add_argument("--generated-at", type=datetime.fromisoformat,
+                    help="Fixed 'Generated' timestamp (ISO) for reproducible output")
+    ap.add_argument("--no-timestamp", action="store_true", help="Omit the 'Generated' footer")
+    ap.add_argument("--batch", metavar="TRIPS", help="Plan every trip in a .csv or .jsonl file (see pte.cli.batch)")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes for --batch")
+    ap.add_argument("--out-dir", default="out/batch", help="--batch: one markdown file per trip here")
+    ap.add_argument("--jsonl", help="--batch: write one combined JSONL file instead of per-trip files")
+    add_profile_args(ap)
+    args = ap.parse_args(argv)
+    with profiled("plan-batch" if args.batch else "plan", config_from_args(args)):
+        run(args)
+
+def run(args):
+    if args.batch:
+        from .batch import run_batch
+        raise SystemExit(run_batch(args))
 
     start, end, prefer_nonstop, start_hotel, alternates = prompt_if_missing(args)
 
@@ -52,27 +75,14 @@ def main():
                 prefer_nonstop=prefer_nonstop,
                 hotel_primary=start_hotel, hotel_alternates=alternates)
 
-    flights = propose_flights(trip)
-    for f in flights: score_flight(f)
-
-    import_paths = None
-    if args.calendar_mode == "import":
-        import_paths = {}
-        for kv in args.calendar_file or []:
-            if "=" not in kv: raise SystemExit("Use --calendar-file 'Hotel Name=path'")
-            k, v = kv.split("=", 1); import_paths[k.strip()] = v.strip()
-
-    calendars = load_calendars_for_trip(trip, mode=args.calendar_mode, import_paths=import_paths)
-    stay = allocate_hyatt_stay(trip, start_hotel=start_hotel, alternates=alternates,
-                               calendars=calendars, prefer_single_hotel=args.prefer_single_hotel)
-
-    rec = Recommendation(trip=trip, flights=flights, stay=stay)
-    _ = score_stay(stay)
-
-    md = render_markdown(rec)
+    import_paths = parse_calendar_files(args.calendar_file) if args.calendar_mode == "import" else None
+    pipeline = default_pipeline().warm(import_paths)
+    rec = pipeline.plan(trip, calendar_mode=args.calendar_mode, import_paths=import_paths,
+                        prefer_single_hotel=args.prefer_single_hotel)
+    md = pipeline.render(rec, generated_at=args.generated_at, include_timestamp=not args.no_timestamp)
     os.makedirs(os.path.dirname(args.out), exist_ok=True)
     with open(args.out, "w", encoding="utf-8") as f: f.write(md)
-    print(f"Wrote {args.out}")
+    print(f"Wrote {args.out} (sha256 {content_hash(md)[:16]})")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,110 @@
+# pte/cli/replay.py
+"""
+``python -m pte.cli.chat --replay a.txt b.txt``: drive the chat loop from recorded transcripts.
+
+A transcript has one user message per line. Blank lines and ``#`` comments
+are skipped, and a leading ``you>`` prompt is stripped, so a copied
+terminal session replays as-is. Each transcript gets a fresh Session. The
+report gives intent counts and latency percentiles: per-message parse time,
+the full reply, and plan generation on its own.
+"""
+from __future__ import annotations
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+from pte.bench.runner import format_table, summarize
+from pte.nlp.intent import parse_intents
+from .chat import make_session, respond_all
+
+@dataclass
+class ReplayResult:
+    path: str
+    messages: int = 0
+    intents: Counter = field(default_factory=Counter)
+    parse_s: List[float] = field(default_factory=list)
+    reply_s: List[float] = field(default_factory=list)
+    plan_s: List[float] = field(default_factory=list)
+    transcript: List[Tuple[str, str]] = field(default_factory=list)   # (message, reply), with --verbose
+
+def read_transcript(path: str) -> List[str]:
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    out = []
+    for line in lines:
+        text = line.strip()
+        if text.startswith("you>"):
+            text = text[4:].strip()
+        if text and not text.startswith("#"):
+            out.append(text)
+    return out
+
+def replay(path: str, messages: List[str], options: Dict[str, Any]) -> ReplayResult:
+    result = ReplayResult(path)
+    sess = make_session(options["calendar_mode"], options["calendar_file"], options["prefer_single_hotel"])
+    with tempfile.TemporaryDirectory() as tmp:
+        out_path = os.path.join(tmp, "plan.md")
+        for text in messages:
+            last_plan = sess.last_markdown
+            t0 = time.perf_counter()
+            intents = parse_intents(text)
+            t1 = time.perf_counter()
+            replies = respond_all(sess, intents, out_path)
+            t2 = time.perf_counter()
+            result.messages += 1
+            result.intents.update(i.name for i in intents[:len(replies)])
+            result.parse_s.append(t1 - t0)
+            result.reply_s.append(t2 - t0)
+            if sess.last_markdown is not last_plan:      # a plan was generated
+                result.plan_s.append(t2 - t1)
+            if options["verbose"]:
+                result.transcript.append((text, "\n".join("bye!" if r is None else r for r in replies)))
+            if replies and replies[-1] is None:
+                break
+    return result
+
+def _replay_file(job: Tuple[str, List[str], Dict[str, Any]]) -> ReplayResult:
+    return replay(*job)
+
+def report(results: List[ReplayResult], elapsed: float, jobs: int) -> str:
+    messages = sum(r.messages for r in results)
+    intents = sum((r.intents for r in results), Counter())
+    rate = messages / elapsed if elapsed else 0.0
+    lines = [f"Replayed {len(results)} transcript{'s' if len(results) != 1 else ''}, {messages} messages "
+             f"in {elapsed:.2f}s ({rate:,.1f} msg/s, {jobs} job{'s' if jobs != 1 else ''})", ""]
+    width = max((len(n) for n in intents), default=6)
+    lines.append(f"{'intent'.ljust(width)}  count")
+    lines.extend(f"{name.ljust(width)}  {count:5d}" for name, count in intents.most_common())
+    stages = [(name, [t for r in results for t in getattr(r, attr)])
+              for name, attr in (("parse", "parse_s"), ("reply", "reply_s"), ("plan", "plan_s"))]
+    rows = [summarize(name, {}, timings) for name, timings in stages if timings]
+    if rows:
+        lines += ["", format_table(rows, title="latency")]
+    return "\n".join(lines)
+
+def run_replay(args) -> int:
+    options = {"calendar_mode": args.calendar_mode, "calendar_file": args.calendar_file,
+               "prefer_single_hotel": args.prefer_single_hotel, "verbose": args.verbose}
+    # Read up front so stdin is consumed in this process.
+    jobs_in = [(path, read_transcript(path), options) for path in args.replay]
+    jobs = max(1, min(args.jobs, len(jobs_in)))
+    t0 = time.perf_counter()
+    if jobs == 1:
+        results = [_replay_file(j) for j in jobs_in]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_replay_file, jobs_in))
+    elapsed = time.perf_counter() - t0
+    for r in results:
+        for text, reply in r.transcript:
+            print(f"[{r.path}] you> {text}\n{reply}")
+    print(report(results, elapsed, jobs))
+    return 0
@@ -0,0 +1,173 @@
+"""Joint outbound/return date + hotel optimizer.
+
+Every candidate (outbound, return) pair inside a flexible window is priced in
+O(1) from per-day arrays: cheapest award miles each way, and prefix sums over
+the hotel calendars (cheapest hotel per night, per-hotel totals, switch counts
+and unavailable nights). A cheap lower bound rejects pairs over budget before
+the single-hotel variants are priced, and the survivors are reduced to the
+Pareto frontier over (points, cash, nonstop, hotel switches). Unknown
+nonstop ranks as not nonstop, so dominance stays a partial order.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from datetime import date, timedelta
+from itertools import accumulate
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+
+if TYPE_CHECKING:
+    from pte.providers.flights.awards import AwardCalendar
+    from pte.providers.flights.schedule import ScheduleStore
+    from pte.providers.hotels.hyatt import HyattCalendar
+
+@dataclass
+class DateOption:
+    outbound: date
+    return_date: date
+    points: int
+    cash: float
+    nonstop: Optional[bool]     # None when the schedule is unknown
+    hotel_switches: int
+    flight_points: int
+    hotel_points: int
+    hotel: str              # hotel name, or "mixed" when switching nightly
+
+    @property
+    def nights(self) -> int:
+        return (self.return_date - self.outbound).days
+
+def _prefix(values: Sequence[float]) -> List[float]:
+    return [0.0] + list(accumulate(values))
+
+def _nonstop(o: DateOption) -> bool:
+    """Only a known nonstop counts; unknown ranks with one-stop."""
+    return o.nonstop is True
+
+def _dominates(a: DateOption, b: DateOption) -> bool:
+    no_worse = (a.points <= b.points and a.cash <= b.cash
+                and _nonstop(a) >= _nonstop(b) and a.hotel_switches <= b.hotel_switches)
+    better = (a.points < b.points or a.cash < b.cash
+              or _nonstop(a) > _nonstop(b) or a.hotel_switches < b.hotel_switches)
+    return no_worse and better
+
+def _both_nonstop(a: Optional[bool], b: Optional[bool]) -> Optional[bool]:
+    if a is False or b is False:
+        return False
+    if a is None or b is None:
+        return None
+    return True
+
+def pareto_frontier(options: Sequence[DateOption]) -> List[DateOption]:
+    """Non-dominated options, cheapest points first."""
+    frontier: List[DateOption] = []
+    for opt in sorted(options, key=lambda o: (o.points, o.cash, not _nonstop(o), o.hotel_switches)):
+        # Sorted by points first, so a later option can never dominate an earlier one
+        # on points; it only needs checking against what is already on the frontier.
+        if not any(_dominates(f, opt) or _same(f, opt) for f in frontier):
+            frontier.append(opt)
+    return frontier
+
+def _same(a: DateOption, b: DateOption) -> bool:
+    return (a.points, a.cash, _nonstop(a), a.hotel_switches) == (b.points, b.cash, _nonstop(b), b.hotel_switches)
+
+def optimize_dates(origin: str, destination: str, earliest: date, latest: date,
+                   calendars: Dict[str, "HyattCalendar"], awards: Optional["AwardCalendar"] = None,
+                   min_nights: int = 1, max_nights: int = 14, pax: int = 2, cabin: str = "business",
+                   budget_points: Optional[int] = None, budget_cash: Optional[float] = None,
+                   cash_fare: Optional[float] = None,
+                   schedule: Optional["ScheduleStore"] = None) -> List[DateOption]:
+    """Pareto frontier of outbound/return dates between ``earliest`` and ``latest``.
+
+    Flights are priced from award space (miles per passenger x ``pax``); when no
+    award seat exists for a day, ``cash_fare`` (per passenger, per direction) is
+    used if given, otherwise that day is not bookable. Without ``awards`` only
+    the hotels are priced. Hotels are priced from the
+    points calendars, either switching to the cheapest hotel each night or staying
+    in one hotel throughout.
+
+    ``nonstop`` describes the itinerary flown. Award space is held per direct
+    origin→destination flight, so an award-priced direction is nonstop. Any
+    other day is nonstop if ``schedule`` has a direct leg that day. Without a
+    schedule it is None.
+    """
+    span = (latest - earliest).days + 1
+    if span <= 1 or not calendars:
+        return []
+
+    # Per-day flight prices (index = days since earliest).
+    fallback_cash = float(cash_fare) * pax if cash_fare is not None else None
+
+    def direct(a: str, b: str) -> List[Optional[bool]]:
+        """Per day: does the schedule have a direct a→b leg? None without a schedule."""
+        if schedule is None:
+            return [None] * span
+        return [bool(schedule.nonstops(a, b, earliest + timedelta(days=i))) for i in range(span)]
+
+    def flight(miles: int, nonstop: Optional[bool]):
+        """(points, cash, nonstop) for one direction on one day, or None if not bookable."""
+        if miles:
+            return miles, 0.0, True
+        if fallback_cash is not None:
+            return 0, fallback_cash, nonstop
+        return None
+
+    out_direct, ret_direct = direct(origin, destination), direct(destination, origin)
+    if awards is not None:
+        out_miles = awards.cheapest_by_day(origin, destination, earliest, latest, cabin, pax)
+        ret_miles = awards.cheapest_by_day(destination, origin, earliest, latest, cabin, pax)
+        out_price = [flight(int(m) * pax, d) for m, d in zip(out_miles, out_direct)]
+        ret_price = [flight(int(m) * pax, d) for m, d in zip(ret_miles, ret_direct)]
+    else:
+        # No award data: optimize hotels only; flights are unpriced.
+        out_price = [(0, 0.0, d) for d in out_direct]
+        ret_price = [(0, 0.0, d) for d in ret_direct]
+
+    # Hotel prefix sums over nights (night i = earliest + i).
+    hotels = list(calendars)
+    first = earliest.toordinal()
+    per_hotel = {h: calendars[h].points_between(first, first + span - 1) for h in hotels}
+    hotel_sum = {h: _prefix([p if p is not None else 0 for p in v]) for h, v in per_hotel.items()}
+    hotel_gaps = {h: _prefix([p is None for p in v]) for h, v in per_hotel.items()}
+    cheapest, choice = [], []
+    for i in range(span - 1):
+        best = min(((per_hotel[h][i], h) for h in hotels if per_hotel[h][i] is not None), default=(None, None))
+        cheapest.append(best[0])
+        choice.append(best[1])
+    cheap_sum = _prefix([p if p is not None else 0 for p in cheapest])
+    cheap_gaps = _prefix([p is None for p in cheapest])
+    # changes[i] == 1 when night i uses a different hotel than night i-1
+    switch_sum = _prefix([0] + [int(choice[i] != choice[i - 1]) for i in range(1, len(choice))])
+
+    candidates: List[DateOption] = []
+    for o in range(span - min_nights):
+        op = out_price[o]
+        if op is None:
+            continue
+        # Even the cheapest return can't rescue this outbound if the flight alone is over budget.
+        if budget_points is not None and op[0] > budget_points:
+            continue
+        for r in range(o + min_nights, min(o + max_nights, span - 1) + 1):
+            rp = ret_price[r]
+            if rp is None or cheap_gaps[r] - cheap_gaps[o]:
+                continue
+            flight_pts = op[0] + rp[0]
+            cash = op[1] + rp[1]
+            nonstop = _both_nonstop(op[2], rp[2])
+            lower = flight_pts + int(cheap_sum[r] - cheap_sum[o])
+            if budget_points is not None and lower > budget_points:
+                continue
+            if budget_cash is not None and cash > budget_cash:
+                continue
+            out_d, ret_d = date.fromordinal(first + o), date.fromordinal(first + r)
+            hotel_pts = int(cheap_sum[r] - cheap_sum[o])
+            switches = int(switch_sum[r] - switch_sum[o + 1])
+            candidates.append(DateOption(out_d, ret_d, flight_pts + hotel_pts, cash, nonstop, switches,
+                                         flight_pts, hotel_pts, choice[o] if not switches else "mixed"))
+            for h in hotels:
+                if hotel_gaps[h][r] - hotel_gaps[h][o]:
+                    continue
+                pts = int(hotel_sum[h][r] - hotel_sum[h][o])
+                if budget_points is not None and flight_pts + pts > budget_points:
+                    continue
+                candidates.append(DateOption(out_d, ret_d, flight_pts + pts, cash, nonstop, 0,
+                                             flight_pts, pts, h))
+    return pareto_frontier(candidates)
@@ -0,0 +1,57 @@
+"""Integer day ordinals.
+
+Hot loops walk trips and calendars as ``int`` days (``date.toordinal()``, the
+same indexing the award calendar uses) instead of allocating and hashing a
+``date`` per night. Convert with ``to_date`` only where a date leaves the
+engine (rendering, the API). The numpy helpers work on whole arrays of days.
+"""
+from __future__ import annotations
+from datetime import date
+from typing import Iterator
+import numpy as np
+
+# date(1970, 1, 1).toordinal(); numpy's datetime64[D] counts days from here.
+EPOCH = 719163
+
+def to_day(d: date) -> int:
+    return d.toordinal()
+
+def to_date(day: int) -> date:
+    return date.fromordinal(day)
+
+def day_range(start: date, end: date) -> range:
+    """Days from ``start`` up to, not including, ``end`` (the nights of a stay)."""
+    return range(start.toordinal(), end.toordinal())
+
+def dates(start: date, end: date) -> Iterator[date]:
+    return map(date.fromordinal, day_range(start, end))
+
+def weekday(day: int) -> int:
+    """Monday == 0, like ``date.weekday()``."""
+    return (day + 6) % 7
+
+# --- Vectorized -------------------------------------------------------------
+
+def day_array(start: date, end: date) -> np.ndarray:
+    return np.arange(start.toordinal(), end.toordinal(), dtype=np.int64)
+
+def weekdays(days: np.ndarray) -> np.ndarray:
+    return (days + 6) % 7
+
+def weekday_mask(days: np.ndarray, allowed) -> np.ndarray:
+    """True where the day falls on one of ``allowed`` weekdays (Monday == 0)."""
+    return np.isin(weekdays(days), list(allowed))
+
+def to_datetime64(days: np.ndarray) -> np.ndarray:
+    return (np.asarray(days, dtype=np.int64) - EPOCH).astype("datetime64[D]")
+
+def months(days: np.ndarray) -> np.ndarray:
+    """Months since 1970-01 for each day (equal values = same calendar month)."""
+    return to_datetime64(days).astype("datetime64[M]").astype(np.int64)
+
+def month_starts(days: np.ndarray) -> np.ndarray:
+    """Indices into ``days`` where a new calendar month begins (always includes 0)."""
+    if len(days) == 0:
+        return np.zeros(0, dtype=np.int64)
+    m = months(days)
+    return np.flatnonzero(np.concatenate(([True], m[1:] != m[:-1])))
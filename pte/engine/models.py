@@ -1,7 +1,9 @@
 from __future__ import annotations
+import sys
 from dataclasses import dataclass, field
 from datetime import date
-from typing import List, Optional
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+from .days import dates
 
 @dataclass
 class Trip:
@@ -30,10 +32,12 @@ class FlightOption:
     duration_minutes: Optional[int] = None
     score: float = 0.0
     rationale: str = ""
+    points_price: Optional[int] = None   # award miles per passenger, when award space is known
+    award_seats: Optional[int] = None
 
-@dataclass
+@dataclass(slots=True)
 class HotelNight:
-    date: date
+    day: int                     # day ordinal, see pte.engine.days
     hotel_name: str
     program: str
     points_price: Optional[int]
@@ -41,13 +45,86 @@ class HotelNight:
     is_peak: Optional[bool]
     notes: str = ""
 
-@dataclass
+    def __post_init__(self):
+        if isinstance(self.day, date):
+            raise TypeError("HotelNight.day is a day ordinal; build from a date with HotelNight.from_date")
+        # Long stays repeat a handful of names; share one string per name.
+        self.hotel_name = sys.intern(self.hotel_name)
+        self.program = sys.intern(self.program)
+
+    @classmethod
+    def from_date(cls, date: date, *args, **kwargs) -> "HotelNight":
+        """Construct from a calendar date, as ``HotelNight(date=...)`` used to."""
+        return cls(date.toordinal(), *args, **kwargs)
+
+    @property
+    def date(self) -> date:
+        return date.fromordinal(self.day)
+
+@dataclass(slots=True)
+class HotelTotals:
+    nights: int = 0
+    points: int = 0
+    cash: float = 0.0
+
 class StayPlan:
-    nights: List[HotelNight] = field(default_factory=list)
+    """
+    Nights in date order. Totals and per-hotel aggregates are kept up to date
+    as nights are added, so reading them is O(1). ``nights`` is a read-only
+    tuple; add nights with ``add`` or ``extend``.
+    """
+    __slots__ = ("_nights", "_view", "_points", "_cash", "_by_hotel")
+
+    def __init__(self, nights: Iterable[HotelNight] = ()):
+        self._nights: List[HotelNight] = []
+        self._view: Optional[Tuple[HotelNight, ...]] = ()
+        self._points = 0
+        self._cash = 0.0
+        self._by_hotel: Dict[str, HotelTotals] = {}
+        self.extend(nights)
+
+    def add(self, night: HotelNight) -> None:
+        self._nights.append(night)
+        self._view = None
+        agg = self._by_hotel.get(night.hotel_name)
+        if agg is None:
+            agg = self._by_hotel[night.hotel_name] = HotelTotals()
+        agg.nights += 1
+        if night.points_price is not None:
+            self._points += night.points_price
+            agg.points += night.points_price
+        if night.cash_price is not None:
+            self._cash += night.cash_price
+            agg.cash += night.cash_price
+
+    def extend(self, nights: Iterable[HotelNight]) -> None:
+        for n in nights:
+            self.add(n)
+
+    @property
+    def nights(self) -> Tuple[HotelNight, ...]:
+        if self._view is None:
+            self._view = tuple(self._nights)
+        return self._view
+
     def total_points(self) -> int:
-        return sum(n.points_price for n in self.nights if n.points_price is not None)
+        return self._points
+
     def total_cash(self) -> float:
-        return sum(n.cash_price for n in self.nights if n.cash_price is not None)
+        return self._cash
+
+    def by_hotel(self) -> Mapping[str, HotelTotals]:
+        """Nights, points and cash per hotel, in order of first stay."""
+        return self._by_hotel
+
+    def __len__(self) -> int:
+        return len(self._nights)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, StayPlan) and self._nights == other._nights
+
+    def __repr__(self) -> str:
+        return f"StayPlan(nights={self._nights!r})"
 
 @dataclass
 class Recommendation:
@@ -57,9 +134,6 @@ class Recommendation:
     summary: str = ""
     caveats: List[str] = field(default_factory=list)
 
-def daterange(start: date, end: date):
-    from datetime import timedelta
-    d = start
-    while d < end:
-        yield d
-        d += timedelta(days=1)
+def daterange(start: date, end: date) -> Iterator[date]:
+    """Nights from ``start`` to ``end``; hot loops should walk ``days.day_range`` instead."""
+    return dates(start, end)
@@ -0,0 +1,133 @@
+# pte/engine/pipeline.py
+"""
+The planning pipeline: flights -> score -> calendars -> allocate -> score -> render.
+
+Every entry point plans through ``default_pipeline()``: the CLIs, the API,
+Session, the webapp and cli/play.py. The pipeline is built once per process.
+Its ProviderRegistry holds the flight provider (with its schedule and award
+data) and parsed import calendars, re-read only when a file changes. Call
+``warm()`` at startup so the first plan doesn't pay for loading them.
+Flights are scored with the pipeline's FlightWeights; set PTE_FLIGHT_WEIGHTS
+to a JSON file of overrides to configure the process-wide pipeline.
+
+Hooks wrap each stage: ``hook(stage_name, run)`` must call ``run()`` and
+return its result. They can time a stage, cache it or short-circuit it.
+"""
+from __future__ import annotations
+import os
+import threading
+from functools import lru_cache, partial
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from pte.providers.flights.delta_msp_hnd import default_awards, default_schedule, propose_flights
+from pte.providers.hotels.hyatt import (HyattCalendar, allocate_hyatt_stay, load_calendar_from_import,
+                                        load_calendars_for_trip)
+from pte.utils.metrics import record_cache, stage
+from .models import FlightOption, Recommendation, Trip
+from .render_markdown import render_markdown
+from .scorer import FlightWeights, load_flight_weights, score_flights, score_stay
+
+WEIGHTS_ENV = "PTE_FLIGHT_WEIGHTS"
+
+Hook = Callable[[str, Callable[[], Any]], Any]
+
+def stage_timing_hook(name: str, run: Callable[[], Any]) -> Any:
+    """Record each stage in pte_stage_duration_seconds and the request's Server-Timing."""
+    with stage(name):
+        return run()
+
+class ProviderRegistry:
+    """Providers and the data they load, shared by every plan in the process."""
+
+    def __init__(self, flights: Callable[[Trip], List[FlightOption]] = propose_flights):
+        self.flights = flights
+        self._calendar_files: Dict[str, Tuple[int, HyattCalendar]] = {}
+        self._lock = threading.Lock()
+
+    def warm(self, import_paths: Optional[Mapping[str, str]] = None) -> None:
+        """Load the flight schedule and award space (when configured) and any import calendars."""
+        default_schedule()
+        default_awards()
+        for path in (import_paths or {}).values():
+            self.calendar_file(path)
+
+    def calendar_file(self, path: str) -> HyattCalendar:
+        """A parsed import calendar; the file is only re-read when its mtime changes."""
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Calendar file not found: {path}")
+        mtime = os.stat(path).st_mtime_ns
+        with self._lock:
+            cached = self._calendar_files.get(path)
+        if cached is not None and cached[0] == mtime:
+            record_cache("calendar_file", True)
+            return cached[1]
+        record_cache("calendar_file", False)
+        calendar = load_calendar_from_import(path)
+        with self._lock:
+            self._calendar_files[path] = (mtime, calendar)
+        return calendar
+
+    def calendars(self, trip: Trip, mode: str = "fixture",
+                  import_paths: Optional[Mapping[str, str]] = None) -> Dict[str, HyattCalendar]:
+        if mode != "import":
+            return load_calendars_for_trip(trip, mode=mode)
+        if not import_paths:
+            raise ValueError("import_paths required for 'import' mode")
+        return {h: self.calendar_file(import_paths[h]) for h in [trip.hotel_primary] + trip.hotel_alternates}
+
+class PlanningPipeline:
+    def __init__(self, registry: Optional[ProviderRegistry] = None, hooks: Tuple[Hook, ...] = (),
+                 weights: Optional[FlightWeights] = None):
+        self.registry = registry or ProviderRegistry()
+        self.hooks: List[Hook] = list(hooks)
+        self.weights = weights or FlightWeights()
+
+    def add_hook(self, hook: Hook) -> None:
+        if hook not in self.hooks:
+            self.hooks.append(hook)
+
+    def warm(self, import_paths: Optional[Mapping[str, str]] = None) -> "PlanningPipeline":
+        self.registry.warm(import_paths)
+        return self
+
+    def _run(self, name: str, fn: Callable, *args, **kwargs) -> Any:
+        if not self.hooks:
+            return fn(*args, **kwargs)
+        run = partial(fn, *args, **kwargs)
+        for hook in reversed(self.hooks):        # first hook is outermost
+            run = partial(hook, name, run)
+        return run()
+
+    def stages(self, trip: Trip, calendar_mode: str = "fixture", import_paths: Optional[Mapping[str, str]] = None,
+               calendars: Optional[Dict[str, HyattCalendar]] = None,
+               prefer_single_hotel: bool = False) -> Iterator[Tuple[str, Any]]:
+        """Yield ("flights", [FlightOption]) then ("stay", StayPlan) as each is ready.
+        Pass ``calendars`` to skip loading them (e.g. already-parsed uploads)."""
+        flights = self._run("flights", self.registry.flights, trip)
+        self._run("score", score_flights, flights, self.weights)
+        yield "flights", flights
+        if calendars is None:
+            calendars = self._run("calendars", self.registry.calendars, trip, calendar_mode, import_paths)
+        stay = self._run("allocate", allocate_hyatt_stay, trip, trip.hotel_primary, trip.hotel_alternates,
+                         calendars, prefer_single_hotel)
+        self._run("score", score_stay, stay)
+        yield "stay", stay
+
+    def plan(self, trip: Trip, **kwargs) -> Recommendation:
+        """Flights and stay for ``trip``; keyword arguments as for ``stages``."""
+        sections = dict(self.stages(trip, **kwargs))
+        return Recommendation(trip=trip, flights=sections["flights"], stay=sections["stay"])
+
+    def render(self, rec: Recommendation, **kwargs) -> str:
+        """Markdown for ``rec``; keyword arguments go to render_markdown."""
+        return self._run("render", render_markdown, rec, **kwargs)
+
+def default_weights() -> Optional[FlightWeights]:
+    """Flight weights from PTE_FLIGHT_WEIGHTS, or None for the defaults."""
+    path = os.environ.get(WEIGHTS_ENV)
+    return load_flight_weights(path) if path else None
+
+@lru_cache(maxsize=1)
+def default_pipeline() -> PlanningPipeline:
+    """The process-wide pipeline."""
+    return PlanningPipeline(weights=default_weights())
@@ -1,35 +1,239 @@
 from __future__ import annotations
+import hashlib
+import html
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from datetime import datetime
-from .models import Recommendation
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from pte.utils.metrics import record_cache
+from .models import FlightOption, HotelNight, Recommendation
 
-def render_markdown(rec: Recommendation) -> str:
+# --- Static sections (compiled once at import) -----------------------------
+
+FLIGHT_REFERENCES: Tuple[Tuple[str, str], ...] = (
+    ("FlightsFrom MSP→HND", "https://www.flightsfrom.com/MSP-HND"),
+    ("FlightConnections MSP→HND", "https://www.flightconnections.com/flights-from-msp-to-hnd"),
+    ("MSP Nonstop map", "https://www.mspairport.com/flights-airlines/nonstop-route-map"),
+)
+HOTEL_REFERENCES: Tuple[Tuple[str, str], ...] = (
+    ("Park Hyatt Tokyo (Reopened Dec 9, 2025; Cat 8 35k/40k/45k)",
+     "https://newsroom.hyatt.com/120925-Park-Hyatt-Tokyo-Reopens-Following-19-Month-Renovation"),
+    ("Park Hyatt points context", "https://thepointsguy.com/news/park-hyatt-tokyo-with-points/"),
+    ("Andaz Tokyo", "https://www.hyatt.com/andaz/en-US/tyoaz-andaz-tokyo-toranomon-hills"),
+    ("Andaz review & points", "https://thepointsguy.com/hotel/reviews/hyatt-andaz-tokyo-toranomon-hills/"),
+)
+
+def _md_refs(title: str, refs: Tuple[Tuple[str, str], ...]) -> str:
+    return "\n".join([f"**{title}**"] + [f"- {label}: {url}" for label, url in refs])
+
+def _html_refs(title: str, refs: Tuple[Tuple[str, str], ...]) -> str:
+    items = "".join(f'<li>{html.escape(label)}: <a href="{html.escape(url)}">{html.escape(url)}</a></li>'
+                    for label, url in refs)
+    return f"<p><strong>{html.escape(title)}</strong></p><ul>{items}</ul>"
+
+MD_FLIGHT_REFS = "\n" + _md_refs("Flight references", FLIGHT_REFERENCES) + "\n"
+MD_HOTELS_HEADING = "## Hotels (night-by-night)"
+MD_HOTEL_REFS = _md_refs("Hotel references", HOTEL_REFERENCES)
+HTML_FLIGHT_REFS = _html_refs("Flight references", FLIGHT_REFERENCES)
+HTML_HOTEL_REFS = _html_refs("Hotel references", HOTEL_REFERENCES)
+
+# --- Intermediate structure -------------------------------------------------
+
+@dataclass
+class PlanDocument:
+    """Format-neutral view of a Recommendation shared by all renderers."""
+    origin: str
+    destination: str
+    when: str
+    cabin: str
+    prefer_nonstop: bool
+    hotel_primary: str
+    hotel_alternates: List[str]
+    flights: List[FlightOption]
+    nights: Sequence[HotelNight]
+    total_points: int
+    total_cash: float
+    generated: Optional[str] = None
+    caveats: List[str] = field(default_factory=list)
+
+def _generated_stamp(generated_at: Optional[datetime], include_timestamp: bool) -> Optional[str]:
+    if not include_timestamp:
+        return None
+    return (generated_at or datetime.now()).isoformat(timespec="minutes")
+
+def build_document(rec: Recommendation, generated_at: Optional[datetime] = None,
+                   include_timestamp: bool = True) -> PlanDocument:
+    """Pass ``generated_at`` (or ``include_timestamp=False``) for byte-stable output."""
     t = rec.trip
     when = f"{t.start_date} → {t.end_date}" if t.start_date and t.end_date else "(dates not set)"
-    lines = []
-    lines.append(f"# Tokyo Plan ({t.origin} → {t.destination})")
-    lines.append(f"- **Dates**: {when}")
-    lines.append(f"- **Cabin**: {t.cabin_pref} | **Prefer Nonstop**: {t.prefer_nonstop}")
-    lines.append(f"- **Hotels**: start at **{t.hotel_primary}**, consider **{', '.join(t.hotel_alternates)}**\n")
-    lines.append("## Flights")
-    for f in rec.flights:
-        lines.append(f"- **{f.carrier} {', '.join(f.flight_numbers)}** — {'Nonstop' if f.nonstop else '1-stop'}; "
-                     f"Score: {f.score:.1f}. {f.rationale}")
-    lines.append("\n**Flight references**")
-    lines.append("- FlightsFrom MSP→HND: https://www.flightsfrom.com/MSP-HND")
-    lines.append("- FlightConnections MSP→HND: https://www.flightconnections.com/flights-from-msp-to-hnd")
-    lines.append("- MSP Nonstop map: https://www.mspairport.com/flights-airlines/nonstop-route-map\n")
-    lines.append("## Hotels (night-by-night)")
-    pts = 0
-    for n in rec.stay.nights:
-        peak = " (peak)" if n.is_peak else ""
-        pp = f"{n.points_price:,} pts" if n.points_price is not None else "—"
-        lines.append(f"- {n.date}: **{n.hotel_name}**{peak} — {pp}")
-        if n.points_price: pts += n.points_price
-    lines.append(f"\n**Total points**: {pts:,}\n")
-    lines.append("**Hotel references**")
-    lines.append("- Park Hyatt Tokyo (Reopened Dec 9, 2025; Cat 8 35k/40k/45k): https://newsroom.hyatt.com/120925-Park-Hyatt-Tokyo-Reopens-Following-19-Month-Renovation")
-    lines.append("- Park Hyatt points context: https://thepointsguy.com/news/park-hyatt-tokyo-with-points/")
-    lines.append("- Andaz Tokyo: https://www.hyatt.com/andaz/en-US/tyoaz-andaz-tokyo-toranomon-hills")
-    lines.append("- Andaz review & points: https://thepointsguy.com/hotel/reviews/hyatt-andaz-tokyo-toranomon-hills/")
-    lines.append(f"\n_Generated: {datetime.now().isoformat(timespec='minutes')}_")
+    return PlanDocument(
+        origin=t.origin, destination=t.destination, when=when,
+        cabin=t.cabin_pref, prefer_nonstop=t.prefer_nonstop,
+        hotel_primary=t.hotel_primary, hotel_alternates=t.hotel_alternates,
+        flights=rec.flights, nights=rec.stay.nights,
+        total_points=rec.stay.total_points(), total_cash=rec.stay.total_cash(),
+        generated=_generated_stamp(generated_at, include_timestamp),
+        caveats=rec.caveats,
+    )
+
+# --- Flight sections (cached by flight set and format) ------------------------
+
+FlightRow = Tuple[str, Tuple[str, ...], bool, float, str, Optional[int]]
+FLIGHT_SECTION_CACHE_SIZE = 512
+
+def _flight_rows(flights: Sequence[FlightOption]) -> Tuple[FlightRow, ...]:
+    """Every field a flight section shows; doubles as the cache key."""
+    return tuple((f.carrier, tuple(f.flight_numbers), f.nonstop, f.score, f.rationale, f.points_price)
+                 for f in flights)
+
+def _md_flights(rows: Tuple[FlightRow, ...]) -> str:
+    lines = ["## Flights"]
+    for carrier, numbers, nonstop, score, rationale, points in rows:
+        award = f" Award: {points:,} miles." if points else ""
+        lines.append(f"- **{carrier} {', '.join(numbers)}** — {'Nonstop' if nonstop else '1-stop'}; "
+                     f"Score: {score:.1f}. {rationale}{award}")
     return "\n".join(lines)
+
+def _html_flights(rows: Tuple[FlightRow, ...]) -> str:
+    e = html.escape
+    items = "".join(
+        f"<li><strong>{e(carrier)} {e(', '.join(numbers))}</strong> — "
+        f"{'Nonstop' if nonstop else '1-stop'}; Score: {score:.1f}. {e(rationale)}"
+        f"{f' Award: {points:,} miles.' if points else ''}</li>"
+        for carrier, numbers, nonstop, score, rationale, points in rows
+    )
+    return f"<h2>Flights</h2><ul>{items}</ul>"
+
+_FLIGHT_RENDERERS = {"markdown": _md_flights, "html": _html_flights}
+
+class _FlightSectionCache:
+    """Bounded LRU of rendered flight sections; plans render concurrently, so it is locked."""
+
+    def __init__(self, max_entries: int = FLIGHT_SECTION_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._lru: "OrderedDict[Tuple[str, Tuple[FlightRow, ...]], str]" = OrderedDict()
+
+    def section(self, flights: Sequence[FlightOption], mode: str) -> str:
+        key = (mode, _flight_rows(flights))
+        with self._lock:
+            text = self._lru.get(key)
+            if text is not None:
+                self._lru.move_to_end(key)
+        record_cache("flight_section", text is not None)
+        if text is None:
+            text = _FLIGHT_RENDERERS[mode](key[1])
+            with self._lock:
+                self._lru[key] = text
+                while len(self._lru) > self.max_entries:
+                    self._lru.popitem(last=False)
+        return text
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lru.clear()
+
+flight_sections = _FlightSectionCache()
+
+# --- Markdown ---------------------------------------------------------------
+
+@lru_cache(maxsize=1024)
+def _md_night_suffix(hotel_name: str, is_peak: Optional[bool], points: Optional[int]) -> str:
+    peak = " (peak)" if is_peak else ""
+    pp = f"{points:,} pts" if points is not None else "—"
+    return f": **{hotel_name}**{peak} — {pp}"
+
+def markdown_from_document(doc: PlanDocument) -> str:
+    parts = [
+        f"# Tokyo Plan ({doc.origin} → {doc.destination})\n"
+        f"- **Dates**: {doc.when}\n"
+        f"- **Cabin**: {doc.cabin} | **Prefer Nonstop**: {doc.prefer_nonstop}\n"
+        f"- **Hotels**: start at **{doc.hotel_primary}**, consider **{', '.join(doc.hotel_alternates)}**\n",
+        flight_sections.section(doc.flights, "markdown"),
+        MD_FLIGHT_REFS,
+        MD_HOTELS_HEADING,
+    ]
+    parts.extend(f"- {n.date}{_md_night_suffix(n.hotel_name, n.is_peak, n.points_price)}" for n in doc.nights)
+    parts.append(f"\n**Total points**: {doc.total_points:,}\n")
+    parts.append(MD_HOTEL_REFS)
+    if doc.generated:
+        parts.append(f"\n_Generated: {doc.generated}_")
+    return "\n".join(parts)
+
+def render_markdown(rec: Recommendation, generated_at: Optional[datetime] = None,
+                    include_timestamp: bool = True) -> str:
+    return markdown_from_document(build_document(rec, generated_at, include_timestamp))
+
+# --- HTML / JSON ------------------------------------------------------------
+
+def html_from_document(doc: PlanDocument) -> str:
+    e = html.escape
+    parts = [
+        f"<h1>Tokyo Plan ({e(doc.origin)} → {e(doc.destination)})</h1>",
+        "<ul>",
+        f"<li><strong>Dates</strong>: {e(doc.when)}</li>",
+        f"<li><strong>Cabin</strong>: {e(doc.cabin)} | <strong>Prefer Nonstop</strong>: {doc.prefer_nonstop}</li>",
+        f"<li><strong>Hotels</strong>: start at <strong>{e(doc.hotel_primary)}</strong>, "
+        f"consider <strong>{e(', '.join(doc.hotel_alternates))}</strong></li>",
+        "</ul>",
+        flight_sections.section(doc.flights, "html"),
+        HTML_FLIGHT_REFS,
+    ]
+    parts.append("<h2>Hotels (night-by-night)</h2><ul>")
+    parts.extend(
+        f"<li>{n.date}: <strong>{e(n.hotel_name)}</strong>{' (peak)' if n.is_peak else ''} — "
+        f"{f'{n.points_price:,} pts' if n.points_price is not None else '—'}</li>"
+        for n in doc.nights
+    )
+    parts.append("</ul>")
+    parts.append(f"<p><strong>Total points</strong>: {doc.total_points:,}</p>")
+    parts.append(HTML_HOTEL_REFS)
+    if doc.generated:
+        parts.append(f"<p><em>Generated: {e(doc.generated)}</em></p>")
+    return "".join(parts)
+
+def json_from_document(doc: PlanDocument) -> Dict[str, Any]:
+    return {
+        "origin": doc.origin,
+        "destination": doc.destination,
+        "dates": doc.when,
+        "cabin": doc.cabin,
+        "prefer_nonstop": doc.prefer_nonstop,
+        "hotel_primary": doc.hotel_primary,
+        "hotel_alternates": list(doc.hotel_alternates),
+        "flights": [
+            {"carrier": f.carrier, "flight_numbers": list(f.flight_numbers), "nonstop": f.nonstop,
+             "score": f.score, "rationale": f.rationale, "points_price": f.points_price}
+            for f in doc.flights
+        ],
+        "nights": [
+            {"date": n.date.isoformat(), "hotel_name": n.hotel_name, "is_peak": n.is_peak,
+             "points_price": n.points_price}
+            for n in doc.nights
+        ],
+        "total_points": doc.total_points,
+        "total_cash": doc.total_cash,
+        "flight_references": [{"label": l, "url": u} for l, u in FLIGHT_REFERENCES],
+        "hotel_references": [{"label": l, "url": u} for l, u in HOTEL_REFERENCES],
+        "generated": doc.generated,
+    }
+
+def render_html(rec: Recommendation, generated_at: Optional[datetime] = None,
+                include_timestamp: bool = True) -> str:
+    return html_from_document(build_document(rec, generated_at, include_timestamp))
+
+def render_json(rec: Recommendation, generated_at: Optional[datetime] = None,
+                include_timestamp: bool = True) -> Dict[str, Any]:
+    return json_from_document(build_document(rec, generated_at, include_timestamp))
+
+# --- Content hashing ----------------------------------------------------------
+
+def content_hash(content: str | bytes) -> str:
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    return hashlib.sha256(data).hexdigest()
+
+def plan_etag(content: str | bytes) -> str:
+    """Strong HTTP ETag for a rendered plan (quoted, per RFC 9110)."""
+    return f'"{content_hash(content)[:32]}"'
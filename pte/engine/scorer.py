@@ -1,14 +1,72 @@
 from __future__ import annotations
+import json
+from dataclasses import dataclass, fields
+from typing import Dict, List, Mapping, Optional, Tuple, Union
 from .models import FlightOption, StayPlan
 
-DEFAULT_WEIGHTS = {"nonstop_bonus": 40.0}
+DEFAULT_WEIGHTS = {
+    "nonstop_bonus": 40.0,
+    "time_quality": 20.0,
+    "points_value": 20.0,
+    "cash_value": 10.0,
+    "loyalty_alignment": 10.0,
+}
 
-def score_flight(option: FlightOption, weights=DEFAULT_WEIGHTS) -> float:
-    score = weights["nonstop_bonus"] if option.nonstop else 0.0
+@dataclass(frozen=True)
+class FlightWeights:
+    """Weight model for batch flight scoring (see pte.engine.vector_scorer); defaults from DEFAULT_WEIGHTS."""
+    nonstop_bonus: float = DEFAULT_WEIGHTS["nonstop_bonus"]
+    time_quality: float = DEFAULT_WEIGHTS["time_quality"]
+    points_value: float = DEFAULT_WEIGHTS["points_value"]
+    cash_value: float = DEFAULT_WEIGHTS["cash_value"]
+    loyalty_alignment: float = DEFAULT_WEIGHTS["loyalty_alignment"]
+    preferred_alliances: Tuple[str, ...] = ("SkyTeam",)
+    preferred_depart_hour: float = 12.0
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "FlightWeights":
+        known = {f.name for f in fields(cls)}
+        unknown = set(d) - known
+        if unknown:
+            raise ValueError(f"Unknown flight weight(s): {', '.join(sorted(unknown))}")
+        kw = dict(d)
+        if "preferred_alliances" in kw:
+            kw["preferred_alliances"] = tuple(kw["preferred_alliances"])
+        return cls(**kw)
+
+def load_flight_weights(path: str) -> FlightWeights:
+    """FlightWeights from a JSON object of weight overrides."""
+    with open(path, "r", encoding="utf-8") as f:
+        return FlightWeights.from_dict(json.load(f))
+
+Weights = Union[FlightWeights, Mapping[str, float]]
+
+def _as_weights(weights: Weights) -> FlightWeights:
+    return weights if isinstance(weights, FlightWeights) else FlightWeights.from_dict(weights)
+
+def score_flight(option: FlightOption, weights: Weights = DEFAULT_WEIGHTS,
+                 best_points: Optional[int] = None) -> float:
+    """``best_points`` is the cheapest award price on offer; an award is worth
+    up to ``points_value`` by how close it comes to that price."""
+    weights = _as_weights(weights)
+    score = weights.nonstop_bonus if option.nonstop else 0.0
+    if option.points_price and best_points:
+        score += weights.points_value * best_points / option.points_price
     option.score = score
-    option.rationale = "Nonstop MSP↔HND (preferred)." if option.nonstop else "One-stop fallback."
+    if option.nonstop:
+        preferred = " (preferred)" if weights.nonstop_bonus > 0 else ""
+        option.rationale = f"Nonstop {option.origin}↔{option.destination}{preferred}."
+    else:
+        option.rationale = "One-stop fallback."
     return score
 
+def score_flights(options: List[FlightOption], weights: Weights = DEFAULT_WEIGHTS) -> None:
+    """Score every option, valuing award prices against the cheapest one offered."""
+    weights = _as_weights(weights)
+    best_points = min((o.points_price for o in options if o.points_price), default=None)
+    for option in options:
+        score_flight(option, weights, best_points)
+
 def score_stay(stay: StayPlan, hyatt_cents_per_point: float = 2.0) -> float:
     points = stay.total_points()
     cash = stay.total_cash()
@@ -0,0 +1,95 @@
+from __future__ import annotations
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from .models import FlightOption
+from .scorer import FlightWeights
+
+# Carrier name prefix -> alliance. Carrier strings look like "Delta Air Lines" or "Delta (via SEA)".
+CARRIER_ALLIANCES = {
+    "Delta": "SkyTeam", "Korean Air": "SkyTeam", "Air France": "SkyTeam", "KLM": "SkyTeam",
+    "United": "Star Alliance", "ANA": "Star Alliance", "Air Canada": "Star Alliance",
+    "American": "oneworld", "Japan Airlines": "oneworld", "JAL": "oneworld", "Alaska": "oneworld",
+}
+
+_HOUR_RX = re.compile(r"(\d{1,2}):(\d{2})")
+
+def carrier_alliance(carrier: str) -> str:
+    for prefix, alliance in CARRIER_ALLIANCES.items():
+        if carrier.startswith(prefix):
+            return alliance
+    return ""
+
+def depart_hour(local: Optional[str]) -> float:
+    """'~11:30' -> 11.5; NaN when unknown."""
+    m = _HOUR_RX.search(local or "")
+    return int(m.group(1)) + int(m.group(2)) / 60.0 if m else float("nan")
+
+@dataclass
+class FlightFeatures:
+    """Column-oriented feature arrays, one row per itinerary. Unknown values are NaN."""
+    nonstop: np.ndarray         # bool
+    duration: np.ndarray        # minutes
+    depart_hour: np.ndarray     # local hour, fractional
+    points_cost: np.ndarray     # miles per passenger
+    cash_cost: np.ndarray       # USD per passenger
+    alliance: np.ndarray        # str
+
+    def __len__(self) -> int:
+        return len(self.nonstop)
+
+    @classmethod
+    def from_options(cls, options: Sequence[FlightOption],
+                     points_cost: Optional[Sequence[Optional[float]]] = None,
+                     cash_cost: Optional[Sequence[Optional[float]]] = None) -> "FlightFeatures":
+        """Points default to each option's award ``points_price``."""
+        n = len(options)
+        if points_cost is None:
+            points_cost = [o.points_price for o in options]
+        def col(values):
+            if values is None:
+                return np.full(n, np.nan)
+            return np.array([np.nan if v is None else v for v in values], dtype=float)
+        return cls(
+            nonstop=np.fromiter((o.nonstop for o in options), dtype=bool, count=n),
+            duration=col([o.duration_minutes for o in options]),
+            depart_hour=col([depart_hour(o.depart_time_local) for o in options]),
+            points_cost=col(points_cost),
+            cash_cost=col(cash_cost),
+            alliance=np.array([carrier_alliance(o.carrier) for o in options], dtype=object),
+        )
+
+def _relative_cheapness(cost: np.ndarray) -> np.ndarray:
+    """min(cost) / cost in (0, 1]; 0 where unknown or non-positive."""
+    valid = np.isfinite(cost) & (cost > 0)
+    if not valid.any():
+        return np.zeros(len(cost))
+    best = cost[valid].min()
+    out = np.zeros(len(cost))
+    out[valid] = best / cost[valid]
+    return out
+
+def score_features(feat: FlightFeatures, weights: FlightWeights = FlightWeights()) -> np.ndarray:
+    """Weighted score for every row in one pass; higher is better. Inputs are not modified."""
+    duration = _relative_cheapness(feat.duration)
+    hour_gap = np.abs(feat.depart_hour - weights.preferred_depart_hour)
+    hour = np.where(np.isfinite(hour_gap), 1.0 - np.minimum(hour_gap, 12.0) / 12.0, 0.5)
+    time_quality = 0.7 * duration + 0.3 * hour
+    loyalty = np.isin(feat.alliance, list(weights.preferred_alliances)).astype(float)
+    return (weights.nonstop_bonus * feat.nonstop
+            + weights.time_quality * time_quality
+            + weights.points_value * _relative_cheapness(feat.points_cost)
+            + weights.cash_value * _relative_cheapness(feat.cash_cost)
+            + weights.loyalty_alignment * loyalty)
+
+def rank_features(feat: FlightFeatures, weights: FlightWeights = FlightWeights()) -> Tuple[np.ndarray, np.ndarray]:
+    """Return (scores, indices best-first); ties keep input order."""
+    scores = score_features(feat, weights)
+    return scores, np.argsort(-scores, kind="stable")
+
+def rank_flights(options: Sequence[FlightOption], weights: FlightWeights = FlightWeights(),
+                 points_cost=None, cash_cost=None) -> List[Tuple[FlightOption, float]]:
+    """Convenience wrapper: ranked (option, score) pairs without mutating the options."""
+    scores, order = rank_features(FlightFeatures.from_options(options, points_cost, cash_cost), weights)
+    return [(options[i], float(scores[i])) for i in order]
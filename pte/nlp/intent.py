@@ -1,83 +1,115 @@
 # pte/nlp/intent.py
 from __future__ import annotations
 import re
+from calendar import monthrange
 from dataclasses import dataclass
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import date
-from pte.utils.date_utils import parse_date_or_none
 
 @dataclass
 class Intent:
     name: str
     slots: Dict[str, Any]
 
-# --- Helpers --------------------------------------------------------------
-
-MONTHS = "(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)"
-DATE_RX = re.compile(
-    rf"(?P<m1>{MONTHS})\w*\s+(?P<d1>\d{{1,2}})\s*(?P<y1>\d{{2,4}})?"
-    r"(?:\s*(?:to|-|through|thru|–)\s*)"
-    rf"(?P<m2>{MONTHS})\w*\s+(?P<d2>\d{{1,2}})\s*(?P<y2>\d{{2,4}})?",
-    re.IGNORECASE,
-)
-
-ISO_RANGE_RX = re.compile(
-    r"(?P<s>\d{4}-\d{2}-\d{2})\s*(?:to|-|through|thru|–)\s*(?P<e>\d{4}-\d{2}-\d{2})",
-    re.IGNORECASE,
+# --- Recognizer ------------------------------------------------------------
+
+HOTEL_ALIASES = {
+    "park hyatt tokyo": "Park Hyatt Tokyo",
+    "park hyatt": "Park Hyatt Tokyo",
+    "andaz tokyo toranomon hills": "Andaz Tokyo Toranomon Hills",
+    "andaz tokyo": "Andaz Tokyo Toranomon Hills",
+    "andaz": "Andaz Tokyo Toranomon Hills",
+}
+NONSTOP_KEYWORDS = ("nonstop", "direct", "no connections")   # priority order
+NEGATIONS = ("no ", "not ", "without ")
+ALTERNATE_FLAGS = ("alternate", "also consider", "or andaz", "or park hyatt")
+PLAN_KEYWORDS = ("show plan", "generate plan", "make plan", "plan this", "save plan")
+
+KEYWORDS: Dict[str, str] = {}
+KEYWORDS.update({k: "hotel" for k in HOTEL_ALIASES})
+KEYWORDS.update({k: "nonstop" for k in NONSTOP_KEYWORDS})
+KEYWORDS.update({k: "alternate" for k in ALTERNATE_FLAGS})
+KEYWORDS.update({k: "plan" for k in PLAN_KEYWORDS})
+
+MONTHS = {m: i + 1 for i, m in enumerate(
+    ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"))}
+
+# One compiled alternation over every token we care about; a single finditer
+# over the lowercased message yields dates, separators and keywords in order.
+# Longest keywords first so "park hyatt tokyo" wins over "park hyatt".
+# Keywords must start at a word boundary, so "for andaz" is not "or andaz";
+# they may end mid-word, as before ("nonstops", "directly").
+RECOGNIZER = re.compile(
+    r"(?P<iso>(?P<iy>\d{4})-(?P<im>\d{2})-(?P<id>\d{2}))"
+    rf"|(?P<md>\b(?P<mon>{'|'.join(MONTHS)})[a-z]*\s+(?P<day>\d{{1,2}})\b(?:,?\s+(?P<year>\d{{4}}|\d{{2}})\b)?)"
+    r"|(?P<sep>\b(?:to|through|thru)\b|[-–])"
+    r"|(?P<lead>\b(?:on|starting|start|begin)\b)"
+    r"|(?P<kw>\b(?:" + "|".join(re.escape(k) for k in sorted(KEYWORDS, key=len, reverse=True)) + "))"
 )
 
-SINGLE_DATE_RX = re.compile(
-    rf"(on|starting|start|begin)\s+(?P<m>{MONTHS})\w*\s+(?P<d>\d{{1,2}})\s*(?P<y>\d{{2,4}})?",
-    re.IGNORECASE,
-)
+def _make_date(y: int, m: int, d: int) -> Optional[date]:
+    if 1 <= m <= 12 and 1 <= y <= 9999 and 1 <= d <= monthrange(y, m)[1]:
+        return date(y, m, d)
+    return None
 
-def _norm_year(y: Optional[str]) -> Optional[str]:
-    if not y:
-        return None
-    y = y.strip()
-    if len(y) == 2:
-        return "20" + y
-    return y
+def _token_date(m: re.Match) -> Optional[date]:
+    if m.group("iso"):
+        return _make_date(int(m.group("iy")), int(m.group("im")), int(m.group("id")))
+    year = m.group("year")
+    if not year:
+        return None   # recognized, but not resolvable without a year
+    return _make_date(int("20" + year if len(year) == 2 else year), MONTHS[m.group("mon")], int(m.group("day")))
+
+def _scan(low: str):
+    """One pass: (date range or None, single date or None, [(start, keyword)])."""
+    iso_range = month_range = single = None
+    keywords: List[Tuple[int, str]] = []
+    prev2 = prev = None
+    for m in RECOGNIZER.finditer(low):
+        kind = m.lastgroup
+        if kind == "kw":
+            keywords.append((m.start(), m.group()))
+        elif kind in ("iso", "md"):
+            # Range: <date> <sep> <date> of the same shape, separated by whitespace only.
+            if prev and prev.lastgroup == "sep" and prev2 and prev2.lastgroup == kind \
+                    and _adjacent(low, prev2, prev) and _adjacent(low, prev, m):
+                if kind == "iso" and iso_range is None:
+                    iso_range = (_token_date(prev2), _token_date(m))
+                elif kind == "md" and month_range is None:
+                    month_range = (_token_date(prev2), _token_date(m))
+            if single is None and kind == "md" and prev and prev.lastgroup == "lead" and _adjacent(low, prev, m):
+                single = _token_date(m)
+        prev2, prev = prev, m
+    return iso_range or month_range, single, keywords
+
+def _adjacent(low: str, a: re.Match, b: re.Match) -> bool:
+    return not low[a.end():b.start()].strip()
+
+# --- Public helpers ----------------------------------------------------------
 
 def extract_date_range(text: str) -> Tuple[Optional[date], Optional[date]]:
     """Find 'Nov 20 2027 to Dec 4 2027' or '2027-11-20 to 2027-12-04'."""
-    # ISO first
-    m = ISO_RANGE_RX.search(text)
-    if m:
-        s = parse_date_or_none(m.group("s"))
-        e = parse_date_or_none(m.group("e"))
-        return s, e
-    # Natural language month names
-    m = DATE_RX.search(text)
-    if m:
-        m1, d1, y1 = m.group("m1"), m.group("d1"), _norm_year(m.group("y1"))
-        m2, d2, y2 = m.group("m2"), m.group("d2"), _norm_year(m.group("y2"))
-        s = parse_date_or_none(f"{m1} {d1} {y1 or ''}".strip())
-        e = parse_date_or_none(f"{m2} {d2} {y2 or ''}".strip())
-        return s, e
-    return None, None
+    rng, _, _ = _scan(text.lower())
+    return rng if rng else (None, None)
 
 def extract_single_date(text: str) -> Optional[date]:
-    m = SINGLE_DATE_RX.search(text)
-    if m:
-        mon, d, y = m.group("m"), m.group("d"), _norm_year(m.group("y"))
-        return parse_date_or_none(f"{mon} {d} {y or ''}".strip())
-    return None
+    _, single, _ = _scan(text.lower())
+    return single
 
 def yes_no(text: str, *keywords) -> Optional[bool]:
     """Return True/False if a keyword is negated/affirmed in text."""
     txt = text.lower()
     for k in keywords:
-        if k in txt:
-            # detect negation near the keyword
-            window = 8
-            idx = txt.find(k)
-            left = txt[max(0, idx - window):idx]
-            if "no " in left or "not " in left or "without " in left:
-                return False
-            return True
+        idx = txt.find(k)
+        if idx >= 0:
+            return _affirmed(txt, idx)
     return None
 
+def _affirmed(low: str, idx: int, window: int = 8) -> bool:
+    # detect negation near the keyword
+    left = low[max(0, idx - window):idx]
+    return not any(n in left for n in NEGATIONS)
+
 def mentions(text: str, *options) -> Optional[str]:
     txt = text.lower()
     for o in options:
@@ -87,6 +119,62 @@ def mentions(text: str, *options) -> Optional[str]:
 
 # --- Intents -------------------------------------------------------------
 
+def parse_intents(text: str) -> List[Intent]:
+    """
+    Recognize every intent in one message, in priority order (dates, nonstop,
+    start hotel, alternate hotels, show plan). The text is lowercased once and
+    keywords and dates come from a single pass of the compiled recognizer.
+    Returns [plan_trip] when nothing specific is recognized.
+    """
+    low = text.strip().lower()
+    if low in {"quit", "exit", "q"}:
+        return [Intent("quit", {})]
+    if low in {"help", "commands", "options"}:
+        return [Intent("help", {})]
+
+    intents: List[Intent] = []
+    rng, single, keywords = _scan(low)
+    if rng and rng[0] and rng[1]:
+        intents.append(Intent("set_dates", {"start": rng[0], "end": rng[1]}))
+    elif single:
+        intents.append(Intent("set_dates", {"start": single, "end": None}))
+
+    first_kw: Dict[str, int] = {}
+    hotel_hits: List[Tuple[int, str]] = []
+    alt_positions: List[int] = []
+    plan = False
+    for start, phrase in keywords:
+        kind = KEYWORDS[phrase]
+        if kind == "nonstop":
+            first_kw.setdefault(phrase, start)
+        elif kind == "hotel":
+            hotel_hits.append((start, HOTEL_ALIASES[phrase]))
+        elif kind == "alternate":
+            alt_positions.append(start)
+            if phrase.startswith("or "):      # "or andaz" names the hotel too
+                hotel_hits.append((start, HOTEL_ALIASES[phrase[3:]]))
+        else:
+            plan = True
+
+    for k in NONSTOP_KEYWORDS:
+        if k in first_kw:
+            intents.append(Intent("set_nonstop", {"prefer_nonstop": _affirmed(low, first_kw[k])}))
+            break
+
+    # Hotels named after an "also consider"/"alternate" cue are alternates.
+    first_alt = min(alt_positions) if alt_positions else len(low)
+    start_hotels = [n for pos, n in hotel_hits if pos < first_alt]
+    alternates = [n for pos, n in hotel_hits if pos >= first_alt]
+    if start_hotels:
+        intents.append(Intent("set_start_hotel", {"hotel": start_hotels[0]}))
+    for name in dict.fromkeys(alternates):
+        if name not in start_hotels[:1]:
+            intents.append(Intent("add_alternate_hotel", {"hotel": name}))
+
+    if plan:
+        intents.append(Intent("show_plan", {}))
+    return intents or [Intent("plan_trip", {})]
+
 def parse_query(text: str) -> Intent:
     """
     Very small, deterministic parser for our travel domain.
@@ -100,51 +188,6 @@ def parse_query(text: str) -> Intent:
       - help
       - reset
       - quit
+    Returns the highest-priority intent; see parse_intents for compound messages.
     """
-    t = text.strip()
-    low = t.lower()
-    if low in {"quit", "exit", "q"}:
-        return Intent("quit", {})
-    if low in {"help", "commands", "options"}:
-        return Intent("help", {})
-
-    # Dates
-    s, e = extract_date_range(t)
-    if s and e:
-        return Intent("set_dates", {"start": s, "end": e})
-    sd = extract_single_date(t)
-    if sd:
-        return Intent("set_dates", {"start": sd, "end": None})
-
-    # Nonstop preference
-    ns = yes_no(t, "nonstop", "direct", "no connections")
-    if ns is not None:
-        return Intent("set_nonstop", {"prefer_nonstop": ns})
-
-    # Start hotel
-    start_hotel = mentions(t, "Park Hyatt Tokyo", "Andaz Tokyo Toranomon Hills", "Park Hyatt", "Andaz Tokyo", "Andaz")
-    if start_hotel:
-        # normalize to canonical names
-        if start_hotel.lower().startswith("park hyatt"):
-            start_hotel = "Park Hyatt Tokyo"
-        elif start_hotel.lower().startswith("andaz"):
-            start_hotel = "Andaz Tokyo Toranomon Hills"
-        return Intent("set_start_hotel", {"hotel": start_hotel})
-
-    # Alternate hotel
-    alt_flag = ("alternate" in low or "also consider" in low or "or andaz" in low or "or park hyatt" in low)
-    if alt_flag:
-        alt = mentions(t, "Park Hyatt Tokyo", "Andaz Tokyo Toranomon Hills", "Park Hyatt", "Andaz Tokyo", "Andaz")
-        if alt:
-            if alt.lower().startswith("park hyatt"):
-                alt = "Park Hyatt Tokyo"
-            elif alt.lower().startswith("andaz"):
-                alt = "Andaz Tokyo Toranomon Hills"
-            return Intent("add_alternate_hotel", {"hotel": alt})
-
-    # Show/Plan
-    if any(k in low for k in ["show plan", "generate plan", "make plan", "plan this", "save plan"]):
-        return Intent("show_plan", {})
-
-    # Default to high-level "plan_trip" intent
-    return Intent("plan_trip", {})
+    return parse_intents(text)[0]
@@ -0,0 +1,107 @@
+# pte/nlp/intent_cache.py
+from __future__ import annotations
+import copy
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from pte.utils.metrics import record_cache
+
+# Sampling above this temperature is meant to vary, so results are not cached.
+CACHE_MAX_TEMPERATURE = 0.3
+# Intents carry dates resolved from phrases like "next week", so entries expire.
+CACHE_TTL_SECONDS = 3600.0
+_PUNCT_RX = re.compile(r"[^\w\s/-]+")
+_SPACE_RX = re.compile(r"\s+")
+
+def normalize_message(text: str) -> str:
+    """Fold case, punctuation and whitespace: 'Show plan!' and ' show  plan' share a key."""
+    return _SPACE_RX.sub(" ", _PUNCT_RX.sub(" ", text.lower())).strip()
+
+def cache_key(model: str, temperature: float, system_prompt: str, message: str) -> str:
+    prompt_hash = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()[:16]
+    raw = json.dumps([model, round(float(temperature), 3), prompt_hash, normalize_message(message)])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+class IntentCache:
+    """In-memory LRU of extracted intents, optionally backed by one JSON file per key on disk.
+
+    Entries older than ``ttl`` seconds are treated as misses in both tiers.
+    """
+
+    def __init__(self, max_entries: int = 1024, directory: Optional[str] = None,
+                 ttl: float = CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._lru: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _fresh(self, stored: float) -> bool:
+        return time.time() - stored < self.ttl
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None and not self._fresh(entry[0]):
+                del self._lru[key]
+                entry = None
+            if entry is not None:
+                self._lru.move_to_end(key)
+        if entry is not None:
+            record_cache("llm_intent", True)
+            return copy.deepcopy(entry[1])
+        if self.directory:
+            try:
+                with open(self._path(key), "r", encoding="utf-8") as f:
+                    record = json.load(f)
+                stored, value = float(record["stored"]), record["value"]
+            except (OSError, ValueError, TypeError, KeyError):
+                stored, value = 0.0, None
+            if value is not None and not self._fresh(stored):
+                value = None
+            record_cache("llm_intent_disk", value is not None)
+            if value is not None:
+                self._remember(key, value, stored)
+                return copy.deepcopy(value)
+        record_cache("llm_intent", False)
+        return None
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        value = copy.deepcopy(value)
+        stored = time.time()
+        self._remember(key, value, stored)
+        if self.directory:
+            tmp = f"{self._path(key)}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"stored": stored, "value": value}, f)
+            os.replace(tmp, self._path(key))
+
+    def _remember(self, key: str, value: Dict[str, Any], stored: float) -> None:
+        with self._lock:
+            self._lru[key] = (stored, value)
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lru.clear()
+
+intent_cache = IntentCache(
+    max_entries=int(os.getenv("PTE_INTENT_CACHE_SIZE", "1024")),
+    directory=os.getenv("PTE_INTENT_CACHE_DIR") or None,
+    ttl=float(os.getenv("PTE_INTENT_CACHE_TTL", str(CACHE_TTL_SECONDS))),
+)
@@ -0,0 +1,121 @@
+# pte/nlp/llm_intent_async.py
+from __future__ import annotations
+import asyncio
+import copy
+import time
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence
+import httpx
+import ollama
+from pte.nlp.intent import parse_query
+from pte.nlp.intent_cache import CACHE_MAX_TEMPERATURE, IntentCache, cache_key, intent_cache
+from pte.nlp.llm_intent_ollama import (SYSTEM_PROMPT, chat_messages, chat_options,
+                                      first_intent_async)
+from pte.utils.metrics import registry
+
+registry.describe("pte_llm_requests_total", "counter", "Async LLM intent extractions by result.")
+registry.describe("pte_llm_request_seconds", "histogram", "Async LLM intent extraction latency by result.")
+
+def deterministic_intent(message: str) -> Dict[str, Any]:
+    """parse_query result in the LLM reply shape (dates as ISO strings)."""
+    intent = parse_query(message)
+    slots = {k: v.isoformat() if isinstance(v, date) else v for k, v in intent.slots.items()}
+    return {"intent": intent.name, "slots": slots}
+
+class AsyncIntentExtractor:
+    """
+    Non-blocking llm_extract_intent for the API and other asyncio callers.
+
+    One ollama.AsyncClient (and its HTTP connection pool) is kept for the
+    life of the extractor, at most ``max_concurrency`` chats are in flight,
+    and each call gets ``timeout`` seconds (queueing included) before it
+    falls back to the deterministic parser. Ollama's chat API has no batch
+    endpoint, so concurrent requests for the same normalized message are
+    coalesced onto one chat instead. Replies are streamed and the stream is
+    dropped as soon as a schema-valid intent object has been read.
+    """
+
+    def __init__(self, host: Optional[str] = None, model: str = "llama3", temperature: float = 0.1,
+                 max_concurrency: int = 4, timeout: float = 10.0, keep_alive: str = "10m",
+                 cache: Optional[IntentCache] = None, format: Any = "json"):
+        self.host = host
+        self.model = model
+        self.temperature = temperature
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self.format = format
+        self.cache = cache if cache is not None else intent_cache
+        self._max_concurrency = max_concurrency
+        self._client: Optional[ollama.AsyncClient] = None
+        self._transport: Optional[httpx.AsyncHTTPTransport] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def _ensure_client(self) -> ollama.AsyncClient:
+        if self._client is None:
+            limits = httpx.Limits(max_connections=self._max_concurrency,
+                                  max_keepalive_connections=self._max_concurrency)
+            # The connection pool is ours, so aclose can shut it without reaching into the client.
+            self._transport = httpx.AsyncHTTPTransport(limits=limits)
+            self._client = ollama.AsyncClient(host=self.host, timeout=self.timeout, transport=self._transport)
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        return self._client
+
+    async def extract(self, message: str) -> Dict[str, Any]:
+        cacheable = self.temperature <= CACHE_MAX_TEMPERATURE
+        key = cache_key(self.model, self.temperature, SYSTEM_PROMPT, message)
+        if cacheable:
+            cached = await self._cache_io(self.cache.get, key)
+            if cached is not None:
+                return cached
+        task = self._inflight.get(key)
+        if task is not None:
+            registry.inc("pte_llm_requests_total", {"result": "coalesced"})
+            return copy.deepcopy(await asyncio.shield(task))
+        task = asyncio.ensure_future(self._chat(message, key if cacheable else None))
+        self._inflight[key] = task
+        try:
+            return copy.deepcopy(await asyncio.shield(task))
+        finally:
+            self._inflight.pop(key, None)
+
+    async def extract_many(self, messages: Sequence[str]) -> List[Dict[str, Any]]:
+        return list(await asyncio.gather(*(self.extract(m) for m in messages)))
+
+    async def _chat(self, message: str, key: Optional[str]) -> Dict[str, Any]:
+        client = self._ensure_client()
+        start = time.perf_counter()
+        try:
+            data = await asyncio.wait_for(self._limited_chat(client, message), self.timeout)
+        except asyncio.TimeoutError:
+            result, data = "timeout", deterministic_intent(message)
+        except (httpx.HTTPError, ollama.ResponseError, OSError):
+            result, data = "error", deterministic_intent(message)
+        else:
+            if data is None:
+                result, data = "unparsed", deterministic_intent(message)
+            else:
+                result = "ok"
+                if key:
+                    await self._cache_io(self.cache.put, key, data)
+        registry.inc("pte_llm_requests_total", {"result": result})
+        registry.observe("pte_llm_request_seconds", time.perf_counter() - start, {"result": result})
+        return data
+
+    async def _limited_chat(self, client: ollama.AsyncClient, message: str) -> Optional[Dict[str, Any]]:
+        async with self._semaphore:
+            chunks = await client.chat(model=self.model, messages=chat_messages(message), stream=True,
+                                       format=self.format, options=chat_options(self.temperature),
+                                       keep_alive=self.keep_alive)
+            return await first_intent_async(chunks)
+
+    async def _cache_io(self, fn, *args):
+        """Run a cache call off the event loop when it may touch the disk tier."""
+        if self.cache.directory:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    async def aclose(self) -> None:
+        if self._transport is not None:
+            await self._transport.aclose()
+            self._client = self._transport = None
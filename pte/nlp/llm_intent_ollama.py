@@ -1,9 +1,9 @@
 # pte/nlp/llm_intent_ollama.py
 from __future__ import annotations
 import json
-import re
-from typing import Dict, Any
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
 import ollama
+from pte.nlp.intent_cache import CACHE_MAX_TEMPERATURE, IntentCache, cache_key, intent_cache
 
 SYSTEM_PROMPT = """You are a strict intent extractor for a travel planner.
 Return ONLY compact JSON with no explanations and no markdown.
@@ -27,44 +27,166 @@ Rules:
 - Return ONLY the JSON object. No prose, no code fences.
 """
 
-def _strip_code_fences(text: str) -> str:
-    # Some models wrap JSON in ```json ... ```
-    return re.sub(r"^```(?:json)?\s*|\s*```$", "", text.strip(), flags=re.IGNORECASE | re.MULTILINE)
+INTENT_NAMES = ("set_dates", "set_nonstop", "set_start_hotel", "add_alternate_hotel",
+                "show_plan", "plan_trip", "help", "reset")
+SLOT_NAMES = ("start", "end", "prefer_nonstop", "hotel")
 
-def llm_extract_intent(message: str, model: str = "llama3", temperature: float = 0.1) -> Dict[str, Any]:
+# JSON schema for backends that support schema-constrained output; format="json" otherwise.
+INTENT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "intent": {"type": "string", "enum": list(INTENT_NAMES)},
+        "slots": {
+            "type": "object",
+            "properties": {
+                "start": {"type": ["string", "null"]},
+                "end": {"type": ["string", "null"]},
+                "prefer_nonstop": {"type": ["boolean", "null"]},
+                "hotel": {"type": ["string", "null"]},
+            },
+        },
+    },
+    "required": ["intent", "slots"],
+}
+# Upper bound on generated tokens; a schema-valid reply is well under this.
+MAX_REPLY_TOKENS = 160
+
+def chat_messages(message: str):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": message},
+    ]
+
+def chat_options(temperature: float) -> Dict[str, Any]:
+    return {"temperature": temperature, "num_predict": MAX_REPLY_TOKENS}
+
+def fallback_intent() -> Dict[str, Any]:
+    return {"intent": "plan_trip", "slots": {"start": None, "end": None, "prefer_nonstop": None, "hotel": None}}
+
+def valid_intent(data: Any) -> bool:
+    return (isinstance(data, dict) and data.get("intent") in INTENT_NAMES
+            and isinstance(data.get("slots", {}), dict))
+
+class JsonObjectScanner:
     """
-    Calls Ollama locally to parse the user's message into an intent JSON.
-    Returns a dict: {"intent": "...", "slots": {...}}
+    Incremental scanner over streamed text. ``feed`` returns the first complete
+    top-level JSON object that satisfies the intent schema, so the caller can
+    stop generation there; anything before it (prose, code fences) and any
+    invalid object is skipped.
     """
-    resp = ollama.chat(
-        model=model,
-        messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": message},
-        ],
-        options={"temperature": temperature},
-    )
-    raw = resp["message"]["content"]
-    raw = _strip_code_fences(raw)
 
-    try:
-        data = json.loads(raw)
-    except json.JSONDecodeError:
-        # Fallback: if the model output was noisy, try to extract JSON object heuristically
-        m = re.search(r"\{.*\}", raw, flags=re.DOTALL)
-        if m:
-            data = json.loads(m.group(0))
-        else:
-            # Ultimate fallback: generic plan
-            data = {"intent": "plan_trip", "slots": {"start": None, "end": None, "prefer_nonstop": None, "hotel": None}}
-
-    # Normalize hotel slot
-    hotel = (data.get("slots") or {}).get("hotel")
+    def __init__(self):
+        self._buf: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> Optional[Dict[str, Any]]:
+        for ch in chunk:
+            if self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                    self._buf = [ch]
+                continue
+            self._buf.append(ch)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        data = json.loads("".join(self._buf))
+                    except ValueError:
+                        data = None
+                    if valid_intent(data):
+                        return data
+        return None
+
+def normalize_intent(data: Dict[str, Any]) -> Dict[str, Any]:
+    slots = data.get("slots") or {}
+    data["slots"] = {k: slots.get(k) for k in SLOT_NAMES}
+    hotel = data["slots"]["hotel"]
     if hotel:
-        h = hotel.lower().strip()
+        h = str(hotel).lower().strip()
         if h.startswith("park"):
             data["slots"]["hotel"] = "Park Hyatt Tokyo"
         elif h.startswith("andaz"):
             data["slots"]["hotel"] = "Andaz Tokyo Toranomon Hills"
+    return data
+
+def parse_intent_reply(raw: str) -> Optional[Dict[str, Any]]:
+    """Parse the model's reply into {"intent", "slots"}; None if no schema-valid object was found."""
+    data = JsonObjectScanner().feed(raw)
+    return normalize_intent(data) if data is not None else None
+
+def first_intent(chunks: Iterable[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Consume streamed chat chunks until a schema-valid object closes, then stop the stream."""
+    scanner = JsonObjectScanner()
+    try:
+        for chunk in chunks:
+            data = scanner.feed(chunk["message"]["content"])
+            if data is not None:
+                return normalize_intent(data)
+        return None
+    finally:
+        close = getattr(chunks, "close", None)
+        if close:
+            close()      # drops the HTTP stream, which stops generation server-side
+
+async def first_intent_async(chunks: AsyncIterator[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    scanner = JsonObjectScanner()
+    try:
+        async for chunk in chunks:
+            data = scanner.feed(chunk["message"]["content"])
+            if data is not None:
+                return normalize_intent(data)
+        return None
+    finally:
+        aclose = getattr(chunks, "aclose", None)
+        if aclose:
+            await aclose()
+
+def llm_extract_intent(message: str, model: str = "llama3", temperature: float = 0.1,
+                       cache: Optional[IntentCache] = None, stream: bool = True,
+                       format: Any = "json", client: Optional[ollama.Client] = None) -> Dict[str, Any]:
+    """
+    Calls Ollama locally to parse the user's message into an intent JSON.
+    Returns a dict: {"intent": "...", "slots": {...}}
+    Results are cached per (model, temperature, prompt, normalized message)
+    unless the temperature is above CACHE_MAX_TEMPERATURE. With ``stream`` the
+    reply is parsed as tokens arrive and generation stops at the first
+    schema-valid object. ``format`` is passed to Ollama ("json", or
+    INTENT_SCHEMA on servers with structured outputs). Pass ``client`` to
+    reuse a configured ``ollama.Client``; by default the module-level one is used.
+    """
+    if cache is None:
+        cache = intent_cache
+    key = cache_key(model, temperature, SYSTEM_PROMPT, message) if temperature <= CACHE_MAX_TEMPERATURE else None
+    if key:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
 
+    chat = (client or ollama).chat
+    if stream:
+        data = first_intent(chat(model=model, messages=chat_messages(message), options=chat_options(temperature),
+                                 format=format, stream=True))
+    else:
+        resp = chat(model=model, messages=chat_messages(message), options=chat_options(temperature),
+                    format=format)
+        data = parse_intent_reply(resp["message"]["content"])
+    if data is None:
+        # Ultimate fallback: generic plan (not cached, a retry may do better)
+        return fallback_intent()
+    if key:
+        cache.put(key, data)
     return data
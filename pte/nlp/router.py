@@ -0,0 +1,115 @@
+# pte/nlp/router.py
+from __future__ import annotations
+import re
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+from pte.nlp.intent import Intent, parse_intents
+from pte.utils.date_utils import parse_date_or_none
+from pte.utils.metrics import registry
+
+if TYPE_CHECKING:
+    from pte.nlp.llm_intent_async import AsyncIntentExtractor
+
+registry.describe("pte_intent_route_total", "counter", "Chat messages by intent routing path.")
+registry.describe("pte_intent_route_seconds", "histogram", "Intent routing latency by path.")
+
+# Confidence the deterministic parser has in each intent it returns.
+INTENT_CONFIDENCE = {
+    "quit": 1.0, "help": 1.0,
+    "set_dates": 0.95, "set_nonstop": 0.9, "set_start_hotel": 0.9,
+    "add_alternate_hotel": 0.85, "show_plan": 0.9,
+    "plan_trip": 0.2,           # nothing specific recognized
+}
+DEFAULT_THRESHOLD = 0.6
+_DIGIT_RX = re.compile(r"\d")
+
+LLMExtractor = Callable[[str], Dict[str, Any]]
+
+@dataclass
+class RoutedIntents:
+    intents: List[Intent]
+    confidence: float
+    path: str                   # "deterministic" | "llm" | "fallback"
+
+def confidence(text: str, intents: List[Intent]) -> float:
+    """Lowest per-intent confidence, lowered further when slots look incomplete."""
+    score = min(INTENT_CONFIDENCE.get(i.name, 0.5) for i in intents)
+    names = {i.name for i in intents}
+    if "set_dates" in names:
+        dates = next(i for i in intents if i.name == "set_dates")
+        if dates.slots.get("end") is None:
+            score = min(score, 0.5)       # start only; the LLM may find the end
+    elif _DIGIT_RX.search(text):
+        score = min(score, 0.4)           # numbers we could not turn into dates
+    return score
+
+def _slot_date(value: Any) -> Optional[date]:
+    if isinstance(value, date) or value is None:
+        return value
+    return parse_date_or_none(str(value))
+
+def intents_from_llm(data: Dict[str, Any]) -> List[Intent]:
+    """Convert llm_extract_intent output into Intents with parsed date slots."""
+    name = data.get("intent") or "plan_trip"
+    slots = dict(data.get("slots") or {})
+    if name == "set_dates":
+        slots["start"] = _slot_date(slots.get("start"))
+        slots["end"] = _slot_date(slots.get("end"))
+        if not slots["start"]:
+            return [Intent("plan_trip", {})]
+    elif name == "set_nonstop" and slots.get("prefer_nonstop") is None:
+        return [Intent("plan_trip", {})]
+    elif name in ("set_start_hotel", "add_alternate_hotel") and not slots.get("hotel"):
+        return [Intent("plan_trip", {})]
+    return [Intent(name, slots)]
+
+def _default_llm(text: str) -> Dict[str, Any]:
+    from pte.nlp.llm_intent_ollama import llm_extract_intent
+    return llm_extract_intent(text)
+
+def _routed(intents: List[Intent], score: float, llm_data: Optional[Dict[str, Any]]) -> RoutedIntents:
+    if llm_data is None:
+        return RoutedIntents(intents, score, "fallback")
+    llm_intents = intents_from_llm(llm_data)
+    if llm_intents[0].name == "plan_trip" and intents[0].name != "plan_trip":
+        return RoutedIntents(intents, score, "fallback")
+    return RoutedIntents(llm_intents, max(score, DEFAULT_THRESHOLD), "llm")
+
+def _record(result: RoutedIntents, start: float) -> RoutedIntents:
+    registry.inc("pte_intent_route_total", {"path": result.path})
+    registry.observe("pte_intent_route_seconds", time.perf_counter() - start, {"path": result.path})
+    return result
+
+def route_intent(text: str, llm: Optional[LLMExtractor] = None,
+                 threshold: float = DEFAULT_THRESHOLD) -> RoutedIntents:
+    """
+    Deterministic parser first; the LLM is only called when its confidence is
+    below ``threshold``. If the LLM fails or adds nothing, the deterministic
+    result is kept.
+    """
+    start = time.perf_counter()
+    intents = parse_intents(text)
+    score = confidence(text, intents)
+    if score >= threshold:
+        return _record(RoutedIntents(intents, score, "deterministic"), start)
+    try:
+        llm_data = (llm or _default_llm)(text)
+    except Exception:
+        llm_data = None
+    return _record(_routed(intents, score, llm_data), start)
+
+async def route_intent_async(text: str, extractor: "AsyncIntentExtractor",
+                             threshold: float = DEFAULT_THRESHOLD) -> RoutedIntents:
+    """route_intent for asyncio callers, using an AsyncIntentExtractor for the fallback."""
+    start = time.perf_counter()
+    intents = parse_intents(text)
+    score = confidence(text, intents)
+    if score >= threshold:
+        return _record(RoutedIntents(intents, score, "deterministic"), start)
+    try:
+        llm_data = await extractor.extract(text)
+    except Exception:
+        llm_data = None
+    return _record(_routed(intents, score, llm_data), start)
@@ -0,0 +1,160 @@
+"""Award-space calendar for flights.
+
+Availability is held as dense (row x day) NumPy matrices, one row per
+(origin, destination, flight, cabin, fare class) and one column per calendar
+day, so range queries over many flights and a month of dates are a single
+slice-and-mask instead of a Python loop.
+"""
+from __future__ import annotations
+import csv
+import json
+import os
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+from pte.engine.models import FlightOption
+
+class AwardSpace(NamedTuple):
+    date: date
+    flight: str
+    origin: str
+    destination: str
+    cabin: str
+    fare: str
+    seats: int
+    miles: int
+
+RowKey = Tuple[str, str, str, str, str]   # origin, destination, flight, cabin, fare
+
+@dataclass
+class AwardCalendar:
+    start: date
+    rows: List[RowKey]
+    seats: np.ndarray       # int16 (rows, days); 0 = no space
+    miles: np.ndarray       # int32 (rows, days); 0 = no price
+
+    def __post_init__(self):
+        grouped: Dict[Tuple[str, str], List[int]] = {}
+        self._by_flight: Dict[str, List[int]] = {}
+        for i, (o, d, flight, _cabin, _fare) in enumerate(self.rows):
+            grouped.setdefault((o, d), []).append(i)
+            self._by_flight.setdefault(flight, []).append(i)
+        self._by_route = {k: np.array(v, dtype=np.intp) for k, v in grouped.items()}
+
+    @property
+    def days(self) -> int:
+        return self.seats.shape[1]
+
+    def _cols(self, start: date, end: date) -> Tuple[int, int]:
+        lo = max((start - self.start).days, 0)
+        hi = min((end - self.start).days + 1, self.days)
+        return lo, max(lo, hi)
+
+    def _rows(self, origin: str, destination: str, cabin: Optional[str], fare: Optional[str]) -> np.ndarray:
+        rows = self._by_route.get((origin, destination))
+        if rows is None:
+            return np.empty(0, dtype=np.intp)
+        if cabin or fare:
+            keep = [r for r in rows
+                    if (not cabin or self.rows[r][3] == cabin) and (not fare or self.rows[r][4] == fare)]
+            rows = np.array(keep, dtype=np.intp)
+        return rows
+
+    def search(self, origin: str, destination: str, start: date, end: date, cabin: Optional[str] = None,
+               fare: Optional[str] = None, pax: int = 1) -> List[AwardSpace]:
+        """All (day, flight) cells between ``start`` and ``end`` inclusive with at least ``pax`` seats."""
+        rows = self._rows(origin, destination, cabin, fare)
+        lo, hi = self._cols(start, end)
+        if not len(rows) or lo == hi:
+            return []
+        seats = self.seats[rows, lo:hi]
+        r_idx, c_idx = np.nonzero(seats >= pax)
+        order = np.lexsort((self.miles[rows, lo:hi][r_idx, c_idx], c_idx))
+        out = []
+        for k in order:
+            r, c = rows[r_idx[k]], c_idx[k]
+            o, d, flight, cab, fr = self.rows[r]
+            out.append(AwardSpace(self.start + timedelta(days=int(lo + c)), flight, o, d, cab, fr,
+                                  int(self.seats[r, lo + c]), int(self.miles[r, lo + c])))
+        return out
+
+    def cheapest_by_day(self, origin: str, destination: str, start: date, end: date,
+                        cabin: Optional[str] = None, pax: int = 1) -> np.ndarray:
+        """Per-day minimum miles per passenger over all matching flights; 0 where nothing is bookable."""
+        rows = self._rows(origin, destination, cabin, None)
+        lo, hi = self._cols(start, end)
+        out = np.zeros((end - start).days + 1, dtype=np.int64)
+        if not len(rows) or lo == hi:
+            return out
+        miles = self.miles[rows, lo:hi].astype(np.int64)
+        priced = np.where((self.seats[rows, lo:hi] >= pax) & (miles > 0), miles, np.iinfo(np.int64).max)
+        best = priced.min(axis=0)
+        best[best == np.iinfo(np.int64).max] = 0
+        offset = lo - (start - self.start).days
+        out[offset:offset + len(best)] = best
+        return out
+
+    def lookup(self, flight: str, day: date, cabin: str, fare: Optional[str] = None) -> Optional[AwardSpace]:
+        """Cheapest bookable cell for one flight on one day."""
+        col = (day - self.start).days
+        if not 0 <= col < self.days:
+            return None
+        best = None
+        for r in self._by_flight.get(flight, ()):
+            key = self.rows[r]
+            if key[3] != cabin or (fare and key[4] != fare):
+                continue
+            seats, miles = int(self.seats[r, col]), int(self.miles[r, col])
+            if seats and miles and (best is None or miles < best.miles):
+                best = AwardSpace(day, flight, key[0], key[1], key[3], key[4], seats, miles)
+        return best
+
+def build_award_calendar(records: Iterable[Dict]) -> AwardCalendar:
+    """Records need date, carrier, flight_number, origin, destination, cabin, seats, miles;
+    fare_class is optional (defaults to 'saver')."""
+    cells = []
+    rows: Dict[RowKey, int] = {}
+    for rec in records:
+        key = (rec["origin"].strip().upper(), rec["destination"].strip().upper(),
+               f"{rec['carrier'].strip().upper()}{int(rec['flight_number'])}",
+               rec["cabin"].strip().lower(), (rec.get("fare_class") or "saver").strip().lower())
+        r = rows.setdefault(key, len(rows))
+        cells.append((r, date.fromisoformat(rec["date"]).toordinal(), int(rec["seats"] or 0), int(rec["miles"] or 0)))
+    if not cells:
+        return AwardCalendar(date.today(), [], np.zeros((0, 0), np.int16), np.zeros((0, 0), np.int32))
+    cell_arr = np.array(cells, dtype=np.int64)
+    first = int(cell_arr[:, 1].min())
+    days = int(cell_arr[:, 1].max()) - first + 1
+    seats = np.zeros((len(rows), days), dtype=np.int16)
+    miles = np.zeros((len(rows), days), dtype=np.int32)
+    seats[cell_arr[:, 0], cell_arr[:, 1] - first] = cell_arr[:, 2]
+    miles[cell_arr[:, 0], cell_arr[:, 1] - first] = cell_arr[:, 3]
+    return AwardCalendar(date.fromordinal(first), list(rows), seats, miles)
+
+def load_award_calendar(path: str) -> AwardCalendar:
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Award export not found: {path}")
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.endswith(".json"):
+            return build_award_calendar(json.load(f))
+        return build_award_calendar(csv.DictReader(f))
+
+def _flight_code(label: str) -> str:
+    # "DL121 (MSP→HND)" -> "DL121"
+    return label.split()[0] if label else ""
+
+def attach_award_pricing(options: Sequence[FlightOption], awards: AwardCalendar, day: date,
+                         pax: int = 1, fare: Optional[str] = None) -> None:
+    """Set points_price/award_seats on options whose outbound legs all have space on ``day``.
+
+    Multi-leg itineraries are priced as the sum of their legs and limited by the
+    tightest leg; legs are looked up on the outbound date.
+    """
+    for opt in options:
+        # Nonstop options list the return flight second; connections list outbound legs only.
+        legs = [_flight_code(l) for l in (opt.flight_numbers[:1] if opt.nonstop else opt.flight_numbers)]
+        found = [awards.lookup(code, day, opt.cabin, fare) for code in legs]
+        if legs and all(a is not None and a.seats >= pax for a in found):
+            opt.points_price = sum(a.miles for a in found)
+            opt.award_seats = min(a.seats for a in found)
@@ -0,0 +1,105 @@
+"""k-best itinerary search over a ScheduleStore.
+
+Time-dependent A*: labels are partial itineraries ordered by elapsed time
+since the first departure plus a lower bound on the flying time still needed,
+and each label only expands departures that leave its airport within the
+connection window (found by binary search in the schedule index). Legs that
+cannot reach the destination within the remaining stops are never queued. Times are tracked on the origin's clock; the per-leg time
+zone shift is recovered from local departure/arrival and elapsed minutes.
+"""
+from __future__ import annotations
+import heapq
+from datetime import date
+from typing import List, NamedTuple, Optional, Tuple
+from pte.engine.models import FlightOption
+from .schedule import CARRIER_NAMES, ScheduleStore, Segment, format_hhmm
+
+DAY = 24 * 60
+
+class Itinerary(NamedTuple):
+    segments: Tuple[Segment, ...]
+    dates: Tuple[date, ...]        # local departure date of each segment
+    elapsed_minutes: int
+
+    @property
+    def stops(self) -> int:
+        return len(self.segments) - 1
+
+def best_itineraries(store: ScheduleStore, origin: str, destination: str, day: date, k: int = 3,
+                     max_stops: int = 2, min_connection: int = 60, max_layover: int = 6 * 60,
+                     labels_per_airport: Optional[int] = None) -> List[Itinerary]:
+    """Return up to ``k`` itineraries with the lowest total elapsed time, departing ``origin`` on ``day``."""
+    dest_id = store.airport_ids.get(destination)
+    if dest_id is None or origin not in store.airport_ids:
+        return []
+    cap = labels_per_airport or 4 * k
+    c = store.cols
+    dep, arr, off, el, dst = c["dep"], c["arr"], c["arr_offset"], c["elapsed"], c["destination"]
+    base = day.toordinal()
+    hops, remaining = store.bounds_to(destination)
+    max_legs = max_stops + 1
+    unreachable = max_legs + 1
+
+    # label: (elapsed + lower bound, elapsed, first_dep_abs, arr_abs, tz_shift, airport_id, path)
+    # path: tuple of (segment_id, local departure ordinal); abs times are on origin's clock.
+    heap: list = []
+    for i in store.departure_ids(origin, day):
+        if 1 + hops.get(dst[i], unreachable) > max_legs:
+            continue
+        shift = arr[i] + off[i] * DAY - dep[i] - el[i]
+        heapq.heappush(heap, (el[i] + remaining[dst[i]], el[i], dep[i], dep[i] + el[i], shift, dst[i],
+                              ((i, base),)))
+
+    results: List[Itinerary] = []
+    expanded = {}
+    while heap and len(results) < k:
+        _, elapsed, first_dep, arr_abs, shift, airport, path = heapq.heappop(heap)
+        if airport == dest_id:
+            results.append(Itinerary(
+                segments=tuple(store.segment(i) for i, _ in path),
+                dates=tuple(date.fromordinal(o) for _, o in path),
+                elapsed_minutes=elapsed,
+            ))
+            continue
+        if expanded.get(airport, 0) >= cap:
+            continue
+        expanded[airport] = expanded.get(airport, 0) + 1
+
+        visited = {c["origin"][i] for i, _ in path}
+        hub = store.airports[airport]
+        earliest = arr_abs + shift + min_connection      # hub local, minutes from base midnight
+        latest = arr_abs + shift + max_layover
+        for day_idx in range(earliest // DAY, latest // DAY + 1):
+            lo = max(earliest - day_idx * DAY, 0)
+            hi = min(latest - day_idx * DAY + 1, DAY)
+            for j in store.departure_ids(hub, date.fromordinal(base + day_idx), lo, hi):
+                # Skip legs that cannot reach the destination within the remaining stops.
+                if dst[j] in visited or len(path) + 1 + hops.get(dst[j], unreachable) > max_legs:
+                    continue
+                dep_abs = day_idx * DAY + dep[j] - shift
+                leg_shift = arr[j] + off[j] * DAY - dep[j] - el[j]
+                new_arr = dep_abs + el[j]
+                new_elapsed = new_arr - first_dep
+                heapq.heappush(heap, (new_elapsed + remaining[dst[j]], new_elapsed, first_dep, new_arr,
+                                      shift + leg_shift, dst[j], path + ((j, base + day_idx),)))
+    return results
+
+def itinerary_to_option(it: Itinerary, cabin: str) -> FlightOption:
+    first, last = it.segments[0], it.segments[-1]
+    carriers = {s.carrier for s in it.segments}
+    carrier = CARRIER_NAMES.get(first.carrier, first.carrier) if len(carriers) == 1 else " / ".join(sorted(carriers))
+    hubs = [s.destination for s in it.segments[:-1]]
+    if hubs:
+        carrier = f"{carrier} (via {', '.join(hubs)})"
+    arrive_offset = (it.dates[-1] - it.dates[0]).days + last.arr_day_offset
+    return FlightOption(
+        carrier=carrier,
+        flight_numbers=[f"{s.flight_code} ({s.origin}→{s.destination})" for s in it.segments],
+        cabin=cabin,
+        nonstop=len(it.segments) == 1,
+        origin=first.origin,
+        destination=last.destination,
+        depart_time_local=format_hhmm(first.dep_minutes),
+        arrive_time_local=format_hhmm(last.arr_minutes, arrive_offset),
+        duration_minutes=it.elapsed_minutes,
+    )
@@ -1,6 +1,60 @@
 from __future__ import annotations
-from typing import List
+import os
+from functools import lru_cache
+from typing import List, Optional
 from pte.engine.models import Trip, FlightOption
+from pte.providers.flights.awards import AwardCalendar, attach_award_pricing, load_award_calendar
+from pte.providers.flights.connections import best_itineraries, itinerary_to_option
+from pte.providers.flights.schedule import CARRIER_NAMES, ScheduleStore, Segment, format_hhmm, load_schedule
+
+# Set PTE_SCHEDULE_FILE to a schedule CSV or compiled store to plan any origin/destination,
+# and PTE_AWARDS_FILE to an award-space export (CSV/JSON) to price flights in miles.
+SCHEDULE_ENV = "PTE_SCHEDULE_FILE"
+AWARDS_ENV = "PTE_AWARDS_FILE"
+
+@lru_cache(maxsize=1)
+def default_schedule() -> Optional[ScheduleStore]:
+    path = os.environ.get(SCHEDULE_ENV)
+    return load_schedule(path) if path else None
+
+@lru_cache(maxsize=1)
+def default_awards() -> Optional[AwardCalendar]:
+    path = os.environ.get(AWARDS_ENV)
+    return load_award_calendar(path) if path else None
+
+def _leg_label(seg: Segment) -> str:
+    return f"{seg.flight_code} ({seg.origin}→{seg.destination})"
+
+def flights_from_schedule(trip: Trip, schedule: ScheduleStore, connections: int = 3) -> List[FlightOption]:
+    """Nonstops on the trip's start date (each paired with a same-carrier return if one
+    exists) and the ``connections`` fastest one/two-stop itineraries. Nonstops lead
+    when ``trip.prefer_nonstop``, connections otherwise."""
+    if not trip.start_date:
+        return []
+    returns = schedule.nonstops(trip.destination, trip.origin, trip.end_date) if trip.end_date else []
+    options: List[FlightOption] = []
+    for seg in schedule.nonstops(trip.origin, trip.destination, trip.start_date):
+        numbers = [_leg_label(seg)]
+        back = next((r for r in returns if r.carrier == seg.carrier), None)
+        if back:
+            numbers.append(_leg_label(back))
+        options.append(FlightOption(
+            carrier=CARRIER_NAMES.get(seg.carrier, seg.carrier),
+            flight_numbers=numbers,
+            cabin=trip.cabin_pref,
+            nonstop=True,
+            origin=seg.origin,
+            destination=seg.destination,
+            depart_time_local=format_hhmm(seg.dep_minutes),
+            arrive_time_local=format_hhmm(seg.arr_minutes, seg.arr_day_offset),
+            duration_minutes=seg.elapsed_minutes,
+        ))
+    if connections:
+        itineraries = best_itineraries(schedule, trip.origin, trip.destination, trip.start_date,
+                                       k=len(options) + connections)
+        connecting = [itinerary_to_option(it, trip.cabin_pref) for it in itineraries if it.stops]
+        options = options + connecting if trip.prefer_nonstop else connecting + options
+    return options
 
 def get_msp_hnd_primary(trip: Trip) -> FlightOption:
     return FlightOption(
@@ -30,10 +84,16 @@ def get_msp_hnd_fallbacks(trip: Trip) -> List[FlightOption]:
         ))
     return options
 
-def propose_flights(trip: Trip) -> List[FlightOption]:
-    options: List[FlightOption] = []
-    primary = get_msp_hnd_primary(trip)
-    if trip.prefer_nonstop:
-        options.append(primary)
-    options.extend(get_msp_hnd_fallbacks(trip))
+def propose_flights(trip: Trip, schedule: Optional[ScheduleStore] = None,
+                    awards: Optional[AwardCalendar] = None) -> List[FlightOption]:
+    schedule = schedule or default_schedule()
+    options: List[FlightOption] = flights_from_schedule(trip, schedule) if schedule is not None else []
+    if not options:
+        primary = get_msp_hnd_primary(trip)
+        if trip.prefer_nonstop:
+            options.append(primary)
+        options.extend(get_msp_hnd_fallbacks(trip))
+    awards = awards or default_awards()
+    if awards is not None and trip.start_date:
+        attach_award_pricing(options, awards, trip.start_date, pax=trip.pax)
     return options
@@ -0,0 +1,271 @@
+"""Indexed flight schedule store.
+
+Segments come from an OAG/GTFS-style flat file (one row per operated flight
+leg) and are held column-wise in ``array`` buffers. A secondary index keyed by
+(origin, weekday) and sorted by departure time answers "what leaves X on day
+D (after time T)" with two binary searches, and the whole store round-trips
+through a compact binary file so startup does not re-parse CSV.
+"""
+from __future__ import annotations
+import csv
+import heapq
+import json
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+MAGIC = b"PTESCHD1"
+
+CARRIER_NAMES = {
+    "DL": "Delta Air Lines", "UA": "United Airlines", "AA": "American Airlines",
+    "NH": "ANA", "JL": "Japan Airlines", "AS": "Alaska Airlines", "KE": "Korean Air",
+}
+
+# name -> array typecode; order is the on-disk order.
+_COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("origin", "H"), ("destination", "H"), ("carrier", "H"), ("number", "I"),
+    ("days", "B"), ("dep", "H"), ("arr", "H"), ("arr_offset", "b"), ("elapsed", "H"),
+    ("equipment", "H"), ("valid_from", "i"), ("valid_to", "i"),
+)
+_INDEX_COLUMNS: Tuple[Tuple[str, str], ...] = (("idx_key", "i"), ("idx_dep", "H"), ("idx_seg", "i"))
+
+class Segment(NamedTuple):
+    carrier: str
+    flight_number: int
+    origin: str
+    destination: str
+    dep_minutes: int          # local minutes after midnight
+    arr_minutes: int          # local minutes after midnight
+    arr_day_offset: int
+    elapsed_minutes: int
+    equipment: str
+
+    @property
+    def flight_code(self) -> str:
+        return f"{self.carrier}{self.flight_number}"
+
+def parse_days(days: str) -> int:
+    """OAG days of operation ('1234567', '1.3.5..', '135') -> Monday-first bitmask."""
+    mask = 0
+    for ch in days:
+        if ch.isdigit() and 1 <= int(ch) <= 7:
+            mask |= 1 << (int(ch) - 1)
+    return mask
+
+def parse_hhmm(value: str) -> int:
+    value = value.strip().replace(":", "")
+    return int(value[:-2] or 0) * 60 + int(value[-2:])
+
+def format_hhmm(minutes: int, day_offset: int = 0) -> str:
+    s = f"{minutes // 60:02d}:{minutes % 60:02d}"
+    return f"{s}+{day_offset}" if day_offset else s
+
+class _Interner:
+    def __init__(self, values: Iterable[str] = ()):
+        self.values: List[str] = list(values)
+        self.ids: Dict[str, int] = {v: i for i, v in enumerate(self.values)}
+
+    def __call__(self, value: str) -> int:
+        i = self.ids.get(value)
+        if i is None:
+            i = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return i
+
+class ScheduleStore:
+    def __init__(self, airports: List[str], carriers: List[str], equipment: List[str],
+                 columns: Dict[str, array], index: Optional[Dict[str, array]] = None):
+        self.airports = airports
+        self.carriers = carriers
+        self.equipment = equipment
+        self.airport_ids = {a: i for i, a in enumerate(airports)}
+        self.cols = columns
+        if index is None:
+            index = self._build_index()
+        self._idx_key = index["idx_key"]
+        self._idx_dep = index["idx_dep"]
+        self._idx_seg = index["idx_seg"]
+
+    def __len__(self) -> int:
+        return len(self.cols["origin"])
+
+    def _route_graph(self) -> Dict[int, Dict[int, int]]:
+        """dest id -> {origin id: shortest scheduled elapsed minutes} (built once)."""
+        if "_inbound" not in self.__dict__:
+            inbound: Dict[int, Dict[int, int]] = {}
+            for o, d, el in zip(self.cols["origin"], self.cols["destination"], self.cols["elapsed"]):
+                row = inbound.setdefault(d, {})
+                if el < row.get(o, 1 << 30):
+                    row[o] = el
+            self._inbound = inbound
+        return self._inbound
+
+    def bounds_to(self, destination: str) -> Tuple[Dict[int, int], Dict[int, int]]:
+        """Per airport id: (minimum legs, minimum flying minutes) to ``destination``. Cached."""
+        cache = self.__dict__.setdefault("_bounds", {})
+        if destination in cache:
+            return cache[destination]
+        inbound = self._route_graph()
+        did = self.airport_ids.get(destination)
+        hops: Dict[int, int] = {}
+        minutes: Dict[int, int] = {}
+        if did is not None:
+            # Reverse BFS for legs, reverse Dijkstra for minutes.
+            hops[did] = 0
+            frontier = [did]
+            while frontier:
+                nxt = []
+                for a in frontier:
+                    for o in inbound.get(a, ()):
+                        if o not in hops:
+                            hops[o] = hops[a] + 1
+                            nxt.append(o)
+                frontier = nxt
+            heap = [(0, did)]
+            while heap:
+                m, a = heapq.heappop(heap)
+                if a in minutes:
+                    continue
+                minutes[a] = m
+                for o, el in inbound.get(a, {}).items():
+                    if o not in minutes:
+                        heapq.heappush(heap, (m + el, o))
+        cache[destination] = (hops, minutes)
+        return hops, minutes
+
+    def _build_index(self) -> Dict[str, array]:
+        origin, days, dep = self.cols["origin"], self.cols["days"], self.cols["dep"]
+        order = sorted(range(len(origin)), key=lambda i: (origin[i], dep[i]))
+        keys, deps, segs = array("i"), array("H"), array("i")
+        start = 0
+        while start < len(order):
+            oid = origin[order[start]]
+            end = start
+            while end < len(order) and origin[order[end]] == oid:
+                end += 1
+            group = order[start:end]
+            for wd in range(7):
+                bit = 1 << wd
+                ids = [i for i in group if days[i] & bit]
+                keys.extend([oid * 7 + wd] * len(ids))
+                deps.extend(dep[i] for i in ids)
+                segs.extend(ids)
+            start = end
+        return {"idx_key": keys, "idx_dep": deps, "idx_seg": segs}
+
+    # --- Queries ---------------------------------------------------------
+
+    def _bucket(self, origin: str, day: date) -> Tuple[int, int]:
+        oid = self.airport_ids.get(origin)
+        if oid is None:
+            return 0, 0
+        key = oid * 7 + day.weekday()
+        return bisect_left(self._idx_key, key), bisect_right(self._idx_key, key)
+
+    def departure_ids(self, origin: str, day: date, after_minutes: int = 0,
+                      before_minutes: int = 24 * 60) -> List[int]:
+        """Segment ids leaving ``origin`` on ``day`` in [after, before), by departure time."""
+        lo, hi = self._bucket(origin, day)
+        lo = bisect_left(self._idx_dep, after_minutes, lo, hi)
+        hi = bisect_left(self._idx_dep, before_minutes, lo, hi)
+        ordinal = day.toordinal()
+        vf, vt = self.cols["valid_from"], self.cols["valid_to"]
+        out = []
+        for i in self._idx_seg[lo:hi]:
+            if (vf[i] and ordinal < vf[i]) or (vt[i] and ordinal > vt[i]):
+                continue
+            out.append(i)
+        return out
+
+    def segment(self, i: int) -> Segment:
+        c = self.cols
+        return Segment(
+            carrier=self.carriers[c["carrier"][i]], flight_number=c["number"][i],
+            origin=self.airports[c["origin"][i]], destination=self.airports[c["destination"][i]],
+            dep_minutes=c["dep"][i], arr_minutes=c["arr"][i], arr_day_offset=c["arr_offset"][i],
+            elapsed_minutes=c["elapsed"][i], equipment=self.equipment[c["equipment"][i]],
+        )
+
+    def departures(self, origin: str, day: date, after_minutes: int = 0) -> List[Segment]:
+        return [self.segment(i) for i in self.departure_ids(origin, day, after_minutes)]
+
+    def nonstops(self, origin: str, destination: str, day: date) -> List[Segment]:
+        did = self.airport_ids.get(destination)
+        if did is None:
+            return []
+        dest = self.cols["destination"]
+        return [self.segment(i) for i in self.departure_ids(origin, day) if dest[i] == did]
+
+    # --- Persistence -------------------------------------------------------
+
+    def save(self, path: str) -> None:
+        header = {
+            "version": 1, "byteorder": sys.byteorder, "count": len(self), "index_count": len(self._idx_seg),
+            "airports": self.airports, "carriers": self.carriers, "equipment": self.equipment,
+        }
+        raw = json.dumps(header, separators=(",", ":")).encode("utf-8")
+        arrays = {**self.cols, "idx_key": self._idx_key, "idx_dep": self._idx_dep, "idx_seg": self._idx_seg}
+        with open(path, "wb") as f:
+            f.write(MAGIC)
+            f.write(len(raw).to_bytes(4, "little"))
+            f.write(raw)
+            for name, _ in _COLUMNS + _INDEX_COLUMNS:
+                arrays[name].tofile(f)
+
+    @classmethod
+    def load(cls, path: str) -> "ScheduleStore":
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not a schedule store file: {path}")
+            header = json.loads(f.read(int.from_bytes(f.read(4), "little")))
+            arrays: Dict[str, array] = {}
+            for name, code in _COLUMNS + _INDEX_COLUMNS:
+                a = array(code)
+                a.fromfile(f, header["index_count"] if name.startswith("idx_") else header["count"])
+                if header["byteorder"] != sys.byteorder:
+                    a.byteswap()
+                arrays[name] = a
+        index = {k: arrays.pop(k) for k, _ in _INDEX_COLUMNS}
+        return cls(header["airports"], header["carriers"], header["equipment"], arrays, index)
+
+def build_store(rows: Iterable[Dict[str, str]]) -> ScheduleStore:
+    """Build a store from flat-file rows.
+
+    Required fields: carrier, flight_number, origin, destination, days, dep,
+    arr, elapsed. Optional: arr_day_offset, equipment, valid_from, valid_to (ISO dates).
+    """
+    airports, carriers, equipment = _Interner(), _Interner(), _Interner([""])
+    cols = {name: array(code) for name, code in _COLUMNS}
+    for row in rows:
+        cols["origin"].append(airports(row["origin"].strip().upper()))
+        cols["destination"].append(airports(row["destination"].strip().upper()))
+        cols["carrier"].append(carriers(row["carrier"].strip().upper()))
+        cols["number"].append(int(row["flight_number"]))
+        cols["days"].append(parse_days(row["days"]))
+        cols["dep"].append(parse_hhmm(row["dep"]))
+        cols["arr"].append(parse_hhmm(row["arr"]))
+        cols["arr_offset"].append(int(row.get("arr_day_offset") or 0))
+        cols["elapsed"].append(int(row["elapsed"]))
+        cols["equipment"].append(equipment((row.get("equipment") or "").strip()))
+        vf, vt = row.get("valid_from"), row.get("valid_to")
+        cols["valid_from"].append(date.fromisoformat(vf).toordinal() if vf else 0)
+        cols["valid_to"].append(date.fromisoformat(vt).toordinal() if vt else 0)
+    return ScheduleStore(airports.values, carriers.values, equipment.values, cols)
+
+def load_schedule_csv(path: str) -> ScheduleStore:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return build_store(csv.DictReader(f))
+
+def load_schedule(path: str) -> ScheduleStore:
+    """Load a compiled store, or ingest a CSV flat file."""
+    return load_schedule_csv(path) if path.endswith(".csv") else ScheduleStore.load(path)
+
+if __name__ == "__main__":
+    # python -m pte.providers.flights.schedule schedule.csv schedule.bin
+    if len(sys.argv) != 3:
+        raise SystemExit("usage: python -m pte.providers.flights.schedule <in.csv> <out.bin>")
+    store = load_schedule_csv(sys.argv[1])
+    store.save(sys.argv[2])
+    print(f"Wrote {sys.argv[2]} ({len(store)} segments)")
@@ -1,8 +1,8 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Dict, Optional, List
+from typing import Dict, Mapping, Optional, List, Tuple, Union
 from datetime import date
-from pte.engine.models import Trip, HotelNight, StayPlan, daterange
+from pte.engine.days import day_range
+from pte.engine.models import Trip, HotelNight, StayPlan
 
 HYATT_META = {
     "Park Hyatt Tokyo": {
@@ -17,38 +17,86 @@ HYATT_META = {
     }
 }
 
-@dataclass
+# Calendars are stored densely, so bound the span one may cover (about ten years).
+MAX_CALENDAR_DAYS = 3660
+
 class HyattCalendar:
-    nightly_points: Dict[date, Optional[int]]
+    """
+    Award points per night, stored densely from day ordinal ``first``
+    (see pte.engine.days). None means unavailable or unknown.
+    """
+    __slots__ = ("first", "points")
+
+    def __init__(self, nightly_points: Optional[Mapping[date, Optional[int]]] = None):
+        by_day = {d.toordinal(): p for d, p in (nightly_points or {}).items()}
+        self.first, self.points = _dense(by_day)
+
+    @classmethod
+    def from_days(cls, first: int, points: List[Optional[int]]) -> "HyattCalendar":
+        cal = cls.__new__(cls)
+        cal.first, cal.points = first, points
+        return cal
+
+    @classmethod
+    def from_day_map(cls, by_day: Mapping[int, Optional[int]]) -> "HyattCalendar":
+        return cls.from_days(*_dense(by_day))
+
+    def points_on(self, day: int) -> Optional[int]:
+        i = day - self.first
+        return self.points[i] if 0 <= i < len(self.points) else None
+
+    def points_between(self, start: int, end: int) -> List[Optional[int]]:
+        """Points for days ``start`` up to ``end`` (exclusive), None-padded outside the calendar."""
+        lo, hi = start - self.first, end - self.first
+        if lo >= 0 and hi <= len(self.points):
+            return self.points[lo:hi]
+        return [self.points_on(d) for d in range(start, end)]
+
+    @property
+    def nightly_points(self) -> Dict[date, Optional[int]]:
+        """Date-keyed view, for export and display. Every day between the first and
+        last night is present: days the source left out read as None, the same as
+        unavailable nights and as ``points_on``."""
+        return {date.fromordinal(self.first + i): p for i, p in enumerate(self.points)}
+
+def _dense(by_day: Mapping[int, Optional[int]]) -> Tuple[int, List[Optional[int]]]:
+    if not by_day:
+        return 0, []
+    first = min(by_day)
+    span = max(by_day) - first + 1
+    if span > MAX_CALENDAR_DAYS:
+        raise ValueError(f"Calendar spans {span} days ({date.fromordinal(first)} to "
+                         f"{date.fromordinal(max(by_day))}); at most {MAX_CALENDAR_DAYS} are supported")
+    points: List[Optional[int]] = [None] * span
+    for day, p in by_day.items():
+        points[day - first] = p
+    return first, points
+
+def calendar_from_json(data: Union[str, bytes]) -> HyattCalendar:
+    """Parse the JSON import format ``{"2027-11-20": 35000, ...}`` (null = unavailable)."""
+    import json
+    return HyattCalendar.from_day_map({date.fromisoformat(k).toordinal(): int(v) if v is not None else None
+                                       for k, v in json.loads(data).items()})
+
+def calendar_from_csv(text: str) -> HyattCalendar:
+    """Parse the CSV import format: a ``date,points`` header, empty points = unavailable."""
+    import csv, io
+    return HyattCalendar.from_day_map({date.fromisoformat(row["date"]).toordinal():
+                                       int(row["points"]) if row["points"] else None
+                                       for row in csv.DictReader(io.StringIO(text))})
 
 def load_calendar_from_import(path: str) -> HyattCalendar:
-    import os, json, csv
-    nightly = {}
+    import os
     if not os.path.exists(path):
         raise FileNotFoundError(f"Calendar file not found: {path}")
-    if path.endswith(".json"):
-        with open(path, "r", encoding="utf-8") as f:
-            raw = json.load(f)
-            for k, v in raw.items():
-                nightly[date.fromisoformat(k)] = int(v) if v is not None else None
-    else:
-        with open(path, "r", encoding="utf-8") as f:
-            r = csv.DictReader(f)
-            for row in r:
-                nightly[date.fromisoformat(row["date"])] = int(row["points"]) if row["points"] else None
-    return HyattCalendar(nightly)
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    return calendar_from_json(text) if path.endswith(".json") else calendar_from_csv(text)
 
 def load_calendar_from_fixture(hotel_name: str, start: date, end: date) -> HyattCalendar:
-    from datetime import timedelta
-    off, std, peak = HYATT_META[hotel_name]["award_points"]
-    nightly = {}
-    d = start
-    i = 0
-    while d < end:
-        nightly[d] = [off, std, peak][i % 3]  # synthetic cycle for testing
-        d += timedelta(days=1)
-        i += 1
-    return HyattCalendar(nightly)
+    cycle = HYATT_META[hotel_name]["award_points"]  # off/standard/peak; synthetic cycle for testing
+    nights = len(day_range(start, end))
+    return HyattCalendar.from_days(start.toordinal(), [cycle[i % 3] for i in range(nights)])
 
 def get_hotel_meta(hotel_name: str) -> Dict:
     return HYATT_META[hotel_name]
@@ -56,31 +104,28 @@ def get_hotel_meta(hotel_name: str) -> Dict:
 def allocate_hyatt_stay(trip: Trip, start_hotel: str, alternates: List[str],
                         calendars: Dict[str, HyattCalendar], prefer_single_hotel: bool=False) -> StayPlan:
     if not trip.start_date or not trip.end_date:
-        return StayPlan([])
-    nights: List[HotelNight] = []
+        return StayPlan()
+    stay = StayPlan()
+    days = day_range(trip.start_date, trip.end_date)
     main_cal = calendars.get(start_hotel)
-    alt_cals = {h: calendars[h] for h in alternates if h in calendars}
-    for d in daterange(trip.start_date, trip.end_date):
-        main_pts = main_cal.nightly_points.get(d) if main_cal else None
+    main_pts = main_cal.points_between(days.start, days.stop) if main_cal else [None] * len(days)
+    alt_pts = [(h, calendars[h].points_between(days.start, days.stop)) for h in alternates if h in calendars]
+    threshold = 10000 if prefer_single_hotel else 5000
+    for i, day in enumerate(days):
         chosen_hotel = start_hotel
-        chosen_pts = main_pts
-        chosen_is_peak = True if main_pts == 45000 else False
-        for alt_name, alt_cal in alt_cals.items():
-            alt_pts = alt_cal.nightly_points.get(d)
-            if alt_pts is None or main_pts is None:
-                continue
-            threshold = 10000 if prefer_single_hotel else 5000
-            if alt_pts + threshold <= main_pts:
-                chosen_hotel = alt_name
-                chosen_pts = alt_pts
-                chosen_is_peak = True if alt_pts == 45000 else False
-                break
+        chosen_pts = main = main_pts[i]
+        if main is not None:
+            for alt_name, pts in alt_pts:
+                alt = pts[i]
+                if alt is not None and alt + threshold <= main:
+                    chosen_hotel, chosen_pts = alt_name, alt
+                    break
         meta = get_hotel_meta(chosen_hotel)
-        nights.append(HotelNight(
-            date=d, hotel_name=chosen_hotel, program=meta["program"],
-            points_price=chosen_pts, cash_price=None, is_peak=chosen_is_peak, notes=""
+        stay.add(HotelNight(
+            day=day, hotel_name=chosen_hotel, program=meta["program"],
+            points_price=chosen_pts, cash_price=None, is_peak=chosen_pts == 45000, notes=""
         ))
-    return StayPlan(nights)
+    return stay
 
 def load_calendars_for_trip(trip: Trip, mode: str="import", import_paths: Optional[Dict[str, str]]=None) -> Dict[str, HyattCalendar]:
     calendars: Dict[str, HyattCalendar] = {}
@@ -0,0 +1,152 @@
+from __future__ import annotations
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Seconds; upper bounds of the latency histogram buckets (+Inf is implicit).
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+def _label_key(labels: Optional[Dict[str, str]]) -> LabelKey:
+    return tuple(sorted((labels or {}).items()))
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(key) + ([extra] if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in items) + "}"
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        out, running = [], 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            running += n
+            out.append(("+Inf" if bound == float("inf") else repr(bound), running))
+        return out
+
+class MetricsRegistry:
+    """Thread-safe counters, histograms and callback gauges rendered as Prometheus text."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._meta: Dict[str, Tuple[str, str]] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._gauges: Dict[str, Callable[[], float]] = {}
+
+    def describe(self, name: str, kind: str, help_text: str) -> None:
+        self._meta[name] = (kind, help_text)
+
+    def inc(self, name: str, labels: Optional[Dict[str, str]] = None, value: float = 1.0) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, str]] = None) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = Histogram()
+            hist.observe(value)
+
+    def gauge(self, name: str, fn: Callable[[], float], help_text: str = "") -> None:
+        self._gauges[name] = fn
+        self.describe(name, "gauge", help_text)
+
+    def counter_value(self, name: str, labels: Optional[Dict[str, str]] = None) -> float:
+        return self._counters.get(name, {}).get(_label_key(labels), 0.0)
+
+    def histogram(self, name: str, labels: Optional[Dict[str, str]] = None) -> Optional[Histogram]:
+        return self._histograms.get(name, {}).get(_label_key(labels))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def _header(self, lines: List[str], name: str, default_kind: str) -> None:
+        kind, help_text = self._meta.get(name, (default_kind, ""))
+        if help_text:
+            lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    def render(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for name in sorted(self._counters):
+                self._header(lines, name, "counter")
+                for key, value in sorted(self._counters[name].items()):
+                    lines.append(f"{name}{_format_labels(key)} {value:g}")
+            for name in sorted(self._histograms):
+                self._header(lines, name, "histogram")
+                for key, hist in sorted(self._histograms[name].items()):
+                    for le, n in hist.cumulative():
+                        lines.append(f"{name}_bucket{_format_labels(key, ('le', le))} {n}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {hist.sum:.6f}")
+                    lines.append(f"{name}_count{_format_labels(key)} {hist.count}")
+        for name in sorted(self._gauges):
+            self._header(lines, name, "gauge")
+            lines.append(f"{name} {self._gauges[name]():g}")
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+registry.describe("pte_http_requests_total", "counter", "HTTP requests by route, method and status.")
+registry.describe("pte_http_request_duration_seconds", "histogram", "HTTP request latency by route.")
+registry.describe("pte_stage_duration_seconds", "histogram", "Planning pipeline stage latency.")
+registry.describe("pte_cache_requests_total", "counter", "Cache lookups by cache name and result.")
+
+# --- Per-request stage timing ---------------------------------------------
+
+_stage_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("pte_stage_timings", default=None)
+
+def begin_stage_timings() -> List[Tuple[str, float]]:
+    """Start collecting stage timings for the current request/context."""
+    timings: List[Tuple[str, float]] = []
+    _stage_timings.set(timings)
+    return timings
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a block as pipeline stage ``name``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        registry.observe("pte_stage_duration_seconds", elapsed, {"stage": name})
+        timings = _stage_timings.get()
+        if timings is not None:
+            timings.append((name, elapsed))
+
+def record_cache(cache: str, hit: bool) -> None:
+    registry.inc("pte_cache_requests_total", {"cache": cache, "result": "hit" if hit else "miss"})
+
+def server_timing_header(timings: List[Tuple[str, float]], total: Optional[float] = None) -> str:
+    merged: Dict[str, float] = {}
+    for name, elapsed in timings:       # a stage may run more than once per request
+        merged[name] = merged.get(name, 0.0) + elapsed
+    parts = [f"{name};dur={elapsed * 1000:.2f}" for name, elapsed in merged.items()]
+    if total is not None:
+        parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
@@ -0,0 +1,291 @@
+# pte/utils/profiling.py
+"""
+One switch to profile any entry point.
+
+Pass ``--profile [cprofile|sample]`` to the CLIs and main.py, or set
+``PTE_PROFILE=cprofile|sample`` for any process, the API included. Each
+profiled run writes to ``PTE_PROFILE_DIR`` (default ``out/profiles``):
+
+    <name>.pstats      cProfile stats (python -m pstats, snakeviz)      cprofile mode
+    <name>.txt         top functions by cumulative time                  cprofile mode
+    <name>.collapsed   "frame;frame;frame weight" lines for flamegraph.pl / speedscope
+    <name>.alloc.txt   top allocation sites (--profile-memory / PTE_PROFILE_MEMORY=1)
+
+In cprofile mode the collapsed stacks are rebuilt from the call graph, in
+microseconds. In sample mode they are real stacks sampled every
+``PTE_PROFILE_INTERVAL`` seconds. The API profiles every
+``PTE_PROFILE_EVERY``-th request, one at a time: a request that comes due
+while another is being profiled is skipped. It also follows work the
+request hands to the threadpool, as long as that work is wrapped with
+``traced``.
+"""
+from __future__ import annotations
+import cProfile
+import io
+import itertools
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+MODES = ("cprofile", "sample")
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, "").lower() in ("1", "true", "yes")
+
+@dataclass
+class ProfileConfig:
+    mode: Optional[str] = None          # None = off
+    out_dir: str = "out/profiles"
+    memory: bool = False
+    every: int = 1                      # API: profile every N-th request
+    top: int = 40                       # rows in the .txt and .alloc.txt reports
+    interval: float = 0.001             # sample mode, seconds
+
+    @classmethod
+    def from_env(cls) -> "ProfileConfig":
+        mode = os.environ.get("PTE_PROFILE", "").lower() or None
+        if mode in ("1", "true", "yes"):
+            mode = "cprofile"
+        if mode is not None and mode not in MODES:
+            raise ValueError(f"PTE_PROFILE must be one of {', '.join(MODES)}, got {mode!r}")
+        return cls(mode=mode, out_dir=os.environ.get("PTE_PROFILE_DIR", "out/profiles"),
+                   memory=_env_flag("PTE_PROFILE_MEMORY"),
+                   every=max(1, int(os.environ.get("PTE_PROFILE_EVERY", 1))),
+                   top=int(os.environ.get("PTE_PROFILE_TOP", 40)),
+                   interval=float(os.environ.get("PTE_PROFILE_INTERVAL", 0.001)))
+
+def add_profile_args(ap) -> None:
+    ap.add_argument("--profile", nargs="?", const="cprofile", choices=MODES,
+                    help="Profile this run (default cprofile); output in $PTE_PROFILE_DIR or out/profiles")
+    ap.add_argument("--profile-memory", action="store_true", help="With --profile: record top allocation sites")
+
+def config_from_args(args) -> ProfileConfig:
+    """Environment settings, overridden by --profile/--profile-memory."""
+    config = ProfileConfig.from_env()
+    if getattr(args, "profile", None):
+        config.mode = args.profile
+    if getattr(args, "profile_memory", False):
+        config.memory = True
+        config.mode = config.mode or "cprofile"
+    return config
+
+# --- Collapsed stacks --------------------------------------------------------
+
+def _label(func: Tuple[str, int, str]) -> str:
+    filename, line, name = func
+    if filename == "~":                     # builtins: ('~', 0, "<built-in method ...>")
+        return name
+    return f"{os.path.basename(filename)}:{name}:{line}"
+
+def collapsed_from_stats(stats: Dict, max_depth: int = 64) -> Counter:
+    """
+    Approximate stacks from cProfile's caller/callee edges, weighted in
+    microseconds. A callee's time is split across its callers in
+    proportion to each edge's cumulative time.
+    """
+    children: Dict[Tuple, List[Tuple[Tuple, float]]] = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            children.setdefault(caller, []).append((func, edge[3]))
+    out: Counter = Counter()
+
+    def walk(func, path: List[str], on_path: Set, scale: float) -> None:
+        _, _, tt, ct, _ = stats[func]
+        if tt * scale >= 1e-6:
+            out[";".join(path)] += int(tt * scale * 1e6)
+        if len(path) >= max_depth:
+            return
+        for child, edge_ct in children.get(func, ()):
+            child_ct = stats[child][3]
+            if child in on_path or child_ct <= 0 or edge_ct <= 0:
+                continue
+            on_path.add(child)
+            walk(child, path + [_label(child)], on_path, scale * edge_ct / child_ct)
+            on_path.discard(child)
+
+    for func, (_, _, _, _, callers) in stats.items():
+        if not callers:
+            walk(func, [_label(func)], {func}, 1.0)
+    return out
+
+class Sampler:
+    """Samples the stacks of a set of threads from a background thread."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.threads: Set[int] = set()
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="pte-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for ident in list(self.threads):
+                frame = frames.get(ident)
+                path = []
+                while frame is not None:
+                    code = frame.f_code
+                    path.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{code.co_firstlineno}")
+                    frame = frame.f_back
+                if path:
+                    self.stacks[";".join(reversed(path))] += 1
+
+# --- Profiler ---------------------------------------------------------------
+
+_SAFE = re.compile(r"[^\w.-]+")
+_seq = itertools.count(1)
+
+@dataclass
+class Profiler:
+    """One profiled run. ``start``/``stop`` on the same thread; ``stop`` writes the reports."""
+    name: str
+    config: ProfileConfig
+    extra: List[cProfile.Profile] = field(default_factory=list)    # from traced() worker threads
+    _profile: Optional[cProfile.Profile] = None
+    _sampler: Optional[Sampler] = None
+    _tracing: bool = False
+
+    def start(self) -> "Profiler":
+        if self.config.memory and not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+            self._tracing = True
+        if self.config.mode == "sample":
+            self._sampler = Sampler(self.config.interval)
+            self._sampler.threads.add(threading.get_ident())
+            self._sampler.start()
+        else:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        return self
+
+    def stop(self) -> List[str]:
+        snapshot = None
+        if self._profile is not None:
+            self._profile.disable()
+        if self._sampler is not None:
+            self._sampler.stop()
+        if self.config.memory and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            if self._tracing:
+                tracemalloc.stop()
+        return self._write(snapshot)
+
+    def _write(self, snapshot) -> List[str]:
+        os.makedirs(self.config.out_dir, exist_ok=True)
+        stem = os.path.join(self.config.out_dir, f"{_SAFE.sub('_', self.name)}-{os.getpid()}-{next(_seq)}")
+        written = []
+
+        def write(suffix: str, text: str) -> None:
+            with open(stem + suffix, "w", encoding="utf-8") as f:
+                f.write(text)
+            written.append(stem + suffix)
+
+        if self._profile is not None:
+            stats = pstats.Stats(self._profile)
+            for p in self.extra:
+                stats.add(p)
+            stats.dump_stats(stem + ".pstats")
+            written.append(stem + ".pstats")
+            report = io.StringIO()
+            stats.stream = report
+            stats.sort_stats("cumulative").print_stats(self.config.top)
+            write(".txt", report.getvalue())
+            stacks = collapsed_from_stats(stats.stats)
+        else:
+            stacks = self._sampler.stacks
+        write(".collapsed", "".join(f"{s} {n}\n" for s, n in sorted(stacks.items())))
+        if snapshot is not None:
+            top = snapshot.statistics("lineno")[:self.config.top]
+            write(".alloc.txt", "".join(f"{stat}\n" for stat in top))
+        return written
+
+@contextmanager
+def profiled(name: str, config: Optional[ProfileConfig] = None) -> Iterator[Optional[Profiler]]:
+    """Profile the block when profiling is switched on; otherwise a no-op."""
+    config = config or ProfileConfig.from_env()
+    if not config.mode:
+        yield None
+        return
+    profiler = Profiler(name, config).start()
+    try:
+        yield profiler
+    finally:
+        written = profiler.stop()
+        print(f"profile: wrote {', '.join(written)}", file=sys.stderr)
+
+# --- API ----------------------------------------------------------------------
+
+_current: ContextVar[Optional[Profiler]] = ContextVar("pte_profile", default=None)
+
+class RequestProfiler:
+    """Profiles every ``config.every``-th request it sees, at most one at a time."""
+
+    def __init__(self, config: ProfileConfig):
+        self.config = config
+        self._count = itertools.count(1)
+        # Requests share the event-loop thread, and a thread (on 3.12+, the
+        # process) can only have one active cProfile; tracemalloc is global.
+        self._busy = threading.Lock()
+
+    def should_profile(self) -> bool:
+        return next(self._count) % self.config.every == 0
+
+    @contextmanager
+    def request(self, method: str, path: str) -> Iterator[Optional[Profiler]]:
+        """Profile the block; yields None, unprofiled, while another request is being profiled."""
+        if not self._busy.acquire(blocking=False):
+            yield None
+            return
+        try:
+            profiler = Profiler(f"api-{method}-{path.strip('/')}", self.config).start()
+            token = _current.set(profiler)
+            try:
+                yield profiler
+            finally:
+                _current.reset(token)
+                profiler.stop()
+        finally:
+            self._busy.release()
+
+def traced(fn: Callable) -> Callable:
+    """Wrap work handed to another thread so it joins the current request's profile, if any."""
+    profiler = _current.get()
+    if profiler is None:
+        return fn
+
+    def run(*args, **kwargs):
+        ident = threading.get_ident()
+        if profiler._sampler is not None:
+            profiler._sampler.threads.add(ident)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                profiler._sampler.threads.discard(ident)
+        prof = cProfile.Profile()
+        try:
+            prof.enable()
+        except ValueError:              # 3.12+: the request's profile already covers every thread
+            return fn(*args, **kwargs)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            prof.disable()
+            profiler.extra.append(prof)
+    return run
@@ -1,46 +1,79 @@
 # pte/webapp/app.py
 from __future__ import annotations
+import hashlib
+import os
+from typing import Dict, Optional
+import ollama
 import streamlit as st
-from typing import Dict
 from pte.assistant.session import Session
+from pte.engine.pipeline import PlanningPipeline, default_pipeline
 from pte.nlp.llm_intent_ollama import llm_extract_intent
+from pte.nlp.router import route_intent
+from pte.providers.hotels.hyatt import HyattCalendar, calendar_from_json
+
+# Streamlit reruns this script on every interaction; anything expensive lives in a cache.
+
+@st.cache_resource
+def warm_pipeline() -> PlanningPipeline:
+    """Load provider data once per server process, before the first chat turn."""
+    return default_pipeline().warm()
+
+@st.cache_resource
+def ollama_client(host: str) -> ollama.Client:
+    """One client (and its connection pool) per host, shared by every rerun and browser session."""
+    return ollama.Client(host=host)
+
+@st.cache_resource(max_entries=32)
+def uploaded_calendar(digest: str, _data: bytes) -> HyattCalendar:
+    """Parse an uploaded calendar once per distinct content (keyed by its sha256)."""
+    return calendar_from_json(_data)
+
+@st.cache_resource(max_entries=32)
+def uploaded_calendars(digests: tuple, _data: tuple) -> Dict[str, HyattCalendar]:
+    """The same dict object for the same uploads, so the session's plan cache keeps hitting."""
+    return {label: uploaded_calendar(d, data) for (label, d), data in zip(digests, _data)}
 
 st.set_page_config(page_title="Personal Travel Assistant", page_icon="🛫", layout="centered")
 
+warm_pipeline()
+
 # --- Sidebar: model + data sources ---
 st.sidebar.title("Settings")
 
 model = st.sidebar.text_input("Ollama model", value="llama3", help="Any free model you have via Ollama (e.g., llama3, mistral, phi3)")
+ollama_host = st.sidebar.text_input("Ollama host", value=os.environ.get("OLLAMA_HOST", "http://localhost:11434"))
 calendar_mode = st.sidebar.radio("Hyatt data mode", options=["fixture","import"], index=0,
                                  help="Use 'import' to provide actual Hyatt points calendars for Park Hyatt & Andaz.")
 prefer_single_hotel = st.sidebar.toggle("Prefer single hotel (only switch if savings ≥ 10k)", value=False)
 
-import_paths = None
+calendars: Optional[Dict[str, HyattCalendar]] = None
 if calendar_mode == "import":
     st.sidebar.caption("Upload Hyatt points JSON for your dates")
     ph = st.sidebar.file_uploader("Park Hyatt Tokyo JSON", type=["json"], accept_multiple_files=False)
     az = st.sidebar.file_uploader("Andaz Tokyo JSON", type=["json"], accept_multiple_files=False)
     if ph and az:
-        import json, tempfile, os
-        import_paths = {}
-        for label, fh in (("Park Hyatt Tokyo", ph), ("Andaz Tokyo Toranomon Hills", az)):
-            tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".json")
-            tmp.write(fh.read()); tmp.close()
-            import_paths[label] = tmp.name
-        st.sidebar.success("Calendars loaded.")
+        # Parsed in memory; nothing is written to disk.
+        uploads = (("Park Hyatt Tokyo", ph.getvalue()), ("Andaz Tokyo Toranomon Hills", az.getvalue()))
+        digests = tuple((label, hashlib.sha256(data).hexdigest()) for label, data in uploads)
+        try:
+            calendars = uploaded_calendars(digests, tuple(data for _, data in uploads))
+            st.sidebar.success("Calendars loaded.")
+        except (ValueError, AttributeError) as e:
+            st.sidebar.error(f"Could not read calendar: {e}")
 
 # --- Initialize session state ---
 if "engine" not in st.session_state:
     st.session_state.engine = Session(
         calendar_mode=calendar_mode,
-        import_paths=import_paths,
+        calendars=calendars,
         prefer_single_hotel=prefer_single_hotel
     )
 
-# Keep settings in sync when user changes sidebar
+# Keep settings in sync when user changes sidebar. The session reuses its
+# last plan until one of these (or the trip) changes.
 engine: Session = st.session_state.engine
 engine.calendar_mode = calendar_mode
-engine.import_paths = import_paths
+engine.calendars = calendars
 engine.prefer_single_hotel = prefer_single_hotel
 
 st.title("🛫 Personal Travel Assistant")
@@ -62,22 +95,29 @@ if user_text:
     st.session_state.messages.append({"role":"user","content":user_text})
     with st.chat_message("user"): st.markdown(user_text)
 
-    # 1) Parse with Ollama
+    # 1) Parse deterministically; only ask Ollama when the parser is unsure
     with st.spinner("Thinking…"):
-        intent_obj = llm_extract_intent(user_text, model=model)
-        intent = intent_obj.get("intent", "plan_trip")
-        slots: Dict = intent_obj.get("slots", {})
+        client = ollama_client(ollama_host)
+        routed = route_intent(user_text, llm=lambda text: llm_extract_intent(text, model=model, client=client))
+        names = [i.name for i in routed.intents]
 
-    # 2) Apply to engine
-    result = engine.apply_llm_intent(intent, slots)
+    # 2) Apply to engine; a failed plan clears engine.last_markdown, so only a fresh plan is shown
+    replies = []
+    for i in routed.intents:
+        try:
+            replies.append(engine.apply_intent(i.name, i.slots))
+        except (OSError, ValueError, KeyError) as e:
+            replies.append(f"❌ Could not generate the plan: {e}")
+    result = "\n\n".join(replies)
+    show_plan = engine.last_markdown and "show_plan" in names
 
     # 3) Show result + plan (if generated)
     with st.chat_message("assistant"):
         st.markdown(result)
-        if engine.last_markdown and intent in ("show_plan","plan_trip"):
+        if show_plan:
             st.markdown("---")
             st.markdown(engine.last_markdown)
 
     st.session_state.messages.append({"role":"assistant","content":result})
-    if engine.last_markdown and intent in ("show_plan","plan_trip"):
+    if show_plan:
         st.session_state.messages.append({"role":"assistant","content":engine.last_markdown})
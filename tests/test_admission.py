@@ -0,0 +1,124 @@
+import asyncio
+import pytest
+from api.admission import ConcurrencyLimiter, Rejected, TokenBucket
+
+def test_token_bucket_refills():
+    bucket = TokenBucket(rate=2.0, burst=2, now=0.0)
+    assert bucket.take(0.0) == 0 and bucket.take(0.0) == 0
+    assert bucket.take(0.0) == pytest.approx(0.5)
+    assert bucket.take(0.5) == 0
+
+def test_limiter_queues_then_sheds():
+    async def run():
+        limiter = ConcurrencyLimiter(limit=1, queue=1, queue_timeout=1.0)
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(Rejected) as exc:
+            await limiter.acquire()
+        assert exc.value.status == 503 and exc.value.reason == "queue_full"
+        limiter.release(0.01)
+        await waiter
+        assert limiter.active == 1 and limiter.waiting == 0
+    asyncio.run(run())
+
+def test_generate_is_rate_limited_per_client(monkeypatch):
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+    import api.admission
+    import api.main
+    from api.admission import AdmissionController
+    monkeypatch.setattr(api.admission, "ENABLED", True)
+    monkeypatch.setattr(api.admission, "controller", AdmissionController(heavy_rate=0.5, heavy_burst=1))
+    client = TestClient(api.main.app)
+    sid = client.post("/api/session").json()["session_id"]
+    client.post(f"/api/session/{sid}/dates", json={"start_date": "2027-11-20", "end_date": "2027-11-23"})
+    assert client.post(f"/api/session/{sid}/generate").status_code == 200
+    r = client.post(f"/api/session/{sid}/generate", headers={"Origin": "http://localhost:5173"})
+    assert r.status_code == 429 and r.headers["Retry-After"] == "2"
+    # CORS wraps admission control, so the browser can read the rejection.
+    assert r.headers["access-control-allow-origin"] == "http://localhost:5173"
+    assert "Retry-After" in r.headers["access-control-expose-headers"]
+    assert client.get(f"/api/session/{sid}").status_code == 200
+
+def test_cancelled_waiters_do_not_leak_slots():
+    async def run():
+        limiter = ConcurrencyLimiter(limit=1, queue=2, queue_timeout=1.0)
+        await limiter.acquire()
+        queued = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        queued.cancel()                    # cancelled while still waiting
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        assert limiter.waiting == 0
+        handed = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        limiter.release(0.01)              # slot handed to the waiter...
+        handed.cancel()                    # ...which is cancelled before it resumes
+        try:
+            await handed
+        except asyncio.CancelledError:
+            pass                           # the slot was passed on
+        else:
+            limiter.release(0.01)          # wait_for kept the result (3.11): the caller owns the slot
+        assert limiter.active == 0 and limiter.waiting == 0
+        assert await limiter.acquire() == 0.0
+    asyncio.run(run())
+
+def _admitted_client(monkeypatch, **limits):
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+    import api.admission
+    import api.main
+    from api.admission import AdmissionController
+    monkeypatch.setattr(api.admission, "ENABLED", True)
+    monkeypatch.setattr(api.admission, "controller", AdmissionController(**limits))
+    client = TestClient(api.main.app)
+    sid = client.post("/api/session").json()["session_id"]
+    return client, sid
+
+def test_chat_messages_are_heavy_only_when_they_plan(monkeypatch):
+    client, sid = _admitted_client(monkeypatch, heavy_rate=0.01, heavy_burst=1)
+    for text in ("Nov 20 2027 to Nov 23 2027", "prefer nonstop", "start at andaz"):
+        assert client.post(f"/api/session/{sid}/message", json={"message": text}).status_code == 200
+    assert client.post(f"/api/session/{sid}/message", json={"message": "show plan"}).status_code == 200
+    r = client.post(f"/api/session/{sid}/message", json={"message": "prefer nonstop and show plan"})
+    assert r.status_code == 429 and "Retry-After" in r.headers
+
+def test_websocket_plans_are_admitted(monkeypatch):
+    client, sid = _admitted_client(monkeypatch, heavy_rate=0.01, heavy_burst=1)
+    with client.websocket_connect(f"/api/session/{sid}/ws") as ws:
+        ws.receive_json()                                    # initial state
+        ws.send_json({"message": "Nov 20 2027 to Nov 23 2027, show plan"})
+        events = [ws.receive_json() for _ in range(6)]       # messages, state, 3 sections, plan_done
+        assert events[-1]["type"] == "plan_done"
+        ws.send_json({"message": "show plan"})
+        assert ws.receive_json()["type"] == "messages"
+        error = ws.receive_json()
+        assert error["type"] == "error" and error["reason"] == "rate_limited" and error["retry_after"] >= 1
+
+def test_cancelled_plan_holds_its_slot_until_the_worker_returns(monkeypatch):
+    import threading
+    import api.routes as routes
+    started, finish = threading.Event(), threading.Event()
+    def slow_sections(session):
+        started.set()
+        finish.wait(5)
+        yield "flights", []
+    monkeypatch.setattr(routes, "plan_sections", slow_sections)
+    released = []
+    async def run():
+        task = asyncio.ensure_future(routes._push_plan(None, asyncio.Queue(), 1, released.append))
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert released == []               # the thread is still rendering
+        finish.set()
+        for _ in range(100):
+            if released:
+                break
+            await asyncio.sleep(0.01)
+    asyncio.run(run())
+    assert len(released) == 1
@@ -0,0 +1,22 @@
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+from fastapi.testclient import TestClient
+from api.main import app
+
+def test_compound_message_in_one_request():
+    client = TestClient(app)
+    sid = client.post("/api/session").json()["session_id"]
+    body = client.post(f"/api/session/{sid}/message",
+                       json={"message": "Nov 20 2027 to Nov 23 2027, no direct flights, show plan"}).json()
+    assert [i["intent"] for i in body["intents"]] == ["set_dates", "set_nonstop", "show_plan"]
+    assert body["state"]["start_date"] == "2027-11-20" and body["state"]["prefer_nonstop"] is False
+    assert len(body["stay"]["nights"]) == 3 and body["markdown"]
+
+def test_plan_request_without_dates():
+    client = TestClient(app)
+    sid = client.post("/api/session").json()["session_id"]
+    body = client.post(f"/api/session/{sid}/message", json={"message": "show plan"}).json()
+    assert body["messages"] == ["❌ Please set both start and end dates first."]
+    assert "stay" not in body
@@ -0,0 +1,54 @@
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+from fastapi.testclient import TestClient
+import api.routes as routes
+import api.admission
+from api.main import app
+
+@pytest.fixture(autouse=True)
+def no_admission(monkeypatch):
+    # Every TestClient shares one client address; these tests exercise the payload, not rate limits.
+    monkeypatch.setattr(api.admission, "ENABLED", False)
+
+def _session(client):
+    sid = client.post("/api/session").json()["session_id"]
+    client.post(f"/api/session/{sid}/dates", json={"start_date": "2027-11-20", "end_date": "2027-11-23"})
+    return sid
+
+def test_matching_etag_gets_304_without_planning(monkeypatch):
+    client = TestClient(app)
+    sid = _session(client)
+    first = client.post(f"/api/session/{sid}/generate")
+    etag = first.headers["ETag"]
+    def no_planning(*args, **kwargs):
+        raise AssertionError("pipeline ran for a cached plan")
+    monkeypatch.setattr(routes, "build_plan_payload", no_planning)
+    r = client.post(f"/api/session/{sid}/generate", headers={"If-None-Match": etag})
+    assert r.status_code == 304 and r.headers["ETag"] == etag and r.content == b""
+    assert client.post(f"/api/session/{sid}/generate",
+                       headers={"If-None-Match": f'W/{etag}, "other"'}).status_code == 304
+
+def test_stale_etag_gets_the_new_plan():
+    client = TestClient(app)
+    sid = _session(client)
+    etag = client.post(f"/api/session/{sid}/generate").headers["ETag"]
+    r = client.post(f"/api/session/{sid}/generate", headers={"If-None-Match": '"mismatched"'})
+    assert r.status_code == 200 and r.headers["ETag"] == etag
+    client.post(f"/api/session/{sid}/nonstop", json={"prefer_nonstop": False})
+    r = client.post(f"/api/session/{sid}/generate", headers={"If-None-Match": etag})
+    assert r.status_code == 200 and r.headers["ETag"] != etag
+    structured = client.post(f"/api/session/{sid}/generate?mode=structured")
+    assert structured.headers["ETag"] != r.headers["ETag"]
+
+@pytest.mark.parametrize("mode, keys", [
+    ("full", {"message", "markdown", "flights", "stay", "state"}),
+    ("structured", {"message", "flights", "stay"}),
+    ("markdown", {"message", "markdown"}),
+])
+def test_generate_modes_return_exact_keys(mode, keys):
+    client = TestClient(app)
+    sid = _session(client)
+    body = client.post(f"/api/session/{sid}/generate?mode={mode}").json()
+    assert set(body) == keys
@@ -0,0 +1,46 @@
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+import api.routes as routes
+from api.main import app
+
+def test_channel_pushes_diffs_and_plan_sections():
+    client = TestClient(app)
+    sid = client.post("/api/session").json()["session_id"]
+    with client.websocket_connect(f"/api/session/{sid}/ws") as ws:
+        assert ws.receive_json()["state"]["session_id"] == sid
+        ws.send_json({"message": "Nov 20 2027 to Nov 23 2027, show plan"})
+        assert ws.receive_json()["type"] == "messages"
+        assert ws.receive_json() == {"type": "state", "diff": {"start_date": "2027-11-20", "end_date": "2027-11-23"}}
+        sections = []
+        while True:
+            msg = ws.receive_json()
+            if msg["type"] == "plan_done":
+                break
+            sections.append(msg["section"])
+        assert sections == ["flights", "stay", "markdown"]
+
+def test_channel_closes_when_idle(monkeypatch):
+    monkeypatch.setattr(routes, "WS_IDLE_TIMEOUT", 0.05)
+    client = TestClient(app)
+    sid = client.post("/api/session").json()["session_id"]
+    with client.websocket_connect(f"/api/session/{sid}/ws") as ws:
+        ws.receive_json()
+        with pytest.raises(WebSocketDisconnect) as exc:
+            ws.receive_json()
+        assert exc.value.code == 1001
+
+def test_channel_answers_frames_that_are_not_json():
+    client = TestClient(app)
+    sid = client.post("/api/session").json()["session_id"]
+    with client.websocket_connect(f"/api/session/{sid}/ws") as ws:
+        ws.receive_json()
+        ws.send_text("show plan")
+        assert ws.receive_json()["type"] == "error"
+        ws.send_bytes(b"\x00")
+        assert ws.receive_json()["type"] == "error"
+        ws.send_json({"message": "prefer nonstop"})
+        assert ws.receive_json()["type"] == "messages"
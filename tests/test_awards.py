@@ -0,0 +1,51 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from datetime import date
+from pte.engine.models import Trip
+from pte.providers.flights.awards import build_award_calendar
+from pte.providers.flights.delta_msp_hnd import propose_flights
+
+def _rec(day, flight, cabin, fare, seats, miles):
+    return dict(date=day, carrier="DL", flight_number=flight, origin="MSP", destination="HND",
+                cabin=cabin, fare_class=fare, seats=seats, miles=miles)
+
+AWARDS = build_award_calendar([
+    _rec("2027-11-01", "121", "business", "saver", 2, 85000),
+    _rec("2027-11-02", "121", "business", "saver", 1, 85000),
+    _rec("2027-11-20", "121", "business", "saver", 4, 95000),
+    _rec("2027-11-20", "121", "business", "standard", 9, 300000),
+    _rec("2027-11-20", "121", "economy", "saver", 9, 35000),
+])
+
+def test_range_query_by_cabin_fare_and_pax():
+    hits = AWARDS.search("MSP", "HND", date(2027,11,1), date(2027,11,30), cabin="business", fare="saver", pax=2)
+    assert [(h.date.day, h.miles) for h in hits] == [(1, 85000), (20, 95000)]
+    per_day = AWARDS.cheapest_by_day("MSP", "HND", date(2027,10,31), date(2027,11,2), cabin="business", pax=1)
+    assert list(per_day) == [0, 85000, 85000]
+
+def test_propose_flights_attaches_award_pricing():
+    trip = Trip(origin="MSP", destination="HND",
+                start_date=date(2027,11,20), end_date=date(2027,11,23))
+    nonstop = propose_flights(trip, awards=AWARDS)[0]
+    assert nonstop.points_price == 95000 and nonstop.award_seats == 4
+
+def test_every_renderer_shows_award_pricing():
+    from pte.engine.models import Recommendation, StayPlan
+    from pte.engine.render_markdown import render_html, render_json, render_markdown
+    trip = Trip(origin="MSP", destination="HND",
+                start_date=date(2027,11,20), end_date=date(2027,11,23))
+    rec = Recommendation(trip=trip, flights=propose_flights(trip, awards=AWARDS), stay=StayPlan())
+    assert "Award: 95,000 miles." in render_markdown(rec)
+    assert "Award: 95,000 miles.</li>" in render_html(rec)
+    assert render_json(rec)["flights"][0]["points_price"] == 95000
+
+def test_pipeline_scores_award_pricing():
+    from pte.engine.models import FlightOption
+    from pte.engine.scorer import score_flights
+    cheap, dear, cash = (FlightOption(carrier="Delta", flight_numbers=[n], cabin="business", nonstop=True,
+                                      origin="MSP", destination="HND", points_price=p)
+                         for n, p in (("DL1", 80000), ("DL2", 160000), ("DL3", None)))
+    score_flights([cheap, dear, cash])
+    assert cheap.score == 60.0 and dear.score == 50.0 and cash.score == 40.0
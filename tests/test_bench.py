@@ -0,0 +1,34 @@
+from pte.bench.__main__ import main
+from pte.bench.runner import compare, load_history, percentile, summarize
+
+def test_percentiles_interpolate():
+    values = [1.0, 2.0, 3.0, 4.0]
+    assert percentile(values, 50) == 2.5
+    assert percentile(values, 100) == 4.0
+    r = summarize("x", {"n": 1}, [0.2, 0.1], ops_per_sample=10)
+    assert r.key == "x[n=1]" and abs(r.ops_per_s - 20 / 0.3) < 1e-6
+
+def test_regression_against_baseline():
+    base = {"results": {"x": {"p50_s": 0.010}}}
+    assert compare([summarize("x", {}, [0.011])], base, threshold=0.2) == []
+    (reg,) = compare([summarize("x", {}, [0.013])], base, threshold=0.2)
+    assert reg.key == "x" and round(reg.change, 2) == 0.3
+
+def test_quick_run_appends_history(tmp_path):
+    history = str(tmp_path / "h.json")
+    assert main(["parse_query", "--quick", "--history", history, "--label", "base"]) == 0
+    assert main(["parse_query", "--quick", "--history", history, "--baseline", "base",
+                 "--threshold", "100"]) == 0
+    runs = load_history(history)
+    assert [r["label"] for r in runs] == ["base", ""]
+    assert "parse_query[messages=200]" in runs[0]["results"]
+
+def test_api_bench_leaves_no_sessions_behind():
+    import pytest
+    pytest.importorskip("fastapi")
+    import api.admission
+    import api.routes
+    from pte.bench.suite import bench_api_sessions
+    before, enabled = set(api.routes.sessions), api.admission.ENABLED
+    assert bench_api_sessions(quick=True)
+    assert set(api.routes.sessions) == before and api.admission.ENABLED == enabled
@@ -0,0 +1,29 @@
+import json
+import pytest
+from pte.cli.plan import main
+
+def test_batch_plans_every_trip(tmp_path, capsys):
+    trips = tmp_path / "trips.csv"
+    trips.write_text("id,start,end,nonstop,start_hotel,alternates\n"
+                     "a,2027-11-20,2027-11-23,yes,,\n"
+                     "b,2027-12-01,2027-12-08,no,Andaz Tokyo Toranomon Hills,Park Hyatt Tokyo\n"
+                     "bad,2027-12-08,2027-12-01,,,\n")
+    out = tmp_path / "plans.jsonl"
+    with pytest.raises(SystemExit) as exit:
+        main(["--batch", str(trips), "--jobs", "2", "--jsonl", str(out), "--no-timestamp"])
+    assert exit.value.code == 1         # the "bad" row failed
+    results = [json.loads(line) for line in out.read_text().splitlines()]
+    assert [r["id"] for r in results] == ["a", "b", "bad"]
+    assert "error" in results[2] and results[0]["markdown"].startswith("#")
+    assert "Planned 2/3 trips" in capsys.readouterr().out
+
+def test_batch_matches_single_trip(tmp_path):
+    trips = tmp_path / "trips.jsonl"
+    trips.write_text(json.dumps({"id": "one", "start": "2027-11-20", "end": "2027-11-23"}) + "\n")
+    with pytest.raises(SystemExit) as exit:
+        main(["--batch", str(trips), "--out-dir", str(tmp_path / "plans"), "--no-timestamp"])
+    assert exit.value.code == 0
+    single = tmp_path / "single.md"
+    main(["--start", "2027-11-20", "--end", "2027-11-23", "--nonstop", "yes", "--noninteractive",
+          "--out", str(single), "--no-timestamp"])
+    assert (tmp_path / "plans" / "one.md").read_text() == single.read_text()
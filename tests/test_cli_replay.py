@@ -0,0 +1,41 @@
+import pytest
+from pte.cli.chat import main
+from pte.cli.replay import read_transcript
+
+TRANSCRIPT = """\
+# recorded session
+you> Nov 20 2027 to Dec 4 2027
+prefer nonstop
+show plan
+quit
+ignored after quit
+"""
+
+def test_read_transcript_strips_prompts_and_comments(tmp_path):
+    path = tmp_path / "t.txt"
+    path.write_text(TRANSCRIPT)
+    assert read_transcript(str(path))[:2] == ["Nov 20 2027 to Dec 4 2027", "prefer nonstop"]
+
+def test_replay_reports_intents_and_latency(tmp_path, capsys):
+    paths = []
+    for n in range(2):
+        path = tmp_path / f"t{n}.txt"
+        path.write_text(TRANSCRIPT)
+        paths.append(str(path))
+    with pytest.raises(SystemExit) as exit:
+        main(["--replay", *paths, "--jobs", "2"])
+    assert exit.value.code == 0
+    out = capsys.readouterr().out
+    assert "Replayed 2 transcripts, 8 messages" in out
+    assert [line.split() for line in out.splitlines() if line.startswith("show_plan")] == [["show_plan", "2"]]
+    assert "latency" in out and "\nplan " in out
+
+def test_chat_applies_every_intent_in_a_message(monkeypatch, capsys, tmp_path):
+    lines = iter(["Nov 20 2027 to Dec 4 2027 no nonstop start at andaz", "quit", "show plan"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(lines))
+    main(["--out", str(tmp_path / "plan.md")])
+    out = capsys.readouterr().out
+    assert "Dates set: 2027-11-20 → 2027-12-04" in out
+    assert "Nonstop preference: False" in out and "Start at: Andaz Tokyo Toranomon Hills" in out
+    assert out.rstrip().endswith("bye!")
+    assert not (tmp_path / "plan.md").exists()
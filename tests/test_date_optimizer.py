@@ -0,0 +1,55 @@
+from datetime import date, timedelta
+from pte.engine.date_optimizer import optimize_dates
+from pte.providers.hotels.hyatt import HyattCalendar
+
+def _cal(start, prices):
+    return HyattCalendar({start + timedelta(days=i): p for i, p in enumerate(prices)})
+
+def test_frontier_trades_points_against_switches():
+    start = date(2027, 11, 1)
+    calendars = {
+        "Park Hyatt Tokyo": _cal(start, [35000, 45000, 35000, 45000]),
+        "Andaz Tokyo Toranomon Hills": _cal(start, [40000, 35000, 40000, 35000]),
+    }
+    frontier = optimize_dates("MSP", "HND", start, start + timedelta(days=3), calendars,
+                              min_nights=3, max_nights=3)
+    assert [(o.points, o.hotel_switches) for o in frontier] == [(105000, 2), (115000, 0)]
+    assert frontier[1].hotel in calendars
+
+def test_budget_prunes_everything():
+    start = date(2027, 11, 1)
+    calendars = {"Park Hyatt Tokyo": _cal(start, [35000] * 10)}
+    assert optimize_dates("MSP", "HND", start, start + timedelta(days=9), calendars,
+                          min_nights=2, budget_points=60000) == []
+
+def test_nonstop_comes_from_the_schedule():
+    from pte.providers.flights.schedule import build_store
+    start = date(2027, 11, 1)                       # a Monday
+    calendars = {"Park Hyatt Tokyo": _cal(start, [35000] * 7)}
+    frontier = optimize_dates("MSP", "HND", start, start + timedelta(days=6), calendars,
+                              min_nights=2, max_nights=2)
+    assert frontier and all(o.nonstop is None for o in frontier)
+    leg = dict(carrier="DL", dep="1130", arr="1520", arr_day_offset="1", elapsed="770")
+    schedule = build_store([dict(leg, flight_number="121", origin="MSP", destination="HND", days="3"),
+                            dict(leg, flight_number="120", origin="HND", destination="MSP", days="5")])
+    frontier = optimize_dates("MSP", "HND", start, start + timedelta(days=6), calendars,
+                              min_nights=2, max_nights=2, schedule=schedule)
+    assert [(o.outbound.isoformat(), o.nonstop) for o in frontier] == [("2027-11-03", True)]
+
+def test_unknown_nonstop_ranks_as_one_stop():
+    import random
+    from pte.engine.date_optimizer import DateOption, _dominates, _same, pareto_frontier
+    day = date(2027, 11, 1)
+    def opt(points, cash, nonstop, switches):
+        return DateOption(day, day + timedelta(days=3), points, cash, nonstop, switches, 0, points, "h")
+    known, unknown = opt(100, 0.0, True, 1), opt(100, 0.0, None, 0)
+    assert pareto_frontier([known, unknown]) == [known, unknown]
+    assert pareto_frontier([opt(100, 0.0, None, 1), known]) == [known]
+    rng = random.Random(7)
+    for _ in range(500):
+        options = [opt(rng.choice([90, 100]), rng.choice([0.0, 50.0]), rng.choice([True, False, None]),
+                       rng.randint(0, 2)) for _ in range(6)]
+        frontier = pareto_frontier(options)
+        assert not any(_dominates(a, b) for a in frontier for b in frontier)
+        assert not any(_dominates(o, f) for o in options for f in frontier)
+        assert all(any(_dominates(f, o) or _same(f, o) for f in frontier) for o in options)
@@ -0,0 +1,50 @@
+import pte.nlp.llm_intent_ollama as llm
+from pte.nlp.intent_cache import IntentCache, cache_key, normalize_message
+
+def _fake_chat(calls):
+    def chat(model, messages, options, stream=False, **kwargs):
+        calls.append(messages[-1]["content"])
+        reply = {"message": {"content": '{"intent": "show_plan", "slots": {}}'}}
+        return iter([reply]) if stream else reply
+    return chat
+
+def test_normalized_messages_share_a_key():
+    assert normalize_message("  Show   PLAN! ") == "show plan"
+    assert cache_key("llama3", 0.1, "p", "Show plan!") == cache_key("llama3", 0.1, "p", "show plan")
+    assert cache_key("llama3", 0.1, "p", "show plan") != cache_key("mistral", 0.1, "p", "show plan")
+    assert cache_key("llama3", 0.1, "p", "show plan") != cache_key("llama3", 0.1, "p2", "show plan")
+
+def test_repeated_messages_hit_the_cache(monkeypatch, tmp_path):
+    calls = []
+    monkeypatch.setattr(llm.ollama, "chat", _fake_chat(calls))
+    cache = IntentCache(max_entries=2, directory=str(tmp_path))
+    assert llm.llm_extract_intent("Show plan!", cache=cache)["intent"] == "show_plan"
+    llm.llm_extract_intent("show plan", cache=cache)
+    assert len(calls) == 1
+    # A fresh process only has the disk tier.
+    llm.llm_extract_intent("show plan", cache=IntentCache(directory=str(tmp_path)))
+    assert len(calls) == 1
+    # High temperature bypasses the cache.
+    llm.llm_extract_intent("show plan", temperature=0.9, cache=cache)
+    assert len(calls) == 2
+
+def test_an_empty_cache_is_used_rather_than_the_global_one(monkeypatch):
+    calls = []
+    monkeypatch.setattr(llm.ollama, "chat", _fake_chat(calls))
+    llm.intent_cache.clear()
+    cache = IntentCache()
+    llm.llm_extract_intent("show plan", cache=cache)
+    assert len(cache) == 1 and len(llm.intent_cache) == 0
+
+def test_entries_expire(monkeypatch, tmp_path):
+    import pte.nlp.intent_cache as ic
+    now = [1000.0]
+    monkeypatch.setattr(ic.time, "time", lambda: now[0])
+    cache = IntentCache(directory=str(tmp_path), ttl=60)
+    cache.put("k", {"intent": "show_plan"})
+    now[0] += 59
+    assert cache.get("k") == {"intent": "show_plan"}
+    assert IntentCache(directory=str(tmp_path), ttl=60).get("k") is not None
+    now[0] += 2
+    assert cache.get("k") is None and len(cache) == 0
+    assert IntentCache(directory=str(tmp_path), ttl=60).get("k") is None
@@ -0,0 +1,124 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from pte.nlp.llm_intent_ollama import JsonObjectScanner
+from pte.nlp.intent_cache import IntentCache
+from pte.nlp.llm_intent_async import AsyncIntentExtractor
+
+class StubOllama(BaseHTTPRequestHandler):
+    """Mimics POST /api/chat (non-streaming)."""
+    calls = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        message = body["messages"][-1]["content"]
+        StubOllama.calls.append(message)
+        if "slow" in message:
+            time.sleep(0.5)
+            return
+        if "fail" in message:
+            self.send_response(500)
+            self.end_headers()
+            self.wfile.write(b'{"error": "model crashed"}')
+            return
+        time.sleep(0.05)
+        reply = json.dumps({"intent": "show_plan", "slots": {"start": None, "end": None,
+                                                             "prefer_nonstop": None, "hotel": None}})
+        # Stream NDJSON chunks; a model that keeps talking after the object should be cut off.
+        if "garbled" in message:
+            reply = "Sure, sounds like a great trip!"
+        tail = ["\n", "Hope ", "this ", "helps!"] if "chatty" in message else []
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.end_headers()
+            for piece in [reply[:20], reply[20:]] + tail:
+                self.wfile.write(json.dumps({"model": body["model"], "created_at": "2027-01-01T00:00:00Z",
+                                             "done": False,
+                                             "message": {"role": "assistant", "content": piece}}).encode() + b"\n")
+                self.wfile.flush()
+                if piece in tail:
+                    time.sleep(1.0)
+        except (BrokenPipeError, ConnectionResetError):
+            pass    # client stopped reading
+        self.close_connection = True
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def stub_host():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    StubOllama.calls = []
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+def test_concurrent_duplicates_coalesce(stub_host):
+    async def run():
+        ex = AsyncIntentExtractor(host=stub_host, cache=IntentCache(), timeout=2.0)
+        try:
+            return await ex.extract_many(["show plan", "Show plan!", "make plan now", "show plan"])
+        finally:
+            await ex.aclose()
+    results = asyncio.run(run())
+    assert [r["intent"] for r in results] == ["show_plan"] * 4
+    assert sorted(StubOllama.calls) == ["make plan now", "show plan"]
+
+def test_timeout_and_errors_fall_back_to_parser(stub_host):
+    async def run():
+        ex = AsyncIntentExtractor(host=stub_host, cache=IntentCache(), timeout=0.2)
+        try:
+            return await ex.extract_many(["slow: nov 20 2027 to dec 4 2027", "fail: prefer nonstop"])
+        finally:
+            await ex.aclose()
+    slow, failed = asyncio.run(run())
+    assert slow == {"intent": "set_dates", "slots": {"start": "2027-11-20", "end": "2027-12-04"}}
+    assert failed == {"intent": "set_nonstop", "slots": {"prefer_nonstop": True}}
+
+def test_unparsable_reply_falls_back_to_parser(stub_host):
+    async def run():
+        ex = AsyncIntentExtractor(host=stub_host, cache=IntentCache(), timeout=2.0)
+        try:
+            return await ex.extract("garbled: nov 20 2027 to dec 4 2027")
+        finally:
+            await ex.aclose()
+    assert asyncio.run(run()) == {"intent": "set_dates", "slots": {"start": "2027-11-20", "end": "2027-12-04"}}
+
+def test_stream_stops_at_first_valid_object(stub_host):
+    async def run():
+        ex = AsyncIntentExtractor(host=stub_host, cache=IntentCache(), timeout=2.0)
+        try:
+            start = time.perf_counter()
+            data = await ex.extract("chatty show plan")
+            return data, time.perf_counter() - start
+        finally:
+            await ex.aclose()
+    data, elapsed = asyncio.run(run())
+    assert data["intent"] == "show_plan"
+    assert elapsed < 0.9
+
+def test_disk_cached_replies_survive_aclose(stub_host, tmp_path):
+    async def run():
+        ex = AsyncIntentExtractor(host=stub_host, cache=IntentCache(directory=str(tmp_path)), timeout=2.0)
+        try:
+            await ex.extract("show plan")
+        finally:
+            await ex.aclose()
+        assert ex._transport is None
+        again = AsyncIntentExtractor(host=stub_host, cache=IntentCache(directory=str(tmp_path)), timeout=2.0)
+        try:
+            return await again.extract("Show plan!")
+        finally:
+            await again.aclose()
+    assert asyncio.run(run())["intent"] == "show_plan"
+    assert StubOllama.calls == ["show plan"]
+
+def test_scanner_skips_prose_and_invalid_objects():
+    scanner = JsonObjectScanner()
+    assert scanner.feed('Sure! ```json {"note": "x"} {"intent": "set_non') is None
+    assert scanner.feed('stop", "slots": {"hotel": "a \\"}\\" b"}}') == {
+        "intent": "set_nonstop", "slots": {"hotel": 'a "}" b'}}
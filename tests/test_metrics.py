@@ -0,0 +1,15 @@
+from pte.utils.metrics import MetricsRegistry, server_timing_header
+
+def test_histogram_renders_cumulative_buckets():
+    reg = MetricsRegistry()
+    reg.observe("lat_seconds", 0.003, {"route": "/api/x"})
+    reg.observe("lat_seconds", 0.2, {"route": "/api/x"})
+    reg.inc("hits_total", {"cache": "flights", "result": "hit"})
+    text = reg.render()
+    assert 'lat_seconds_bucket{route="/api/x",le="0.005"} 1' in text
+    assert 'lat_seconds_bucket{route="/api/x",le="+Inf"} 2' in text
+    assert 'lat_seconds_count{route="/api/x"} 2' in text
+    assert 'hits_total{cache="flights",result="hit"} 1' in text
+
+def test_server_timing_header():
+    assert server_timing_header([("render", 0.0015)], total=0.002) == "render;dur=1.50, total;dur=2.00"
@@ -1,4 +1,4 @@
-from pte.nlp.intent import parse_query
+from pte.nlp.intent import extract_date_range, parse_intents, parse_query
 from datetime import date
 
 def test_parse_dates_range():
@@ -14,3 +14,19 @@ def test_nonstop_yes():
 def test_start_hotel():
     i = parse_query("Start at Park Hyatt")
     assert i.name == "set_start_hotel" and "Park Hyatt Tokyo" in i.slots["hotel"]
+
+def test_compound_message_yields_all_intents():
+    intents = parse_intents("2027-11-20 to 2027-12-04, nonstop, start at Park Hyatt, also consider Andaz")
+    assert [i.name for i in intents] == ["set_dates", "set_nonstop", "set_start_hotel", "add_alternate_hotel"]
+    assert intents[2].slots["hotel"] == "Park Hyatt Tokyo"
+    assert intents[3].slots["hotel"] == "Andaz Tokyo Toranomon Hills"
+
+def test_dates_parsed_without_strptime():
+    assert extract_date_range("Nov 20, 27 - Dec 4, 27") == (date(2027, 11, 20), date(2027, 12, 4))
+    assert extract_date_range("2027-02-30 to 2027-03-04") == (None, date(2027, 3, 4))
+    assert parse_query("no direct flights").slots["prefer_nonstop"] is False
+
+def test_keywords_start_at_word_boundaries():
+    assert parse_intents("let's go for andaz") == [parse_query("start at andaz")]
+    assert parse_query("fly directly").name == "set_nonstop"
+    assert [i.name for i in parse_intents("start at park hyatt or andaz")] == ["set_start_hotel", "add_alternate_hotel"]
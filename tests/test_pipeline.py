@@ -0,0 +1,52 @@
+import json
+import os
+from datetime import date
+from pte.engine.models import Trip
+from pte.engine.pipeline import PlanningPipeline, ProviderRegistry
+
+TRIP = Trip(origin="MSP", destination="HND", start_date=date(2027, 11, 20), end_date=date(2027, 11, 23))
+
+def test_hooks_wrap_every_stage_in_order():
+    seen = []
+
+    def outer(name, run):
+        seen.append(("outer", name))
+        return run()
+
+    def inner(name, run):
+        seen.append(("inner", name))
+        return run()
+    pipeline = PlanningPipeline(hooks=(outer, inner))
+    md = pipeline.render(pipeline.plan(TRIP), include_timestamp=False)
+    assert md.startswith("# Tokyo Plan")
+    assert [n for h, n in seen if h == "outer"] == ["flights", "score", "calendars", "allocate", "score", "render"]
+    assert seen[:2] == [("outer", "flights"), ("inner", "flights")]
+
+def test_registry_rereads_calendar_only_when_file_changes(tmp_path):
+    path = tmp_path / "ph.json"
+    path.write_text(json.dumps({"2027-11-20": 35000}))
+    registry = ProviderRegistry()
+    first = registry.calendar_file(str(path))
+    assert registry.calendar_file(str(path)) is first
+    path.write_text(json.dumps({"2027-11-20": 45000}))
+    os.utime(path, ns=(1, 1))
+    assert registry.calendar_file(str(path)).points == [45000]
+
+def test_pipeline_scores_with_its_weights(tmp_path, monkeypatch):
+    from pte.engine.pipeline import WEIGHTS_ENV, default_weights
+    from pte.engine.scorer import FlightWeights
+    flights = PlanningPipeline().plan(TRIP).flights
+    assert flights[0].score == 40.0 and flights[0].rationale == "Nonstop MSP↔HND (preferred)."
+    flights = PlanningPipeline(weights=FlightWeights(nonstop_bonus=5.0)).plan(TRIP).flights
+    assert flights[0].score == 5.0
+    path = tmp_path / "weights.json"
+    path.write_text(json.dumps({"nonstop_bonus": 0}))
+    monkeypatch.setenv(WEIGHTS_ENV, str(path))
+    assert default_weights() == FlightWeights(nonstop_bonus=0)
+    nyc = Trip(origin="JFK", destination="NRT", start_date=date(2027, 11, 20), end_date=date(2027, 11, 23))
+    from pte.engine.models import FlightOption
+    from pte.engine.scorer import score_flights
+    option = FlightOption(carrier="JAL", flight_numbers=["JL5"], cabin="business", nonstop=True,
+                          origin=nyc.origin, destination=nyc.destination)
+    score_flights([option], FlightWeights())
+    assert option.rationale == "Nonstop JFK↔NRT (preferred)."
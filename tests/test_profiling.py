@@ -0,0 +1,68 @@
+import time
+import pytest
+from pte.utils.profiling import ProfileConfig, RequestProfiler, profiled
+
+def busy_loop(seconds=0.05):
+    end = time.perf_counter() + seconds
+    junk = []
+    while time.perf_counter() < end:
+        junk.append(str(len(junk)))
+    return junk
+
+def _outputs(tmp_path):
+    """{suffix: path} for the files one profiled run wrote."""
+    return {p.name.split(".", 1)[1]: p for p in tmp_path.iterdir()}
+
+def test_cprofile_writes_pstats_report_and_stacks(tmp_path):
+    with profiled("unit", ProfileConfig(mode="cprofile", out_dir=str(tmp_path), memory=True)):
+        busy_loop()
+    out = _outputs(tmp_path)
+    assert set(out) == {"pstats", "txt", "collapsed", "alloc.txt"}
+    assert "busy_loop" in out["txt"].read_text()
+    assert any("test_profiling.py:busy_loop" in line for line in out["collapsed"].read_text().splitlines())
+
+def test_sampling_profile_collects_stacks(tmp_path):
+    with profiled("unit", ProfileConfig(mode="sample", out_dir=str(tmp_path), interval=0.001)):
+        busy_loop()
+    stacks = _outputs(tmp_path)["collapsed"].read_text().splitlines()
+    assert any("busy_loop" in line for line in stacks)
+
+def test_profiling_off_is_a_no_op(tmp_path):
+    with profiled("unit", ProfileConfig(mode=None, out_dir=str(tmp_path))) as profiler:
+        busy_loop(0.001)
+    assert profiler is None and not any(tmp_path.iterdir())
+
+def test_api_profile_follows_threadpool_work(tmp_path, monkeypatch):
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+    import api.main
+    monkeypatch.setattr(api.main, "profiler", RequestProfiler(ProfileConfig(mode="cprofile", out_dir=str(tmp_path), every=3)))
+    client = TestClient(api.main.app)
+    sid = client.post("/api/session").json()["session_id"]                        # request 1
+    client.post(f"/api/session/{sid}/dates", json={"start_date": "2027-11-20", "end_date": "2027-11-23"})
+    assert client.post(f"/api/session/{sid}/generate").status_code == 200       # request 3: profiled
+    files = sorted(p.name for p in tmp_path.iterdir())
+    assert len(files) == 3 and all("api-POST-api_session_" in f for f in files)
+    collapsed = next(p for p in tmp_path.iterdir() if p.suffix == ".collapsed").read_text()
+    assert "build_plan_payload" in collapsed
+
+def test_overlapping_api_requests_profile_one_at_a_time(tmp_path, monkeypatch):
+    pytest.importorskip("httpx")
+    import asyncio
+    import httpx
+    import api.admission
+    import api.main
+    monkeypatch.setattr(api.admission, "ENABLED", False)
+    monkeypatch.setattr(api.main, "profiler", RequestProfiler(ProfileConfig(mode="cprofile", out_dir=str(tmp_path))))
+
+    async def run():
+        transport = httpx.ASGITransport(app=api.main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            sid = (await client.post("/api/session")).json()["session_id"]
+            await client.post(f"/api/session/{sid}/dates", json={"start_date": "2027-11-20", "end_date": "2027-11-23"})
+            return await asyncio.gather(*(client.post(f"/api/session/{sid}/generate") for _ in range(8)))
+
+    responses = asyncio.run(run())
+    assert all(r.status_code == 200 for r in responses)
+    generate = [p for p in tmp_path.iterdir() if p.suffix == ".pstats" and "generate" in p.name]
+    assert 1 <= len(generate) < 8          # overlapping requests were skipped, not clobbered
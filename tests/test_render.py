@@ -0,0 +1,53 @@
+from datetime import date
+from pte.engine.models import Trip, Recommendation
+from pte.engine.scorer import score_flight
+from pte.engine.render_markdown import render_markdown, render_html, render_json
+from pte.providers.flights.delta_msp_hnd import propose_flights
+from pte.providers.hotels.hyatt import load_calendars_for_trip, allocate_hyatt_stay
+
+def _rec():
+    trip = Trip(origin="MSP", destination="HND",
+                start_date=date(2027,11,20), end_date=date(2027,11,23))
+    flights = propose_flights(trip)
+    for f in flights: score_flight(f)
+    calendars = load_calendars_for_trip(trip, mode="fixture")
+    stay = allocate_hyatt_stay(trip, trip.hotel_primary, trip.hotel_alternates, calendars)
+    return Recommendation(trip=trip, flights=flights, stay=stay)
+
+def test_renderers_share_plan_content():
+    rec = _rec()
+    md = render_markdown(rec)
+    assert "- 2027-11-20: **Park Hyatt Tokyo** — 35,000 pts" in md
+    assert f"**Total points**: {rec.stay.total_points():,}" in md
+    assert md.count("## Flights") == 1 and "**Hotel references**" in md
+    assert "<h2>Flights</h2>" in render_html(rec)
+    data = render_json(rec)
+    assert data["total_points"] == rec.stay.total_points()
+    assert [n["date"] for n in data["nights"]] == ["2027-11-20", "2027-11-21", "2027-11-22"]
+
+def test_deterministic_render_is_byte_stable():
+    from datetime import datetime
+    from pte.engine.render_markdown import plan_etag
+    a = render_markdown(_rec(), include_timestamp=False)
+    b = render_markdown(_rec(), include_timestamp=False)
+    assert a == b and "_Generated" not in a
+    assert plan_etag(a) == plan_etag(b)
+    stamped = render_markdown(_rec(), generated_at=datetime(2027, 1, 2, 3, 4))
+    assert stamped.endswith("_Generated: 2027-01-02T03:04_")
+
+def test_flight_sections_are_cached_by_flight_set_and_format():
+    from pte.engine.render_markdown import flight_sections
+    from pte.utils.metrics import registry
+    def hits():
+        return registry.counter_value("pte_cache_requests_total", {"cache": "flight_section", "result": "hit"})
+    flight_sections.clear()
+    rec = _rec()
+    before = hits()
+    md = render_markdown(rec, include_timestamp=False)
+    render_html(rec, include_timestamp=False)
+    assert hits() == before
+    assert render_markdown(_rec(), include_timestamp=False) == md
+    assert hits() == before + 1
+    rec.flights[0].score += 1                  # a changed flight is a new key, not a stale section
+    assert render_markdown(rec, include_timestamp=False) != md
+    assert hits() == before + 1
@@ -0,0 +1,84 @@
+from datetime import date
+from pte.nlp.router import route_intent
+from pte.utils.metrics import registry
+
+def _llm(calls):
+    def extract(text):
+        calls.append(text)
+        return {"intent": "set_dates", "slots": {"start": "2027-11-20", "end": "2027-12-04", "hotel": None}}
+    return extract
+
+def test_confident_messages_skip_the_llm():
+    calls = []
+    before = registry.counter_value("pte_intent_route_total", {"path": "deterministic"})
+    routed = route_intent("prefer nonstop", llm=_llm(calls))
+    assert calls == [] and routed.path == "deterministic"
+    assert routed.intents[0].name == "set_nonstop"
+    assert registry.counter_value("pte_intent_route_total", {"path": "deterministic"}) == before + 1
+
+def test_low_confidence_falls_back_to_llm():
+    calls = []
+    routed = route_intent("the 20th of november through dec 4th 2027", llm=_llm(calls))
+    assert calls and routed.path == "llm"
+    assert routed.intents[0].slots == {"start": date(2027, 11, 20), "end": date(2027, 12, 4), "hotel": None}
+
+def test_llm_failure_keeps_deterministic_result():
+    def broken(text):
+        raise ConnectionError("ollama not running")
+    routed = route_intent("start nov 20 2027", llm=broken)
+    assert routed.path == "fallback"
+    assert routed.intents[0].slots["start"] == date(2027, 11, 20)
+
+def test_only_show_plan_generates(tmp_path):
+    from datetime import date
+    from pte.assistant.session import HELP, Session
+    out = tmp_path / "plan.md"
+    sess = Session(start_date=date(2027, 11, 20), end_date=date(2027, 11, 23))
+    for name in ("plan_trip", "reset", "quit", "smalltalk"):
+        assert sess.apply_intent(name, {}, str(out)) == HELP
+    assert not out.exists()
+    sess.apply_intent("show_plan", {}, str(out))
+    assert out.exists()
+
+def test_reused_plan_is_rewritten_when_the_file_is_gone(tmp_path):
+    from datetime import date
+    from pte.assistant.session import Session
+    out = tmp_path / "plan.md"
+    sess = Session(start_date=date(2027, 11, 20), end_date=date(2027, 11, 23))
+    sess.generate_plan(str(out))
+    out.unlink()
+    sess.generate_plan(str(out))
+    assert out.read_text(encoding="utf-8") == sess.last_markdown
+
+def test_async_extractor_failure_keeps_deterministic_result(monkeypatch):
+    import pytest
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+    import api.routes
+    from api.main import app
+    class Broken:
+        async def extract(self, text):
+            raise RuntimeError("unexpected reply shape")
+    monkeypatch.setattr(api.routes, "_llm_extractor", Broken())
+    client = TestClient(app)
+    sid = client.post("/api/session").json()["session_id"]
+    r = client.post(f"/api/session/{sid}/message", json={"message": "start nov 20 2027", "use_llm": True})
+    assert r.status_code == 200
+    assert r.json()["state"]["start_date"] == "2027-11-20"
+
+def test_failed_plan_clears_the_previous_one(tmp_path):
+    import pytest
+    from datetime import date
+    from pte.assistant.session import Session
+    out = str(tmp_path / "plan.md")
+    sess = Session(start_date=date(2027, 11, 20), end_date=date(2027, 11, 23))
+    sess.apply_intent("show_plan", {}, out)
+    assert sess.last_markdown
+    sess.calendar_mode, sess.import_paths = "import", {"Park Hyatt Tokyo": str(tmp_path / "missing.json")}
+    with pytest.raises(OSError):
+        sess.apply_intent("show_plan", {}, out)
+    assert sess.last_markdown is None and sess.last_markdown_path is None
+    sess.calendar_mode = "fixture"
+    sess.apply_intent("show_plan", {}, out)
+    sess.end_date = sess.start_date = None
+    assert sess.apply_intent("show_plan", {}, out).startswith("❌") and sess.last_markdown is None
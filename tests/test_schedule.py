@@ -0,0 +1,53 @@
+from datetime import date
+from pte.engine.models import Trip
+from pte.providers.flights.schedule import ScheduleStore, build_store
+from pte.providers.flights.delta_msp_hnd import propose_flights
+
+ROWS = [
+    dict(carrier="DL", flight_number="121", origin="MSP", destination="HND", days="1234567",
+         dep="11:30", arr="15:20", arr_day_offset="1", elapsed="770", equipment="359"),
+    dict(carrier="DL", flight_number="120", origin="HND", destination="MSP", days="1234567",
+         dep="17:25", arr="14:45", elapsed="680", equipment="359"),
+    dict(carrier="DL", flight_number="2500", origin="MSP", destination="SEA", days="12345..",
+         dep="07:00", arr="08:40", elapsed="220"),
+]
+
+def test_lookup_respects_weekday_and_time(tmp_path):
+    store = build_store(ROWS)
+    sat = date(2027, 11, 20)
+    assert [s.flight_code for s in store.departures("MSP", sat)] == ["DL121"]
+    assert [s.flight_code for s in store.departures("MSP", date(2027, 11, 22))] == ["DL2500", "DL121"]
+    path = tmp_path / "sched.bin"
+    store.save(str(path))
+    loaded = ScheduleStore.load(str(path))
+    assert loaded.nonstops("MSP", "HND", sat) == store.nonstops("MSP", "HND", sat)
+
+def test_propose_flights_uses_schedule():
+    trip = Trip(origin="MSP", destination="HND",
+                start_date=date(2027,11,20), end_date=date(2027,11,23))
+    options = propose_flights(trip, schedule=build_store(ROWS))
+    assert options[0].flight_numbers == ["DL121 (MSP→HND)", "DL120 (HND→MSP)"]
+    assert options[0].arrive_time_local == "15:20+1"
+
+def test_connection_search_orders_by_elapsed():
+    from pte.providers.flights.connections import best_itineraries
+    rows = ROWS + [
+        dict(carrier="DL", flight_number="167", origin="SEA", destination="HND", days="1234567",
+             dep="12:10", arr="15:00", arr_day_offset="1", elapsed="650"),
+        dict(carrier="DL", flight_number="2600", origin="MSP", destination="SEA", days="1234567",
+             dep="05:00", arr="06:40", elapsed="220"),
+    ]
+    its = best_itineraries(build_store(rows), "MSP", "HND", date(2027, 11, 22), k=3)
+    assert [[s.flight_code for s in it.segments] for it in its] == [
+        ["DL121"], ["DL2500", "DL167"], ["DL2600", "DL167"]]
+    assert its[1].elapsed_minutes == 220 + (12*60+10 - (8*60+40)) + 650
+
+def test_schedule_options_follow_the_nonstop_preference():
+    rows = ROWS + [dict(carrier="DL", flight_number="167", origin="SEA", destination="HND", days="1234567",
+                        dep="12:10", arr="15:00", arr_day_offset="1", elapsed="650")]
+    monday = date(2027, 11, 22)
+    for prefer in (True, False):
+        trip = Trip(origin="MSP", destination="HND", start_date=monday,
+                    end_date=date(2027, 11, 25), prefer_nonstop=prefer)
+        options = propose_flights(trip, schedule=build_store(rows))
+        assert [o.nonstop for o in options] == ([True, False] if prefer else [False, True])
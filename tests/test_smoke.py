@@ -1,7 +1,7 @@
 from datetime import date
 from pte.utils.date_utils import parse_date_or_none, validate_date_range
-from pte.engine.models import Trip
-from pte.providers.hotels.hyatt import load_calendar_from_fixture, allocate_hyatt_stay
+from pte.engine.models import HotelNight, StayPlan, Trip
+from pte.providers.hotels.hyatt import HyattCalendar, load_calendar_from_fixture, allocate_hyatt_stay
 
 def test_parse_and_validate_dates():
     assert parse_date_or_none("2027-11-20") == date(2027,11,20)
@@ -17,3 +17,67 @@ def test_allocator_runs():
     calendars = {"Park Hyatt Tokyo": ph, "Andaz Tokyo Toranomon Hills": az}
     stay = allocate_hyatt_stay(trip, "Park Hyatt Tokyo", ["Andaz Tokyo Toranomon Hills"], calendars)
     assert len(stay.nights) == 3
+
+def test_stay_plan_keeps_running_totals():
+    stay = StayPlan()
+    stay.extend([
+        HotelNight(date(2027,11,20).toordinal(), "Park Hyatt " + "Tokyo", "World of Hyatt", 40000, None, False),
+        HotelNight(date(2027,11,21).toordinal(), "Andaz Tokyo Toranomon Hills", "World of Hyatt", 35000, 120.0, False),
+        HotelNight(date(2027,11,22).toordinal(), "Park Hyatt Tokyo", "World of Hyatt", None, 300.5, None),
+    ])
+    assert stay.total_points() == 75000 and stay.total_cash() == 420.5
+    by_hotel = stay.by_hotel()
+    assert list(by_hotel) == ["Park Hyatt Tokyo", "Andaz Tokyo Toranomon Hills"]
+    assert (by_hotel["Park Hyatt Tokyo"].nights, by_hotel["Park Hyatt Tokyo"].points) == (2, 40000)
+    assert stay.nights[0].hotel_name is stay.nights[2].hotel_name
+    assert not hasattr(stay.nights[0], "__dict__")
+    assert isinstance(stay.nights, tuple)
+    stay.add(HotelNight(date(2027,11,23).toordinal(), "Park Hyatt Tokyo", "World of Hyatt", 35000, None, False))
+    assert len(stay.nights) == 4 and stay.total_points() == 110000
+
+def test_hotel_night_from_date():
+    import pytest
+    night = HotelNight.from_date(date=date(2027,11,20), hotel_name="Park Hyatt Tokyo", program="World of Hyatt",
+                                 points_price=35000, cash_price=None, is_peak=False)
+    assert night.day == date(2027,11,20).toordinal() and night.date == date(2027,11,20)
+    with pytest.raises(TypeError, match="from_date"):
+        HotelNight(date(2027,11,20), "Park Hyatt Tokyo", "World of Hyatt", 35000, None, False)
+
+def test_day_ordinal_helpers():
+    import numpy as np
+    from pte.engine import days
+    start, end = date(2027,11,29), date(2027,12,3)
+    span = days.day_array(start, end)
+    assert list(span) == list(days.day_range(start, end))
+    assert list(days.dates(start, end))[-1] == date(2027,12,2)
+    assert [days.weekday(d) for d in span] == [days.to_date(d).weekday() for d in span]
+    assert list(days.weekday_mask(span, {5, 6})) == [d.weekday() >= 5 for d in days.dates(start, end)]
+    assert list(days.month_starts(span)) == [0, 2]
+
+def test_calendar_slices_by_day():
+    cal = HyattCalendar({date(2027,11,20): 35000, date(2027,11,22): 45000})
+    first = date(2027,11,19).toordinal()
+    assert cal.points_between(first, first + 5) == [None, 35000, None, 45000, None]
+    assert cal.nightly_points[date(2027,11,22)] == 45000
+    assert cal.nightly_points[date(2027,11,21)] is None
+
+def test_calendar_span_is_capped():
+    import pytest
+    from pte.providers.hotels.hyatt import calendar_from_json
+    with pytest.raises(ValueError, match="spans"):
+        calendar_from_json(b'{"2027-11-20": 35000, "9999-12-31": 35000}')
+
+def test_session_reuses_plan_until_inputs_change(tmp_path):
+    from pte.assistant.session import Session
+    from pte.providers.hotels.hyatt import calendar_from_json
+    cal = calendar_from_json(b'{"2027-11-20": 35000, "2027-11-21": 45000, "2027-11-22": null}')
+    sess = Session(calendar_mode="import", start_date=date(2027,11,20), end_date=date(2027,11,23),
+                   calendars={"Park Hyatt Tokyo": cal, "Andaz Tokyo Toranomon Hills": cal})
+    out = str(tmp_path / "plan.md")
+    sess.generate_plan(out)
+    first = sess.last_markdown
+    sess.generate_plan(out)
+    assert sess.last_markdown is first
+    sess.set_nonstop(False)
+    sess.generate_plan(out)
+    assert sess.last_markdown is not first
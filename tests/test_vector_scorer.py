@@ -0,0 +1,30 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from datetime import date
+from pte.engine.models import Trip
+from pte.engine.scorer import FlightWeights
+from pte.engine.vector_scorer import FlightFeatures, rank_features, rank_flights
+from pte.providers.flights.delta_msp_hnd import propose_flights
+
+def test_nonstop_ranks_first_and_inputs_untouched():
+    trip = Trip(origin="MSP", destination="HND",
+                start_date=date(2027,11,20), end_date=date(2027,11,23))
+    options = propose_flights(trip)
+    ranked = rank_flights(options)
+    assert ranked[0][0].nonstop
+    assert all(o.score == 0.0 for o in options)
+
+def test_weights_drive_cash_preference():
+    feat = FlightFeatures(
+        nonstop=np.array([True, False]), duration=np.array([765.0, 900.0]),
+        depart_hour=np.array([11.5, 11.5]), points_cost=np.array([np.nan, np.nan]),
+        cash_cost=np.array([4000.0, 1000.0]), alliance=np.array(["SkyTeam", "SkyTeam"], dtype=object),
+    )
+    _, order = rank_features(feat, FlightWeights(nonstop_bonus=0, cash_value=100))
+    assert list(order) == [1, 0]
+
+def test_weight_defaults_come_from_default_weights():
+    from pte.engine.scorer import DEFAULT_WEIGHTS
+    assert FlightWeights() == FlightWeights.from_dict(DEFAULT_WEIGHTS)